@@ -0,0 +1,185 @@
+# circuit_breaker.py - Per-Service Circuit Breakers for IVERI AI
+# After repeated failures (or answers slower than the service's latency
+# objective) a breaker opens: callers skip the service and answer from
+# cache or a local fallback at once, while a background probe checks
+# when the service is healthy again.
+
+import threading
+import time
+
+import config
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class BreakerOpen(Exception):
+    """Raised instead of calling a service whose breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failures` consecutive errors, or `slow_calls`
+    consecutive calls slower than `latency_slo`.
+    open -> half-open after `reset_after` seconds: `probe` runs on a
+    background thread (or, without a probe, the next real call is let
+    through as the trial).
+    half-open -> closed if the probe/trial is healthy, else open again.
+    """
+
+    def __init__(self, name, probe=None, failures=3, slow_calls=3, latency_slo=None,
+                 reset_after=30.0):
+        """
+        Args:
+            name: Service name used in status reports
+            probe: fn() that raises if the service is unhealthy
+            failures: Consecutive failures that open the breaker
+            slow_calls: Consecutive SLO breaches that open the breaker
+            latency_slo: Seconds a healthy call should take (None = no SLO)
+            reset_after: Seconds to stay open before probing
+        """
+        self.name = name
+        self.probe = probe
+        self.failures = failures
+        self.slow_calls = slow_calls
+        self.latency_slo = latency_slo
+        self.reset_after = reset_after
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.failed = 0          # Consecutive failures
+        self.slow = 0            # Consecutive SLO breaches
+        self.opened_at = 0.0
+        self.last_error = None
+        self.trips = 0
+        self.skipped = 0         # Calls answered by a fallback while open
+
+    def allow(self):
+        """True if the service may be called now"""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.time() - self.opened_at >= self.reset_after:
+                self.state = HALF_OPEN
+                if self.probe is None:
+                    return True          # This call is the trial
+                threading.Thread(target=self._probe, name=f"{self.name}-probe", daemon=True).start()
+            self.skipped += 1
+            return False
+
+    def check(self):
+        """Raise BreakerOpen unless the service may be called now"""
+        if not self.allow():
+            raise BreakerOpen(f"{self.name} is unavailable (circuit open)")
+
+    def record(self, ok, seconds=None, error=None):
+        """
+        Report the outcome of one call.
+
+        Args:
+            ok: The service answered (a client error like 404 still counts)
+            seconds: How long it took, checked against the latency SLO
+            error: What went wrong, for status reports
+        """
+        slow = ok and seconds is not None and self.latency_slo is not None and seconds > self.latency_slo
+        with self.lock:
+            if not ok:
+                self.failed += 1
+                self.last_error = str(error) if error else "request failed"
+            else:
+                self.failed = 0
+            if slow:
+                self.slow += 1
+                self.last_error = f"slow: {seconds:.1f}s (objective {self.latency_slo:.1f}s)"
+            elif ok:
+                self.slow = 0
+
+            if self.state == HALF_OPEN:
+                # The probe/trial call decides
+                if ok and not slow:
+                    self._close()
+                else:
+                    self._open()
+            elif self.state == CLOSED and (self.failed >= self.failures or self.slow >= self.slow_calls):
+                self._open()
+
+    def _open(self):
+        if self.state != OPEN:
+            print(f"Circuit breaker: {self.name} unavailable ({self.last_error}) - using fallbacks")
+            self.trips += 1
+        self.state = OPEN
+        self.opened_at = time.time()
+
+    def _close(self):
+        if self.state != CLOSED:
+            print(f"Circuit breaker: {self.name} is back")
+        self.state = CLOSED
+        self.failed = 0
+        self.slow = 0
+
+    def _probe(self):
+        started = time.perf_counter()
+        try:
+            self.probe()
+            ok, error = True, None
+        except Exception as e:
+            ok, error = False, e
+        self.record(ok, time.perf_counter() - started, error)
+
+    def reset(self):
+        with self.lock:
+            self._close()
+
+    def status(self):
+        """{'state', 'failures', 'slow', 'trips', 'skipped', 'last_error', 'retry_in'}"""
+        with self.lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.reset_after - (time.time() - self.opened_at))
+            return {
+                'state': self.state,
+                'failures': self.failed,
+                'slow': self.slow,
+                'trips': self.trips,
+                'skipped': self.skipped,
+                'last_error': self.last_error,
+                'retry_in': retry_in,
+            }
+
+
+# Service name -> CircuitBreaker
+breakers = {}
+
+
+def get(name, probe=None):
+    """Return the breaker for a service, creating it from config on first use"""
+    if name not in breakers:
+        breakers[name] = CircuitBreaker(
+            name,
+            probe=probe,
+            failures=config.BREAKER_FAILURES,
+            slow_calls=config.BREAKER_SLOW_CALLS,
+            latency_slo=config.BREAKER_SLO.get(name),
+            reset_after=config.BREAKER_RESET_AFTER
+        )
+    return breakers[name]
+
+
+def status():
+    """Status of every service breaker, by name"""
+    return {name: breaker.status() for name, breaker in breakers.items()}
+
+
+def describe():
+    """One spoken sentence on the health of the online services"""
+    down = []
+    for name, info in status().items():
+        if info['state'] == OPEN:
+            down.append(f"{name} (checking again in {int(info['retry_in']) + 1} seconds)")
+        elif info['state'] == HALF_OPEN:
+            down.append(f"{name} (checking now)")
+    if not breakers:
+        return "I haven't used any online services yet."
+    if not down:
+        return f"All online services are working: {', '.join(breakers)}."
+    return f"Unavailable right now: {', '.join(down)}. I'm answering from saved data meanwhile."
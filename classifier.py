@@ -0,0 +1,255 @@
+# classifier.py - Offline Intent Classifier for IVERI AI
+# Catches paraphrased commands ("could you pull up youtube") that the exact
+# router misses, so they run locally instead of costing a GPT round-trip.
+
+import math
+import re
+
+import config
+from commands import OPEN_COMMANDS
+from utterance import Utterance
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    print("INFO: numpy not installed. Local intent classifier disabled.")
+
+
+# Label for "not a local command - let GPT answer"
+GPT_LABEL = None
+
+# Paraphrase templates for every "open <thing>" row in the command registry
+OPEN_TEMPLATES = [
+    "open {}", "pull up {}", "launch {}", "bring up {}", "show me {}",
+    "go to {}", "start {}", "could you open {}", "can you pull up {}",
+    "i want to see my {}", "take me to {}", "fire up {}",
+]
+
+# Questions *about* a registered thing are for GPT, not the launcher
+QUESTION_TEMPLATES = ["what is {}", "how does {} work", "who made {}"]
+
+# Aliases too short or too common to expand through the templates above
+# ("go to x" would teach that "go to sleep" opens Twitter); the exact
+# router still knows them
+MIN_ALIAS_LENGTH = 3
+AMBIGUOUS_ALIASES = {'files', 'settings', 'desktop'}
+
+# Commands never run on a classifier guess: they act on the device or
+# can't be undone. GPT hears these and can still call the matching tool.
+GUARDED_COMMANDS = {
+    "volume up", "volume down", "mute", "unmute", "take a screenshot", "lock screen",
+    "clear history", "turn on the led", "turn off the led", "blink led",
+}
+
+# Commands whose argument the canonical text would drop ("is it raining in
+# tokyo" is not the default city's weather) - left to GPT's tools
+SLOT_PATTERNS = {
+    "weather": re.compile(r"\b(?:in|for|at|near)\s+\w"),
+}
+
+# Canonical command (handled by the router) -> example phrasings
+COMMAND_EXAMPLES = {
+    "what time is it": [
+        "what time is it", "tell me the time", "what's the time now", "do you know the time",
+        "time please", "what is the time", "got the time",
+    ],
+    "what day is it": [
+        "what day is it", "what's the date today", "tell me today's date", "which day is today",
+        "what is today's date", "date please",
+    ],
+    "volume up": [
+        "volume up", "turn it up", "make it louder", "louder please", "turn the volume up",
+        "raise the volume", "i can't hear you",
+    ],
+    "volume down": [
+        "volume down", "turn it down", "make it quieter", "quieter please", "lower the volume",
+        "too loud", "turn the volume down", "turn the music down", "sound down",
+    ],
+    "mute": ["mute", "mute the sound", "silence the audio", "mute audio", "kill the sound"],
+    "unmute": ["unmute", "unmute the sound", "sound back on", "turn the sound back on"],
+    "take a screenshot": [
+        "take a screenshot", "grab the screen", "screen capture", "snap the screen",
+        "capture my screen", "save a picture of the screen",
+    ],
+    "my ip address": [
+        "my ip address", "what's my ip", "tell me my ip", "what is my network address",
+        "show the ip address",
+    ],
+    "battery status": [
+        "battery status", "how much battery is left", "battery level", "how much charge do i have",
+        "am i plugged in",
+    ],
+    "cpu temperature": [
+        "cpu temperature", "how hot is the cpu", "processor temperature", "is the pi overheating",
+    ],
+    "lock screen": ["lock screen", "lock my computer", "lock the pc", "lock it"],
+    "clear history": [
+        "clear history", "forget our conversation", "start over", "reset the conversation",
+        "wipe the chat",
+    ],
+    "help": ["help", "what can you do", "what are your commands", "list your features", "what do you support"],
+    "show notes": ["show notes", "read my notes", "what are my notes", "list my notes", "what did i note down"],
+    "what do you remember": [
+        "what do you remember", "what do you know about me", "list memories", "show what you remember",
+    ],
+    "news": ["news", "what's happening in the world", "latest headlines", "top stories today", "any headlines"],
+    "tech news": ["tech news", "technology headlines", "latest in tech", "what's new in technology"],
+    "sports news": ["sports news", "sports headlines", "latest sports scores", "what's happening in sports"],
+    "business news": ["business news", "market news", "finance headlines", "how are the markets"],
+    "weather": ["weather", "how's the weather", "is it raining", "do i need an umbrella", "is it cold outside"],
+    "turn on the led": ["turn on the led", "switch the light on", "lights on", "turn the lamp on", "led on"],
+    "turn off the led": ["turn off the led", "switch the light off", "lights off", "turn the lamp off", "led off"],
+    "blink led": ["blink led", "flash the light", "blink the light", "make the led flash"],
+}
+
+# Things GPT should answer - keeps look-alike questions away from commands
+GPT_EXAMPLES = [
+    "what is the capital of france", "who invented the telephone", "tell me a joke",
+    "how are you", "who are you", "what is five times six", "explain quantum computing",
+    "write a poem about the sea", "what is youtube", "who founded google", "how does a battery work",
+    "what is a screenshot", "why is the sky blue", "how do i cook rice", "what's the meaning of life",
+    "translate hello into spanish", "what is the speed of light", "recommend a good movie",
+    "how far is the moon", "what should i eat for dinner", "hello", "thank you", "good morning",
+    "tell me about the history of rome", "what time zone is tokyo in", "how old is the universe",
+    # Look-alikes of commands
+    "go to bed", "go to the gym", "start the engine", "start a new job", "i want to see my family",
+    "i want to see the ocean", "lock the front door", "lock the car", "what do you know about space",
+    "what do you know about dinosaurs", "what do you know about the moon",
+    "what do you know about black cats", "what do you know about holiday", "what are my choices",
+    "what are my chances", "what are my rights", "what are my options for lunch",
+    "show me a photo of a dog", "show me a picture of the eiffel tower", "draw a picture of a horse",
+]
+
+
+def build_examples():
+    """Return (text, canonical command or GPT_LABEL) training pairs"""
+    examples = []
+    for phrases, _, _, _ in OPEN_COMMANDS:
+        canonical = f"open {phrases[0]}"
+        for phrase in phrases:
+            if len(phrase) < MIN_ALIAS_LENGTH or phrase in AMBIGUOUS_ALIASES:
+                continue
+            for template in OPEN_TEMPLATES:
+                examples.append((template.format(phrase), canonical))
+            for template in QUESTION_TEMPLATES:
+                examples.append((template.format(phrase), GPT_LABEL))
+    for canonical, phrasings in COMMAND_EXAMPLES.items():
+        for text in phrasings:
+            examples.append((text, canonical))
+    for text in GPT_EXAMPLES:
+        examples.append((text, GPT_LABEL))
+    return examples
+
+
+def _features(utt):
+    """Char 2-4 grams inside word boundaries, plus word unigrams/bigrams"""
+    feats = {}
+    for token in utt.tokens:
+        padded = f" {token} "
+        for n in (2, 3, 4):
+            for i in range(len(padded) - n + 1):
+                gram = padded[i:i + n]
+                feats[gram] = feats.get(gram, 0) + 1
+    tokens = utt.tokens
+    for i, token in enumerate(tokens):
+        key = "w:" + token
+        feats[key] = feats.get(key, 0) + 1
+        if i + 1 < len(tokens):
+            key = "b:" + token + " " + tokens[i + 1]
+            feats[key] = feats.get(key, 0) + 1
+    return feats
+
+
+class IntentClassifier:
+    """TF-IDF nearest-example classifier scored with one matrix-vector product"""
+
+    def __init__(self, examples):
+        self.labels = [label for _, label in examples]
+        rows = [_features(Utterance(text)) for text, _ in examples]
+
+        # Vocabulary and inverse document frequency
+        self.vocab = {}
+        df = {}
+        for feats in rows:
+            for gram in feats:
+                if gram not in self.vocab:
+                    self.vocab[gram] = len(self.vocab)
+                df[gram] = df.get(gram, 0) + 1
+
+        n = len(rows)
+        self.idf = np.ones(len(self.vocab), dtype=np.float32)
+        for gram, count in df.items():
+            self.idf[self.vocab[gram]] = math.log((1 + n) / (1 + count)) + 1
+
+        self.matrix = np.zeros((n, len(self.vocab)), dtype=np.float32)
+        for r, feats in enumerate(rows):
+            for gram, count in feats.items():
+                self.matrix[r, self.vocab[gram]] = 1 + math.log(count)
+        self.matrix *= self.idf
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        self.matrix /= np.maximum(norms, 1e-9)
+
+    def vectorize(self, utt):
+        """TF-IDF vector for an utterance (unknown grams are ignored)"""
+        vec = np.zeros(len(self.vocab), dtype=np.float32)
+        for gram, count in _features(utt).items():
+            idx = self.vocab.get(gram)
+            if idx is not None:
+                vec[idx] = (1 + math.log(count)) * self.idf[idx]
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def predict(self, user_input):
+        """
+        Classify an utterance.
+
+        Returns:
+            tuple: (canonical command or GPT_LABEL, cosine score 0..1)
+        """
+        utt = Utterance.of(user_input)
+        if not utt:
+            return GPT_LABEL, 0.0
+        scores = self.matrix @ self.vectorize(utt)
+        best = int(np.argmax(scores))
+        return self.labels[best], float(scores[best])
+
+
+# "open <thing>" label -> every alias of the thing
+_OPEN_ALIASES = {f"open {phrases[0]}": phrases for phrases, _, _, _ in OPEN_COMMANDS}
+
+# Built once at startup
+classifier = IntentClassifier(build_examples()) if NUMPY_AVAILABLE else None
+
+
+def match(user_input, threshold=None):
+    """
+    Map a paraphrase onto a local command.
+
+    Args:
+        user_input: str or Utterance the exact router didn't handle
+        threshold: Minimum confidence (default config.INTENT_CONFIDENCE_THRESHOLD)
+
+    Returns:
+        Canonical command text to re-route, or None to fall back to GPT
+        (also for guarded commands and ones the label would lose an
+        argument of)
+    """
+    if classifier is None:
+        return None
+    if threshold is None:
+        threshold = config.INTENT_CONFIDENCE_THRESHOLD
+
+    utt = Utterance.of(user_input)
+    label, score = classifier.predict(utt)
+    if label is GPT_LABEL or score < threshold or label in GUARDED_COMMANDS:
+        return None
+    # "Open" paraphrases name what to open ("i want to see my friends" doesn't)
+    aliases = _OPEN_ALIASES.get(label)
+    if aliases is not None and not utt.has_phrase(*aliases):
+        return None
+    pattern = SLOT_PATTERNS.get(label)
+    if pattern is not None and pattern.search(utt.text):
+        return None
+    return label
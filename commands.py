@@ -6,6 +6,10 @@ import os
 import sys
 from datetime import datetime
 
+import circuit_breaker
+import slots
+from utterance import Utterance
+
 # Import gpt for clear history command
 try:
     import gpt
@@ -16,226 +20,266 @@ except ImportError:
 IS_WINDOWS = sys.platform == 'win32'
 IS_LINUX = sys.platform.startswith('linux')
 
+# === COMMAND REGISTRY ===
+# One row per "open <thing>" command: (phrases, action, target, response).
+# Apps take per-platform targets ('windows' / 'linux'); a missing platform
+# just answers without launching anything. Add a row to add a command.
+OPEN_COMMANDS = [
+    # Websites
+    (('youtube',), 'website', 'https://www.youtube.com', "Opening YouTube."),
+    (('google',), 'website', 'https://www.google.com', "Opening Google."),
+    (('facebook',), 'website', 'https://www.facebook.com', "Opening Facebook."),
+    (('twitter', 'x'), 'website', 'https://www.twitter.com', "Opening Twitter."),
+    (('github',), 'website', 'https://www.github.com', "Opening GitHub."),
+    (('instagram',), 'website', 'https://www.instagram.com', "Opening Instagram."),
+    (('linkedin',), 'website', 'https://www.linkedin.com', "Opening LinkedIn."),
+    (('reddit',), 'website', 'https://www.reddit.com', "Opening Reddit."),
+    (('whatsapp',), 'website', 'https://web.whatsapp.com', "Opening WhatsApp Web."),
+    (('gmail',), 'website', 'https://mail.google.com', "Opening Gmail."),
+    (('spotify',), 'website', 'https://open.spotify.com', "Opening Spotify."),
+    (('netflix',), 'website', 'https://www.netflix.com', "Opening Netflix."),
+    
+    # Applications
+    (('calculator',), 'app',
+     {'windows': ['calc.exe'], 'linux': ['gnome-calculator']}, "Opening calculator."),
+    (('notepad', 'text editor'), 'app',
+     {'windows': ['notepad.exe'], 'linux': ['gedit']}, "Opening text editor."),
+    (('terminal', 'command prompt'), 'app',
+     {'windows': ['cmd.exe'], 'linux': ['lxterminal']}, "Opening terminal."),
+    (('file manager', 'files', 'explorer'), 'app',
+     {'windows': ['explorer.exe'], 'linux': ['pcmanfm']}, "Opening file manager."),
+    (('settings',), 'app',
+     {'windows': 'start ms-settings:'}, "Opening settings."),
+    
+    # Folders
+    (('downloads',), 'folder', '~/Downloads', "Opening downloads folder."),
+    (('documents',), 'folder', '~/Documents', "Opening documents folder."),
+    (('desktop',), 'folder', '~/Desktop', "Opening desktop folder."),
+]
+
+OPEN_VERBS = ('open',)
+
+
+def _build_open_index():
+    """Index OPEN_COMMANDS by (verb, object phrase) for O(1) lookup"""
+    index = {}
+    for entry in OPEN_COMMANDS:
+        for phrase in entry[0]:
+            for verb in OPEN_VERBS:
+                index[(verb, phrase)] = entry
+    return index
+
+
+_OPEN_INDEX = _build_open_index()
+_MAX_OBJECT_WORDS = max(len(p.split()) for e in OPEN_COMMANDS for p in e[0])
+
+
+def lookup_open_command(tokens):
+    """
+    Find the registry row for an "open <thing>" request.
+    
+    Args:
+        tokens: Utterance tokens
+    
+    Returns:
+        The matching OPEN_COMMANDS row, or None
+    """
+    for i, token in enumerate(tokens):
+        if token not in OPEN_VERBS:
+            continue
+        # Longest object first: "open file manager" before "open files"
+        for size in range(min(_MAX_OBJECT_WORDS, len(tokens) - i - 1), 0, -1):
+            entry = _OPEN_INDEX.get((token, ' '.join(tokens[i + 1:i + 1 + size])))
+            if entry:
+                return entry
+    return None
+
+
+def run_open_command(entry):
+    """Execute a registry row and return (handled, response)"""
+    _, action, target, response = entry
+    
+    if action == 'website':
+        webbrowser.open(target)
+    
+    elif action == 'app':
+        launch = target.get('windows' if IS_WINDOWS else 'linux')
+        if isinstance(launch, str):
+            os.system(launch)
+        elif launch:
+            subprocess.Popen(launch)
+    
+    elif action == 'folder':
+        folder = os.path.expanduser(target)
+        if IS_WINDOWS:
+            os.startfile(folder)
+        else:
+            subprocess.Popen(['xdg-open', folder])
+    
+    return True, response
+
+
+# Every phrase handle_command tests for - the router skips this module
+# when none of them occur in the text
+TRIGGERS = (
+    'open ', 'youtube', 'search', 'google ', 'wikipedia',
+    'take screenshot', 'take a screenshot', 'capture screen',
+    'volume up', 'increase volume', 'volume down', 'decrease volume', 'mute',
+    'what time is it', 'current time', "what's the time",
+    'what day is it', "what's the date", 'current date', "what's today",
+    'ip address', 'my ip', 'temperature', 'battery', 'service status', 'services status',
+    'lock screen', 'lock computer', 'shutdown', 'shut down', 'restart', 'reboot',
+    'clear history', 'forget everything', 'start fresh', 'help', 'what can you do',
+)
+
+
+# Canonical phrasings of the fixed device commands below
+SYSTEM_COMMANDS = (
+    'what time is it', 'what day is it', 'volume up', 'volume down', 'mute', 'unmute',
+    'take a screenshot', 'my ip address', 'cpu temperature', 'battery status',
+    'service status', 'lock screen', 'clear history', 'help',
+)
+
+# Function tools GPT may call instead of answering in words:
+# (name, description, {param: (description, allowed values or None)}, utterance).
+# A call is run by routing the filled-in utterance, so the same handler answers.
+TOOLS = (
+    ('open_item', "Open a website, app or folder on this device.",
+     {'item': ("What to open", [entry[0][0] for entry in OPEN_COMMANDS])},
+     "open {item}"),
+    ('search_youtube', "Search YouTube and show the results.",
+     {'query': ("Search terms", None)}, "search youtube for {query}"),
+    ('search_google', "Search Google and show the results.",
+     {'query': ("Search terms", None)}, "search for {query}"),
+    ('open_wikipedia', "Open the Wikipedia article on a topic.",
+     {'query': ("Article topic", None)}, "wikipedia {query}"),
+    ('device_command', "Run a device command: time, date, volume, screenshot, IP, "
+                       "CPU temperature, battery, online service status, lock screen, "
+                       "clear conversation, help.",
+     {'command': ("Command to run", list(SYSTEM_COMMANDS))}, "{command}"),
+)
+
 
 def handle_command(user_input):
     """
     Check if user input matches a local command.
     
     Args:
-        user_input: The user's spoken text
+        user_input: The user's spoken text (str or Utterance)
     
     Returns:
         tuple: (command_handled: bool, response: str)
     """
-    text = user_input.lower().strip()
-    
-    # === BROWSER COMMANDS ===
-    
-    if 'open youtube' in text:
-        webbrowser.open('https://www.youtube.com')
-        return True, "Opening YouTube."
+    utt = Utterance.of(user_input)
     
-    if 'open google' in text:
-        webbrowser.open('https://www.google.com')
-        return True, "Opening Google."
+    # === OPEN COMMANDS (websites, apps, folders) ===
+    # One registry lookup; websites win over searches, apps and folders
+    # are launched after the search checks (same order as before)
+    entry = lookup_open_command(utt.tokens)
     
-    if 'open facebook' in text:
-        webbrowser.open('https://www.facebook.com')
-        return True, "Opening Facebook."
-    
-    if 'open twitter' in text or 'open x' in text:
-        webbrowser.open('https://www.twitter.com')
-        return True, "Opening Twitter."
-    
-    if 'open github' in text:
-        webbrowser.open('https://www.github.com')
-        return True, "Opening GitHub."
-    
-    if 'open instagram' in text:
-        webbrowser.open('https://www.instagram.com')
-        return True, "Opening Instagram."
-    
-    if 'open linkedin' in text:
-        webbrowser.open('https://www.linkedin.com')
-        return True, "Opening LinkedIn."
-    
-    if 'open reddit' in text:
-        webbrowser.open('https://www.reddit.com')
-        return True, "Opening Reddit."
-    
-    if 'open whatsapp' in text:
-        webbrowser.open('https://web.whatsapp.com')
-        return True, "Opening WhatsApp Web."
-    
-    if 'open gmail' in text:
-        webbrowser.open('https://mail.google.com')
-        return True, "Opening Gmail."
-    
-    if 'open spotify' in text:
-        webbrowser.open('https://open.spotify.com')
-        return True, "Opening Spotify."
-    
-    if 'open netflix' in text:
-        webbrowser.open('https://www.netflix.com')
-        return True, "Opening Netflix."
+    if entry and entry[1] == 'website':
+        return run_open_command(entry)
     
     # === SEARCH COMMANDS ===
     
     # YouTube search - multiple patterns
-    if 'youtube' in text and ('search' in text or 'play' in text or 'find' in text):
-        # Extract query - remove common words
-        query = text
-        for word in ['search', 'youtube', 'for', 'on', 'play', 'find', 'video', 'videos']:
-            query = query.replace(word, '')
-        query = query.strip()
-        if query:
+    if utt.has_word('youtube') and utt.has_word('search', 'play', 'find'):
+        found = slots.extract('youtube_search', utt)
+        if found:
+            query = found['query']
             import urllib.parse
             webbrowser.open(f'https://www.youtube.com/results?search_query={urllib.parse.quote(query)}')
             return True, f"Searching YouTube for {query}."
     
     # Google search - multiple patterns
-    if text.startswith('search for ') or text.startswith('google ') or text.startswith('search '):
-        query = text
-        for word in ['search for', 'search', 'google', 'for']:
-            query = query.replace(word, '', 1)
-        query = query.strip()
+    if utt.startswith('search for', 'google', 'search'):
+        found = slots.extract('google_search', utt)
+        query = found['query'] if found else None
         if query and 'youtube' not in query:
             import urllib.parse
             webbrowser.open(f'https://www.google.com/search?q={urllib.parse.quote(query)}')
             return True, f"Searching Google for {query}."
     
     # Wikipedia
-    if 'wikipedia' in text:
-        query = text.replace('wikipedia', '').replace('search', '').replace('look up', '').strip()
-        if query:
+    if utt.has_word('wikipedia'):
+        found = slots.extract('wikipedia', utt)
+        if found:
+            query = found['query']
             webbrowser.open(f'https://en.wikipedia.org/wiki/{query.replace(" ", "_")}')
             return True, f"Opening Wikipedia for {query}."
     
-    # === APPLICATION COMMANDS ===
+    # === APPLICATION / FOLDER COMMANDS ===
     
-    if 'open calculator' in text:
-        if IS_WINDOWS:
-            subprocess.Popen(['calc.exe'])
-        else:
-            subprocess.Popen(['gnome-calculator'])
-        return True, "Opening calculator."
-    
-    if 'open notepad' in text or 'open text editor' in text:
-        if IS_WINDOWS:
-            subprocess.Popen(['notepad.exe'])
-        else:
-            subprocess.Popen(['gedit'])
-        return True, "Opening text editor."
-    
-    if 'open terminal' in text or 'open command prompt' in text:
-        if IS_WINDOWS:
-            subprocess.Popen(['cmd.exe'])
-        else:
-            subprocess.Popen(['lxterminal'])
-        return True, "Opening terminal."
-    
-    if 'open file manager' in text or 'open files' in text or 'open explorer' in text:
-        if IS_WINDOWS:
-            subprocess.Popen(['explorer.exe'])
-        else:
-            subprocess.Popen(['pcmanfm'])
-        return True, "Opening file manager."
-    
-    if 'open settings' in text:
-        if IS_WINDOWS:
-            os.system('start ms-settings:')
-        return True, "Opening settings."
-    
-    # === FOLDER COMMANDS ===
-    
-    if 'open downloads' in text:
-        downloads = os.path.expanduser('~/Downloads')
-        if IS_WINDOWS:
-            os.startfile(downloads)
-        else:
-            subprocess.Popen(['xdg-open', downloads])
-        return True, "Opening downloads folder."
-    
-    if 'open documents' in text:
-        docs = os.path.expanduser('~/Documents')
-        if IS_WINDOWS:
-            os.startfile(docs)
-        else:
-            subprocess.Popen(['xdg-open', docs])
-        return True, "Opening documents folder."
-    
-    if 'open desktop' in text:
-        desktop = os.path.expanduser('~/Desktop')
-        if IS_WINDOWS:
-            os.startfile(desktop)
-        else:
-            subprocess.Popen(['xdg-open', desktop])
-        return True, "Opening desktop folder."
+    if entry:
+        return run_open_command(entry)
     
     # === SCREENSHOT ===
     
-    if 'take screenshot' in text or 'take a screenshot' in text or 'capture screen' in text:
+    if utt.has_phrase('take screenshot', 'take a screenshot', 'capture screen'):
         return take_screenshot()
     
     # === VOLUME CONTROL ===
     
-    if 'volume up' in text or 'increase volume' in text:
+    if utt.has_phrase('volume up', 'increase volume'):
         return adjust_volume('up')
     
-    if 'volume down' in text or 'decrease volume' in text:
+    if utt.has_phrase('volume down', 'decrease volume'):
         return adjust_volume('down')
     
-    if 'mute' in text:
+    if utt.has_word('mute'):
         return adjust_volume('mute')
     
-    if 'unmute' in text:
+    if utt.has_word('unmute'):
         return adjust_volume('unmute')
     
     # === TIME/DATE COMMANDS ===
     
-    if 'what time is it' in text or 'current time' in text or "what's the time" in text:
+    if utt.has_phrase('what time is it', 'current time', "what's the time"):
         now = datetime.now()
         time_str = now.strftime("%I:%M %p")
         return True, f"It's {time_str}."
     
-    if 'what day is it' in text or "what's the date" in text or 'current date' in text or "what's today" in text:
+    if utt.has_phrase('what day is it', "what's the date", 'current date', "what's today"):
         now = datetime.now()
         date_str = now.strftime("%A, %B %d, %Y")
         return True, f"Today is {date_str}."
     
     # === SYSTEM INFO COMMANDS ===
     
-    if 'ip address' in text or 'my ip' in text:
+    if utt.has_phrase('ip address', 'my ip'):
         return get_ip_address()
     
-    if 'cpu temperature' in text or 'temperature' in text:
+    if utt.has_word('temperature'):
         return get_cpu_temp()
     
-    if 'battery' in text:
+    if utt.has_word('battery'):
         return get_battery_status()
     
+    if utt.has_phrase('service status', 'services status'):
+        return True, circuit_breaker.describe()
+    
     # === SYSTEM CONTROL ===
     
-    if 'lock screen' in text or 'lock computer' in text:
+    if utt.has_phrase('lock screen', 'lock computer'):
         if IS_WINDOWS:
             subprocess.run(['rundll32.exe', 'user32.dll,LockWorkStation'])
             return True, "Locking the screen."
         return True, "Lock not available on this system."
     
-    if 'shutdown' in text or 'shut down' in text:
+    if utt.has_phrase('shutdown', 'shut down'):
         return True, "Shutdown disabled for safety. Enable in code if needed."
     
-    if 'restart' in text or 'reboot' in text:
+    if utt.has_word('restart', 'reboot'):
         return True, "Restart disabled for safety. Enable in code if needed."
     
     # === CONVERSATION COMMANDS ===
     
-    if 'clear history' in text or 'forget everything' in text or 'start fresh' in text:
+    if utt.has_phrase('clear history', 'forget everything', 'start fresh'):
         if gpt:
             gpt.clear_history()
         return True, "Conversation cleared."
     
-    if 'help' in text or 'what can you do' in text:
+    if utt.has_word('help') or utt.has_phrase('what can you do'):
         return True, list_available_commands()
     
     # === NO COMMAND MATCHED ===
@@ -306,10 +350,10 @@ def get_ip_address():
     """Get local IP address"""
     try:
         import socket
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
+        # Connecting a UDP socket sends nothing - it only picks the outbound interface
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.connect(("8.8.8.8", 80))
+            ip = s.getsockname()[0]
         return True, f"Your IP address is {ip}."
     except:
         return True, "Couldn't get IP address."
@@ -343,9 +387,11 @@ def get_battery_status():
 
 def list_available_commands():
     """Return a summary of all available commands"""
-    return """Here's everything I can do:
+    websites = ', '.join(entry[3][len('Opening '):].rstrip('.')
+                         for entry in OPEN_COMMANDS if entry[1] == 'website')
+    return f"""Here's everything I can do:
 
-WEBSITES: Open YouTube, Google, Facebook, Twitter, GitHub, Instagram, LinkedIn, Reddit, WhatsApp, Gmail, Spotify, Netflix
+WEBSITES: Open {websites}
 
 APPS: Open calculator | Open notepad | Open terminal | Open file manager | Open settings
 
@@ -367,7 +413,7 @@ SCREEN: Take a screenshot | Lock screen
 
 VOLUME: Volume up | Volume down | Mute | Unmute
 
-SYSTEM: My IP address | Battery status | CPU temperature
+SYSTEM: My IP address | Battery status | CPU temperature | Service status
 
 LED (Pi only): Turn LED on/off | Blink LED | LED status
 
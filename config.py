@@ -12,10 +12,56 @@ PICOVOICE_ACCESS_KEY = os.getenv('PICOVOICE_ACCESS_KEY')
 WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', '')
 NEWS_API_KEY = os.getenv('NEWS_API_KEY', '')
 
+# Web service endpoints (overridable for local testing)
+WEATHER_API_URL = os.getenv('WEATHER_API_URL', "https://api.openweathermap.org/data/2.5/weather")
+NEWS_API_URL = os.getenv('NEWS_API_URL', "https://newsapi.org/v2/top-headlines")
+
+# OpenAI-compatible endpoint (None = api.openai.com). Point at the local
+# stand-in for offline runs: http://127.0.0.1:8089/v1 (see fake_openai.py)
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None
+
 # === MODEL SETTINGS ===
 GPT_MODEL = "gpt-5-nano"
-MAX_TOKENS = 150
+MAX_TOKENS = 150            # Output budget for an ordinary reply
 TEMPERATURE = 0.7
+STREAM_RESPONSES = True     # Print/speak GPT replies as they are generated
+
+# "server": chain turns with previous_response_id (only the new message is
+# uploaded); "stateless": resend SYSTEM_PROMPT + history every turn
+GPT_CONVERSATION_MODE = "server"
+GPT_LOG_TURNS = False       # Print bytes/tokens sent for every GPT turn
+GPT_TOOLS_ENABLED = True    # Let GPT run local commands as function tools
+
+# === REPLY LENGTH ===
+# Output-token limit and reasoning effort per reply class (reply_budget.py).
+# max_output_tokens includes reasoning tokens, so keep effort minimal for
+# short classes.
+ADAPTIVE_REPLY_LENGTH = True
+TINY_REPLY_MAX_WORDS = 8    # Longer questions are never "tiny"
+REPLY_BUDGETS = {
+    'tiny':   {'max_output_tokens': 48,  'reasoning': 'minimal'},   # Greetings, quick facts
+    'normal': {'max_output_tokens': MAX_TOKENS, 'reasoning': 'minimal'},
+    'detail': {'max_output_tokens': 600, 'reasoning': 'low'},       # "explain", "tell me about"
+}
+
+# === OPENAI CONNECTION ===
+GPT_POOL_SIZE = 4           # Keep-alive connections to the API
+GPT_KEEPALIVE_SECONDS = 120 # Idle connections stay open this long
+GPT_REWARM_AFTER = 30       # Idle seconds before prewarm() reconnects
+GPT_KEEP_WARM_FOR = 10 * 60 # Re-warm in the background this long after a request
+GPT_CONNECT_TIMEOUT = 3.0   # Seconds to open a connection
+GPT_READ_TIMEOUT = 20.0     # Seconds to wait on a response
+GPT_MAX_RETRIES = 1         # SDK retries for warm-up/summary requests
+
+# === GPT LATENCY BUDGET ===
+GPT_TURN_BUDGET = 10.0      # Seconds a chat answer may take to start
+GPT_VOICE_BUDGET = 5.0      # Same for spoken answers (wake mode)
+GPT_HEDGE_ENABLED = True    # Send a duplicate request when the first is slow
+GPT_HEDGE_PERCENTILE = 90   # ...slower than this percentile of recent TTFBs
+GPT_HEDGE_AFTER = 2.0       # Hedge delay until enough samples are recorded
+GPT_HEDGE_MIN_SAMPLES = 10
+GPT_MAX_ATTEMPTS = 3        # Requests per turn, hedges included
+GPT_RETRY_BACKOFF = 0.25    # Base retry delay (doubles, with jitter)
 
 # === SPEECH SETTINGS ===
 SPEECH_RATE = 150           # Words per minute
@@ -23,10 +69,44 @@ SPEECH_VOLUME = 0.9         # 0.0 to 1.0
 SPEECH_LANGUAGE = "en-US"
 
 # === RECOGNITION SETTINGS ===
-ENERGY_THRESHOLD = 300
+ENERGY_THRESHOLD = 300      # Starting speech threshold, before the microphone is calibrated
 PAUSE_THRESHOLD = 0.8
 LISTEN_TIMEOUT = 5          # Seconds
-PHRASE_TIME_LIMIT = 10      # Seconds
+PHRASE_TIME_LIMIT = 30      # Seconds - only a safety cap; the pause/VAD ends phrases
+
+# === MICROPHONE STREAM (kept open, calibrated in the background) ===
+MIC_SAMPLE_RATE = 16000
+MIC_CHUNK = 512             # Samples per read (32 ms)
+MIC_PREROLL = 0.3           # Seconds of audio from just before listen() that are kept
+MIC_TRAILING_SILENCE = 0.2  # Seconds of closing silence left on a phrase
+MIC_DYNAMIC_DAMPING = 0.15  # Noise floor tracking speed (fraction left after 1 s)
+MIC_DYNAMIC_RATIO = 1.5     # Speech threshold = noise floor x this
+MIC_MIN_THRESHOLD = 50      # Never trigger below this energy, however quiet the room
+MIC_SAVE_INTERVAL = 60      # Seconds between calibration saves
+
+# === VOICE ACTIVITY DETECTION (end of speech) ===
+VAD_ENABLED = True          # False: a phrase ends after PAUSE_THRESHOLD of quiet
+VAD_FRAME_MS = 20           # Analysis frame length
+VAD_ONSET_RATIO = 3.0       # Frame energy over the noise floor that starts speech
+VAD_ONSET_FRAMES = 3        # ...for this many frames in a row (ignores clicks)
+VAD_KEEP_RATIO = 1.8        # Lower energy ratio that keeps speech going
+VAD_FRICATIVE_ZCR = 0.3     # Quieter frames this hissy still count (s, f, th)
+VAD_MIN_HANGOVER = 0.25     # Seconds of non-speech that end a phrase, adapted
+VAD_MAX_HANGOVER = 0.8      # ...between these from the speaker's own pauses
+VAD_DEFAULT_HANGOVER = 0.8  # Until VAD_MIN_PAUSES pauses have been heard
+VAD_MIN_PAUSES = 5          # ...the hangover adapts after that many
+VAD_SHORT_SPEECH = 0.5      # Phrases shorter than this get the max hangover
+
+# === SPEECH-TO-TEXT BACKEND ===
+# "google": web API, recognizes the clip once you stop talking (default)
+# "vosk": on-device, decodes while you talk, no network needed
+#         (pip install vosk; unpack a model into VOSK_MODEL_PATH)
+STT_BACKEND = os.getenv("IVERI_STT_BACKEND", "google")
+STT_OFFLINE_FALLBACK = "vosk"   # Used while STT_BACKEND is down, if installed (None = type instead)
+STT_RACE = ()                   # e.g. ("google", "vosk"): recognize with all at once,
+                                # first answer this confident wins:
+STT_MIN_CONFIDENCE = 0.8
+STT_RACE_TIMEOUT = 5.0          # Seconds to wait for a confident answer
 
 # === WAKE WORD SETTINGS ===
 DEFAULT_WAKE_WORD = "alexa"  # Built-in fallback
@@ -38,14 +118,70 @@ DATA_DIR = os.path.join(PROJECT_DIR, "data")
 MODELS_DIR = os.path.join(PROJECT_DIR, "models")
 MEMORY_FILE = os.path.join(DATA_DIR, "memory.json")
 NOTES_FILE = os.path.join(DATA_DIR, "notes.json")
+RESPONSE_CACHE_FILE = os.path.join(DATA_DIR, "response_cache.json")
+WEATHER_CACHE_FILE = os.path.join(DATA_DIR, "weather_cache.json")
+NEWS_CACHE_FILE = os.path.join(DATA_DIR, "news_cache.json")
+MIC_CALIBRATION_FILE = os.path.join(DATA_DIR, "mic_calibration.json")
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", os.path.join(MODELS_DIR, "vosk-model-small-en-us-0.15"))
 
 # === GPIO PINS (Raspberry Pi) ===
 LED_PIN = 17
 BUTTON_PIN = 27
 BUZZER_PIN = 22
 
+# === INTENT SETTINGS ===
+INTENT_CONFIDENCE_THRESHOLD = 0.6   # Local classifier score needed to skip GPT
+ROUTE_CACHE_SIZE = 256              # Remembered utterance -> handler decisions
+
 # === CONVERSATION SETTINGS ===
-MAX_CONVERSATION_HISTORY = 10  # Number of message pairs to remember
+MAX_CONVERSATION_HISTORY = 10  # Hard cap on message pairs kept verbatim
+HISTORY_TOKEN_BUDGET = 600     # Approx. history tokens sent per request
+HISTORY_TOKEN_TARGET = 350     # ...compacted down to this, so it happens every few turns
+HISTORY_RECENT_TURNS = 2       # Newest exchanges never summarized
+HISTORY_MIN_FOLD_TURNS = 2     # Fewest exchanges worth a summary request
+HISTORY_SUMMARY_TOKENS = 200   # Output cap for the rolling summary
+
+# === RESPONSE CACHE (history-free GPT answers) ===
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_TTL = 24 * 3600     # Seconds before a cached answer expires
+RESPONSE_CACHE_SIZE = 500          # Max cached answers (least recently used go first)
+
+# === OUTBOUND HTTP (weather, news, other web lookups) ===
+HTTP_POOL_HOSTS = 8             # Hosts with a kept-alive connection pool
+HTTP_POOL_PER_HOST = 4          # Max open connections per host
+HTTP_CONNECT_TIMEOUT = 3.0      # Seconds to open a connection
+HTTP_READ_TIMEOUT = 8.0         # Seconds to wait for response data
+HTTP_RETRIES = 2                # Retries on connection errors and 429/5xx
+HTTP_RETRY_BACKOFF = 0.3        # Base retry delay (doubles per retry)
+COMPOUND_MAX_PARTS = 4          # Cities/categories fetched in parallel for one question
+
+# === CIRCUIT BREAKERS (per online service) ===
+# A failing or slow service is skipped (cache / local fallback answers)
+# until a background probe finds it healthy again
+BREAKER_FAILURES = 3            # Consecutive failures that open a breaker
+BREAKER_SLOW_CALLS = 3          # Consecutive calls over the latency objective that open it
+BREAKER_RESET_AFTER = 30.0      # Seconds open before probing the service
+BREAKER_SLO = {                 # Latency objective per service (seconds)
+    'weather': 3.0,             # OpenWeatherMap
+    'news': 3.0,                # NewsAPI
+    'speech': 4.0,              # Google speech recognition
+    'openai': 6.0,              # Time to first output
+}
+
+# === WEATHER CACHE (per city) ===
+WEATHER_CACHE_TTL = 10 * 60        # Seconds a reading is served without refreshing
+WEATHER_STALE_TTL = 3 * 3600       # Older readings are still spoken while refreshing in the background
+WEATHER_CACHE_SIZE = 50            # Max cities remembered
+
+# === NEWS PREFETCH (headlines served from memory) ===
+# NewsAPI's free tier allows 100 requests a day - keep intervals generous
+NEWS_PREFETCH_ENABLED = True
+NEWS_COUNTRY = "us"
+NEWS_PREFETCH_CATEGORIES = ['general']  # Kept warm from launch; others once asked for
+NEWS_REFRESH_INTERVAL = 3 * 3600   # Seconds between refreshes of each category
+NEWS_HOT_INTERVAL = 20 * 60        # ...of categories asked for recently
+NEWS_HOT_WINDOW = 6 * 3600         # How long an asked-for category stays "hot"
+NEWS_STALE_TTL = 12 * 3600         # Older headlines are re-fetched while the user waits
 
 # === ENSURE DIRECTORIES EXIST ===
 os.makedirs(DATA_DIR, exist_ok=True)
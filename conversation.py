@@ -0,0 +1,156 @@
+# conversation.py - Token-Budgeted Conversation History for IVERI AI
+# Recent turns stay verbatim; older ones are folded into a rolling summary
+# by a background thread, so request size stays flat over a long session.
+
+import threading
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English)"""
+    return len(text) // 4 + 1
+
+
+def _message_tokens(message):
+    # A few tokens of per-message overhead for role/formatting
+    return estimate_tokens(message["content"]) + 4
+
+
+def _turn_tokens(turn):
+    user, assistant = turn
+    return _message_tokens(user) + _message_tokens(assistant)
+
+
+class ConversationHistory:
+    """
+    Chat history kept under a token budget.
+
+    When the history grows past the budget, the oldest exchanges (never
+    the newest `recent_turns`) are handed to `summarize` on a background
+    thread - enough of them to bring it down to `target_tokens`, so the
+    next compaction is several turns away. Those turns stay in place
+    until the summary is ready, so the hot path never waits on it.
+    """
+
+    def __init__(self, summarize=None, token_budget=600, target_tokens=None, recent_turns=2,
+                 min_fold_turns=2, max_turns=10, on_compact=None):
+        """
+        Args:
+            summarize: fn(previous summary or "", [messages]) -> summary text
+            token_budget: Approximate tokens of history sent per request
+            target_tokens: What compaction shrinks the history to (default
+                           60% of the budget)
+            recent_turns: Newest exchanges that are never summarized
+            min_fold_turns: Fewest exchanges worth a summary request
+            max_turns: Hard cap on verbatim exchanges (the oldest quarter
+                       is dropped when it is exceeded)
+            on_compact: Called after history shrinks (summary or trim)
+        """
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.target_tokens = token_budget * 0.6 if target_tokens is None else target_tokens
+        self.recent_turns = recent_turns
+        self.min_fold_turns = max(1, min_fold_turns)
+        self.max_turns = max_turns
+        self.on_compact = on_compact
+        self.lock = threading.Lock()
+        self.turns = []          # [(user message, assistant message)]
+        self.summary = ""
+        self.generation = 0      # Bumped by clear() to discard stale summaries
+        self.summarizing = False
+
+    def add(self, user_input, ai_response):
+        """Append one exchange, compacting in the background if over budget"""
+        with self.lock:
+            self.turns.append((
+                {"role": "user", "content": user_input},
+                {"role": "assistant", "content": ai_response}
+            ))
+            trimmed = False
+            if len(self.turns) > self.max_turns:
+                # Summaries are falling behind (or disabled) - drop the oldest
+                keep = max(self.recent_turns, self.max_turns * 3 // 4)
+                self.turns = self.turns[-keep:]
+                trimmed = True
+            batch = self._summary_batch()
+            if batch:
+                self.summarizing = True
+                job = (self.generation, self.summary, batch)
+
+        if trimmed and self.on_compact:
+            self.on_compact()
+        if batch:
+            threading.Thread(target=self._summarize, args=job, daemon=True).start()
+
+    def _summary_batch(self):
+        """Oldest turns to fold so the rest fits target_tokens, or None"""
+        if self.summarize is None or self.summarizing:
+            return None
+        total = self._tokens()
+        if total <= self.token_budget:
+            return None
+        count = 0
+        while count < len(self.turns) - self.recent_turns and total > self.target_tokens:
+            total -= _turn_tokens(self.turns[count])
+            count += 1
+        # Too little to fold (the recent turns alone are long) - wait for more
+        if count < self.min_fold_turns:
+            return None
+        return list(self.turns[:count])
+
+    def _tokens(self):
+        total = estimate_tokens(self.summary) + 4 if self.summary else 0
+        return total + sum(_turn_tokens(turn) for turn in self.turns)
+
+    def _summarize(self, generation, previous, batch):
+        """Background job: fold `batch` into the rolling summary"""
+        messages = [m for turn in batch for m in turn]
+        try:
+            summary = self.summarize(previous, messages).strip()
+        except Exception as e:
+            print(f"History summary failed: {e}")
+            summary = ""
+
+        with self.lock:
+            self.summarizing = False
+            if not summary or generation != self.generation:
+                return
+            # Only drop turns that are still at the front of the history
+            done = 0
+            while done < len(batch) and done < len(self.turns) and self.turns[done] is batch[done]:
+                done += 1
+            self.turns = self.turns[done:]
+            self.summary = summary
+
+        if self.on_compact:
+            self.on_compact()
+
+    def messages(self):
+        """Summary (if any) + verbatim turns, ready to send"""
+        with self.lock:
+            messages = []
+            if self.summary:
+                messages.append({
+                    "role": "system",
+                    "content": f"Summary of the earlier conversation: {self.summary}"
+                })
+            for user, assistant in self.turns:
+                messages.extend((user, assistant))
+            return messages
+
+    def tokens(self):
+        """Approximate tokens the history adds to a request"""
+        with self.lock:
+            return self._tokens()
+
+    def clear(self):
+        with self.lock:
+            self.turns = []
+            self.summary = ""
+            self.generation += 1
+            self.summarizing = False
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __bool__(self):
+        return bool(self.turns or self.summary)
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# fake_openai.py - Local OpenAI-Compatible Stand-In Server for IVERI AI
+# Speaks the Responses API wire format (JSON and SSE streaming) with
+# configurable latency, token rate, errors and replies, so gpt.py can be
+# tested and benchmarked without an API key or network.
+#
+#   python fake_openai.py --port 8089 --ttfb 0.4 --tps 40 --error-rate 0.05
+#   OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=sk-fake python main.py
+
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "This is a reply from the local test server."
+
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def _estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+def _user_text(body):
+    """Text of the newest user message in a Responses API request"""
+    items = body.get('input', '')
+    if isinstance(items, str):
+        return items
+    for item in reversed(items):
+        if item.get('role') != 'user':
+            continue
+        content = item.get('content', '')
+        if isinstance(content, str):
+            return content
+        return " ".join(part.get('text', '') for part in content if isinstance(part, dict))
+    return ""
+
+
+class FakeOpenAIServer:
+    """
+    Threaded stand-in for the OpenAI Responses API.
+
+    Replies are picked in order: the first `replies` pattern found in the
+    user's message, then the next line of `script`, then DEFAULT_REPLY.
+    A reply may also be a function call: {'tool': name, 'arguments': {...}}.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, ttfb=0.2, tokens_per_second=50,
+                 error_rate=0.0, error_status=500, slow_rate=0.0, slow_ttfb=3.0,
+                 replies=None, script=None, seed=None):
+        """
+        Args:
+            host, port: Address to bind (port 0 picks a free one)
+            ttfb: Seconds before the first byte/token
+            tokens_per_second: Streaming rate (0 = send all at once)
+            error_rate: Fraction of requests answered with `error_status`
+            slow_rate: Fraction of requests delayed by `slow_ttfb` instead
+            replies: {substring of user message: reply}
+            script: Replies returned in order, one per request
+            seed: Seed for reproducible error/slow draws
+        """
+        self.ttfb = ttfb
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.slow_rate = slow_rate
+        self.slow_ttfb = slow_ttfb
+        self.replies = {k.lower(): v for k, v in (replies or {}).items()}
+        self.script = list(script or [])
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.stored = set()            # Response ids usable as previous_response_id
+        self.open_calls = {}           # Response id -> call ids still owed an output
+        self.seen_instructions = set() # For simulated prompt-cache hits
+        self.requests = []             # Request bodies, oldest first
+        self.stats = {'requests': 0, 'streamed': 0, 'errors': 0, 'slow': 0}
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve in a background thread; returns self"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- behaviour ---
+
+    def pick_reply(self, body):
+        text = _user_text(body).lower()
+        with self.lock:
+            for pattern, reply in self.replies.items():
+                if pattern in text:
+                    return reply
+            if self.script:
+                return self.script.pop(0)
+        return DEFAULT_REPLY
+
+    def draw(self):
+        """Decide this request's fate: ('error'|'ok', ttfb seconds)"""
+        with self.lock:
+            if self.random.random() < self.error_rate:
+                self.stats['errors'] += 1
+                return 'error', self.ttfb
+            if self.random.random() < self.slow_rate:
+                self.stats['slow'] += 1
+                return 'ok', self.slow_ttfb
+        return 'ok', self.ttfb
+
+    def build_response(self, body, reply):
+        """Response object in the Responses API format (honours max_output_tokens)"""
+        call = reply if isinstance(reply, dict) else None
+        text = "" if call else reply
+        tokens = _TOKEN_RE.findall(text)
+        limit = body.get('max_output_tokens')
+        status, incomplete = 'completed', None
+        if limit and len(tokens) > limit:
+            text = "".join(tokens[:limit])
+            status, incomplete = 'incomplete', {'reason': 'max_output_tokens'}
+
+        response_id = f"resp_fake{next(self.ids)}"
+        instructions = body.get('instructions') or ""
+        if call:
+            item = {
+                'type': 'function_call', 'id': f"fc_{response_id}", 'call_id': f"call_{response_id}",
+                'name': call['tool'], 'arguments': json.dumps(call.get('arguments', {})),
+                'status': 'completed',
+            }
+        else:
+            item = {
+                'type': 'message', 'id': f"msg_{response_id}", 'status': 'completed', 'role': 'assistant',
+                'content': [{'type': 'output_text', 'text': text, 'annotations': []}],
+            }
+        with self.lock:
+            if body.get('store', True):
+                self.stored.add(response_id)
+                if call:
+                    self.open_calls[response_id] = [item['call_id']]
+            cached = _estimate_tokens(instructions) if instructions in self.seen_instructions else 0
+            if instructions:
+                self.seen_instructions.add(instructions)
+        output_tokens = min(len(tokens), limit or len(tokens)) + (len(item.get('arguments', '')) // 4)
+        input_tokens = _estimate_tokens(json.dumps(body.get('input', ''))) + _estimate_tokens(instructions)
+        return {
+            'id': response_id,
+            'object': 'response',
+            'created_at': int(time.time()),
+            'status': status,
+            'incomplete_details': incomplete,
+            'model': body.get('model', 'fake'),
+            'instructions': body.get('instructions'),
+            'previous_response_id': body.get('previous_response_id'),
+            'output': [item],
+            'parallel_tool_calls': True,
+            'tool_choice': 'auto',
+            'tools': body.get('tools', []),
+            'usage': {
+                'input_tokens': input_tokens,
+                'input_tokens_details': {'cached_tokens': cached},
+                'output_tokens': output_tokens,
+                'output_tokens_details': {'reasoning_tokens': 0},
+                'total_tokens': input_tokens + output_tokens,
+            },
+        }
+
+    # --- HTTP ---
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _json(self, status, payload):
+                data = json.dumps(payload).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (e.g. lost a hedged race)
+                    self.close_connection = True
+
+            def _error(self, status, message, code=None):
+                self._json(status, {'error': {
+                    'message': message, 'type': 'invalid_request_error' if status < 500 else 'server_error',
+                    'param': None, 'code': code,
+                }})
+
+            def do_GET(self):
+                match = re.match(r"^/v1/models/([^/?]+)", self.path)
+                if match:
+                    self._json(200, {'id': match.group(1), 'object': 'model', 'created': 0, 'owned_by': 'fake'})
+                elif self.path.startswith('/v1/models'):
+                    self._json(200, {'object': 'list', 'data': []})
+                else:
+                    self._error(404, f"Unknown path {self.path}")
+
+            def do_POST(self):
+                if not self.path.startswith('/v1/responses'):
+                    self._error(404, f"Unknown path {self.path}")
+                    return
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._error(400, "Invalid JSON body")
+                    return
+
+                with server.lock:
+                    server.stats['requests'] += 1
+                    server.requests.append(body)
+                    previous = body.get('previous_response_id')
+                    known = previous is None or previous in server.stored
+                    owed = server.open_calls.get(previous, [])
+                    items = body.get('input') if isinstance(body.get('input'), list) else []
+                    answered = {i.get('call_id') for i in items if i.get('type') == 'function_call_output'}
+                    missing = [call_id for call_id in owed if call_id not in answered]
+
+                if not known:
+                    self._error(400, f"Previous response with id '{previous}' not found.",
+                                code='previous_response_not_found')
+                    return
+                if missing:
+                    self._error(400, f"No tool output found for function call {missing[0]}.")
+                    return
+
+                fate, ttfb = server.draw()
+                time.sleep(ttfb)
+                if fate == 'error':
+                    self._error(server.error_status, "Simulated failure from fake_openai")
+                    return
+
+                text = server.pick_reply(body)
+                if body.get('stream'):
+                    with server.lock:
+                        server.stats['streamed'] += 1
+                    self._stream(body, text)
+                else:
+                    response = server.build_response(body, text)
+                    if server.tokens_per_second:
+                        # Generation time for the whole reply
+                        time.sleep(response['usage']['output_tokens'] / server.tokens_per_second)
+                    self._json(200, response)
+
+            def _stream(self, body, text):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Connection', 'keep-alive')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+                sequence = itertools.count()
+                final = server.build_response(body, text)
+                item = final['output'][0]
+                pending = dict(final, status='in_progress', output=[], usage=None)
+                item_id = item['id']
+                delay = 1.0 / server.tokens_per_second if server.tokens_per_second else 0
+
+                def send(event):
+                    event['sequence_number'] = next(sequence)
+                    data = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode('utf-8')
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                    self.wfile.flush()
+
+                part = {'type': 'output_text', 'text': '', 'annotations': []}
+                where = {'item_id': item_id, 'output_index': 0, 'content_index': 0}
+                try:
+                    send({'type': 'response.created', 'response': pending})
+                    send({'type': 'response.in_progress', 'response': pending})
+                    if item['type'] == 'function_call':
+                        send({'type': 'response.output_item.added', 'output_index': 0,
+                              'item': dict(item, arguments='', status='in_progress')})
+                        send({'type': 'response.function_call_arguments.delta', 'item_id': item_id,
+                              'output_index': 0, 'delta': item['arguments']})
+                        send({'type': 'response.function_call_arguments.done', 'item_id': item_id,
+                              'output_index': 0, 'name': item['name'], 'arguments': item['arguments']})
+                    else:
+                        text = item['content'][0]['text']
+                        send({'type': 'response.output_item.added', 'output_index': 0,
+                              'item': dict(item, status='in_progress', content=[])})
+                        send({'type': 'response.content_part.added', 'part': part, **where})
+                        for i, token in enumerate(_TOKEN_RE.findall(text)):
+                            if i and delay:
+                                time.sleep(delay)
+                            send({'type': 'response.output_text.delta', 'delta': token, 'logprobs': [], **where})
+                        send({'type': 'response.output_text.done', 'text': text, 'logprobs': [], **where})
+                        send({'type': 'response.content_part.done', 'part': dict(part, text=text), **where})
+                    send({'type': 'response.output_item.done', 'output_index': 0, 'item': item})
+                    done = 'response.completed' if final['status'] == 'completed' else 'response.incomplete'
+                    send({'type': done, 'response': final})
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (e.g. lost a hedged race)
+                    self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI Responses API stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--ttfb', type=float, default=0.2, help="seconds before the first token")
+    parser.add_argument('--tps', type=float, default=50, help="streamed tokens per second (0 = all at once)")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--slow-rate', type=float, default=0.0, help="fraction of requests using --slow-ttfb")
+    parser.add_argument('--slow-ttfb', type=float, default=3.0)
+    parser.add_argument('--replies', help="JSON file: {substring: reply}")
+    parser.add_argument('--script', help="text file: one reply per line, served in order")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    replies = None
+    if args.replies:
+        with open(args.replies, 'r') as f:
+            replies = json.load(f)
+    script = None
+    if args.script:
+        with open(args.script, 'r') as f:
+            script = [line.rstrip('\n') for line in f if line.strip()]
+
+    server = FakeOpenAIServer(
+        host=args.host, port=args.port, ttfb=args.ttfb, tokens_per_second=args.tps,
+        error_rate=args.error_rate, error_status=args.error_status,
+        slow_rate=args.slow_rate, slow_ttfb=args.slow_ttfb,
+        replies=replies, script=script, seed=args.seed
+    )
+    print(f"Fake OpenAI server on {server.base_url}")
+    print(f"Run IVERI with: OPENAI_BASE_URL={server.base_url} OPENAI_API_KEY=sk-fake")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
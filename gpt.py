@@ -1,11 +1,27 @@
 # gpt.py - OpenAI GPT Integration for IVERI AI
 # Uses gpt-5-nano with Responses API
 
+import asyncio
+import json
 import os
-from openai import OpenAI
+import random
+from collections import deque
 
-# Initialize OpenAI client
-client = OpenAI()
+import httpx
+import openai
+
+import circuit_breaker
+import config
+import reply_budget
+from conversation import ConversationHistory
+from latency import LatencyStats
+from openai_client import OpenAIPool
+from response_cache import ResponseCache, prompt_hash, time_relative
+from singleflight import AsyncSingleFlight
+
+# Warm, pooled async client on its own event loop (see openai_client.py)
+pool = OpenAIPool()
+client = pool.client
 
 # IVERI's system prompt - OPTIMIZED for concise, accurate responses
 SYSTEM_PROMPT = """You are IVERI, an advanced intelligent voice-first AI assistant.
@@ -39,6 +55,7 @@ Examples:
 "Could you pull up YouTube?" → "Opening YouTube."
 "I want to see my downloads." → "Opening downloads."
 "Turn the light off." → "Turning off the light."
+- When a tool can carry out the action, call the tool instead of only confirming.
 
 CONVERSATION STYLE:
 - Calm, confident, professional.
@@ -74,63 +91,662 @@ Return only the spoken sentence.
 No extra text.
 """
 
-# Conversation history for context
-conversation_history = []
-MAX_HISTORY = 6  # Keep last 6 exchanges only
+# Cached answers are tied to this exact prompt
+PROMPT_HASH = prompt_hash(SYSTEM_PROMPT)
+
+# On-disk cache for history-free questions
+response_cache = ResponseCache(
+    config.RESPONSE_CACHE_FILE,
+    ttl=config.RESPONSE_CACHE_TTL,
+    max_entries=config.RESPONSE_CACHE_SIZE
+)
+# Answers made under an older SYSTEM_PROMPT are stale
+response_cache.invalidate(keep_prompt=PROMPT_HASH)
+
+# Identical history-free questions in flight at once share one request
+flight = AsyncSingleFlight()
+
+
+def _probe_openai():
+    """Breaker health check - the cheapest authenticated request"""
+    pool.run(client.with_options(max_retries=0, timeout=config.GPT_CONNECT_TIMEOUT * 2)
+             .models.retrieve(config.GPT_MODEL))
+
+
+# While OpenAI is failing or too slow, turns get the cached/late reply at once
+openai_breaker = circuit_breaker.get('openai', probe=_probe_openai)
+
+FALLBACK_REPLY = "Sorry, I had trouble processing that. Please try again."
+LATE_REPLY = "Sorry, I can't reach my online brain right now. Please try again in a moment."
+
+# Used off the hot path to fold old turns into a rolling summary
+SUMMARY_PROMPT = """Summarize this conversation between a user and the voice assistant IVERI.
+Use at most three short sentences of plain text.
+Keep names, facts the user stated, and any topic still being discussed."""
 
+# === SERVER-SIDE CONVERSATION STATE ===
+# In "server" mode a turn uploads only the new message and points at the
+# previous stored response. SYSTEM_PROMPT goes in `instructions`, byte for
+# byte the same every turn, so the provider's prompt cache can reuse it.
+last_response_id = None
+chain_outdated = False       # History was compacted - restart the chain next turn
+turn_log = deque(maxlen=50)  # Per-turn request size / token usage
+
+# === FUNCTION TOOLS ===
+# Local actions the model may call (main.py registers the router's tools).
+# A call is executed here and its result spoken - no second model round-trip.
+tool_schemas = []
+tool_runner = None
+pending_tool_outputs = []   # Call results the stored chain expects next turn
+TOOL_FAILED_REPLY = "I couldn't do that."
+
+# === DEADLINES & HEDGING ===
+# Each turn has a latency budget. If the first request is slower than
+# usual to produce output, a duplicate goes out and the first to answer
+# wins; failures are retried with jittered backoff while time remains.
+HEDGE_FLOOR = 0.25          # Never hedge sooner than this (seconds)
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,   # Includes timeouts
+    openai.RateLimitError,
+    openai.InternalServerError,
+    RuntimeError,                # Stream reported a failure
+)
+
+ttfb_latency = LatencyStats()   # Request start -> first output, per attempt
+turn_latency = LatencyStats()   # Turn start -> first output the user gets
+latency_counts = {"hedged": 0, "hedge_wins": 0, "retries": 0, "deadline_misses": 0}
+
+
+# Stream events that end a response ("incomplete" = hit max_output_tokens)
+DONE_EVENTS = ("response.completed", "response.incomplete")
+
+
+class DeadlineExceeded(Exception):
+    """No answer started within the turn's latency budget"""
+
+
+def _summarize(summary, messages):
+    """Fold old turns into the rolling summary (runs in a background thread)"""
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    if summary:
+        transcript = f"Earlier summary: {summary}\n{transcript}"
+    
+    response = pool.run(client.responses.create(
+        model=config.GPT_MODEL,
+        instructions=SUMMARY_PROMPT,
+        input=transcript,
+        store=False,
+        max_output_tokens=config.HISTORY_SUMMARY_TOKENS,
+        reasoning={"effort": "minimal"}
+    ))
+    return response.output_text
 
-def get_response(user_input, use_history=True):
+
+def _history_compacted():
+    # The stored chain still holds the folded turns verbatim - restart it
+    # from the summary on the next turn. (Resetting now would be undone by
+    # a turn already in flight, which records its response id when done.)
+    global chain_outdated
+    chain_outdated = True
+
+
+# Conversation history for context - kept under a token budget
+conversation_history = ConversationHistory(
+    summarize=_summarize,
+    token_budget=config.HISTORY_TOKEN_BUDGET,
+    target_tokens=config.HISTORY_TOKEN_TARGET,
+    recent_turns=config.HISTORY_RECENT_TURNS,
+    min_fold_turns=config.HISTORY_MIN_FOLD_TURNS,
+    max_turns=config.MAX_CONVERSATION_HISTORY,
+    on_compact=_history_compacted
+)
+
+
+def register_tools(schemas, runner):
     """
-    Get a response from GPT-5-nano for the given input.
+    Expose local actions to the model.
     
     Args:
-        user_input: The user's message
-        use_history: Whether to use conversation history
-        
+        schemas: Function tool definitions (see router.Router.tool_schemas)
+        runner: Callable(name, arguments) -> (handled, response)
+    """
+    global tool_schemas, tool_runner
+    tool_schemas = list(schemas)
+    tool_runner = runner
+
+
+def _build_messages(user_input, use_history):
+    """System prompt + recent history + the new user message"""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    
+    if use_history and conversation_history:
+        # Summary of older turns + recent turns verbatim
+        messages.extend(conversation_history.messages())
+    
+    messages.append({"role": "user", "content": user_input})
+    return messages
+
+
+def _request_args(user_input, use_history):
+    """Build responses.create arguments for the configured conversation mode"""
+    # Output-token limit and reasoning effort sized to the question
+    budget = reply_budget.request_options(user_input)
+    # Actions only for conversation turns, never one-off prompts
+    if use_history and config.GPT_TOOLS_ENABLED and tool_schemas:
+        budget["tools"] = tool_schemas
+    
+    if config.GPT_CONVERSATION_MODE != 'server':
+        return {
+            "model": config.GPT_MODEL,
+            "input": _build_messages(user_input, use_history),
+            **budget
+        }
+    
+    args = {
+        "model": config.GPT_MODEL,
+        "instructions": SYSTEM_PROMPT,
+        "store": use_history,
+        **budget
+    }
+    message = {"role": "user", "content": user_input}
+    
+    if use_history and chain_outdated:
+        _reset_chain()
+    if use_history and last_response_id:
+        # Continue the stored chain - only the new message is sent
+        # (plus the results of last turn's tool calls)
+        args["previous_response_id"] = last_response_id
+        args["input"] = pending_tool_outputs + [message]
+    elif use_history:
+        # Start a chain (first turn, or after the chain was lost)
+        args["input"] = conversation_history.messages() + [message]
+    else:
+        args["input"] = [message]
+    return args
+
+
+async def _send(user_input, use_history, stream=False, connect_timeout=None):
+    """
+    Call the Responses API, falling back to a stateless request if the
+    stored chain is no longer available. Retries are left to _race().
+    
+    Args:
+        connect_timeout: Seconds to open a connection (default
+                         config.GPT_CONNECT_TIMEOUT); reads always get
+                         config.GPT_READ_TIMEOUT, so a slow stream isn't
+                         cut off once it has started
+    
     Returns:
-        The AI's response as a string
+        tuple: (request args, response or event stream)
     """
-    global conversation_history
+    extra = {"stream": True} if stream else {}
+    connect = config.GPT_CONNECT_TIMEOUT
+    if connect_timeout is not None:
+        connect = min(connect, connect_timeout)
+    api = client.with_options(max_retries=0,
+                              timeout=httpx.Timeout(config.GPT_READ_TIMEOUT, connect=connect))
+    args = _request_args(user_input, use_history)
+    try:
+        return args, await api.responses.create(**args, **extra)
+    except (openai.BadRequestError, openai.NotFoundError) as e:
+        if "previous_response_id" not in args:
+            raise
+        print(f"GPT chain lost ({e}) - resending history")
+        _reset_chain()
+        args = _request_args(user_input, use_history)
+        return args, await api.responses.create(**args, **extra)
+
+
+async def _attempt(user_input, use_history, stream, timeout, label):
+    """
+    One request, run until it produces its first output.
+    
+    `timeout` bounds only the wait for that first output; the rest of a
+    stream is read with the client's normal read timeout.
+    
+    Returns:
+        tuple: (request args, response or open stream, events read so far,
+        timing record)
+    """
+    timing = pool.start_timing(label)
+    response = None
+    events = []
+    
+    async def first_output():
+        nonlocal response
+        args, response = await _send(user_input, use_history, stream, timeout)
+        if stream:
+            while True:
+                try:
+                    event = await response.__anext__()
+                except StopAsyncIteration:
+                    break
+                events.append(event)
+                if event.type in ("response.failed", "error"):
+                    raise RuntimeError(getattr(event, "message", None) or event.type)
+                if event.type == "response.output_text.delta" or event.type in DONE_EVENTS:
+                    break
+                if event.type == "response.output_item.added" and event.item.type == "function_call":
+                    break
+        return args
     
     try:
-        # Build messages
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        
-        if use_history and conversation_history:
-            # Add recent history only
-            messages.extend(conversation_history[-MAX_HISTORY:])
-        
-        messages.append({"role": "user", "content": user_input})
-        
-        # Call OpenAI API with Responses API
-        response = client.responses.create(
-            model="gpt-5-nano",
-            input=messages
+        args = await asyncio.wait_for(first_output(), max(timeout, 0))
+        pool.first_token(timing)
+        ttfb_latency.add(timing["ttfb"])
+        return args, response, events, timing
+    except BaseException:
+        # Failed or lost the race - release the connection
+        pool.finish_timing(timing, ok=False)
+        if stream and response is not None:
+            await response.close()
+        raise
+
+
+def _hedge_delay():
+    """Seconds to wait for a first token before sending a duplicate"""
+    if len(ttfb_latency) < config.GPT_HEDGE_MIN_SAMPLES:
+        return config.GPT_HEDGE_AFTER
+    return max(ttfb_latency.percentile(config.GPT_HEDGE_PERCENTILE), HEDGE_FLOOR)
+
+
+def _abandon(task):
+    """Cancel a losing attempt, closing its stream if it already opened one"""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled() and task.exception() is None:
+        response = task.result()[1]
+        if hasattr(response, "close"):
+            asyncio.ensure_future(response.close())
+
+
+async def _race(user_input, use_history, stream, deadline):
+    """
+    Get a first output before `deadline` (event loop time), hedging a slow
+    request once and retrying failed ones with jittered backoff.
+    
+    Returns:
+        The winning _attempt() result
+    
+    Raises:
+        DeadlineExceeded, or the last error if it can't be retried
+    """
+    loop = asyncio.get_running_loop()
+    hedge_at = loop.time() + _hedge_delay() if config.GPT_HEDGE_ENABLED else None
+    running = set()
+    hedges = set()
+    attempts = 0
+    error = None
+    
+    def launch(label):
+        nonlocal attempts
+        attempts += 1
+        task = asyncio.ensure_future(
+            _attempt(user_input, use_history, stream, deadline - loop.time(), label)
         )
+        running.add(task)
+        return task
+    
+    launch("stream" if stream else "response")
+    try:
+        while True:
+            if running:
+                timeout = deadline - loop.time()
+                if hedge_at is not None:
+                    timeout = min(timeout, hedge_at - loop.time())
+                done, _ = await asyncio.wait(
+                    running, timeout=max(timeout, 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    running.discard(task)
+                    if task.exception() is None:
+                        if task in hedges:
+                            latency_counts["hedge_wins"] += 1
+                        for other in done - {task}:
+                            _abandon(other)
+                        return task.result()
+                    error = task.exception()
+                    print(f"GPT attempt failed: {error}")
+            
+            if loop.time() >= deadline:
+                raise DeadlineExceeded(error)
+            
+            if running:
+                # Still waiting on the first token - send a duplicate
+                if hedge_at is not None and loop.time() >= hedge_at:
+                    hedge_at = None
+                    latency_counts["hedged"] += 1
+                    hedges.add(launch("hedge"))
+                continue
+            
+            # Every attempt so far failed
+            if not isinstance(error, RETRYABLE_ERRORS) or attempts >= config.GPT_MAX_ATTEMPTS:
+                raise error
+            delay = config.GPT_RETRY_BACKOFF * 2 ** (attempts - 1) * random.uniform(0.5, 1.5)
+            if loop.time() + delay >= deadline:
+                raise DeadlineExceeded(error)
+            await asyncio.sleep(delay)
+            latency_counts["retries"] += 1
+            hedge_at = None
+            launch("retry")
+    finally:
+        for task in running:
+            _abandon(task)
+
+
+async def _replay(events, stream):
+    """Events already read by _attempt(), then the rest of the stream"""
+    for event in events:
+        yield event
+    if events and events[-1].type in DONE_EVENTS:
+        return
+    async for event in stream:
+        yield event
+
+
+def _late_reply(user_input):
+    """Fast local answer when the deadline passes - a cached one if we have it"""
+    cached = None
+    if config.RESPONSE_CACHE_ENABLED:
+        cached = response_cache.get(config.GPT_MODEL, PROMPT_HASH, user_input)
+    return cached or LATE_REPLY
+
+
+def _record_turn(args, response):
+    """Log request size and token usage, and advance the stored chain"""
+    global last_response_id
+    
+    usage = getattr(response, "usage", None)
+    details = getattr(usage, "input_tokens_details", None)
+    stats = {
+        "mode": config.GPT_CONVERSATION_MODE,
+        "chained": "previous_response_id" in args,
+        "bytes_sent": len(json.dumps(args).encode("utf-8")),
+        "input_tokens": getattr(usage, "input_tokens", None),
+        "cached_tokens": getattr(details, "cached_tokens", None),
+        "output_tokens": getattr(usage, "output_tokens", None),
+    }
+    turn_log.append(stats)
+    # Any owed tool results went out with this request
+    pending_tool_outputs.clear()
+    if config.GPT_LOG_TURNS:
+        print(f"[gpt] {stats['mode']} turn: {stats['bytes_sent']} bytes, "
+              f"{stats['input_tokens']} input tokens ({stats['cached_tokens']} cached)")
+    
+    if args.get("store"):
+        last_response_id = getattr(response, "id", None)
+
+
+def _reset_chain():
+    """Forget the stored response chain - the next turn resends history"""
+    global last_response_id, chain_outdated
+    last_response_id = None
+    chain_outdated = False
+    pending_tool_outputs.clear()
+
+
+def get_turn_stats():
+    """Return recent per-turn request sizes and token counts"""
+    return list(turn_log)
+
+
+def get_timings():
+    """Return recent per-request phase timings (connect, TTFB, total)"""
+    return pool.get_timings()
+
+
+def get_latency_report():
+    """Tail latency (p50/p90/p99/max seconds) plus hedge/retry/deadline counts"""
+    return {
+        "ttfb": ttfb_latency.summary(),
+        "turn": turn_latency.summary(),
+        **latency_counts,
+        "coalesced": flight.stats()["deduped"],
+        "breaker": openai_breaker.status()
+    }
+
+
+def prewarm():
+    """Open an API connection in the background if the pool has gone cold"""
+    return pool.prewarm()
+
+
+def keep_warm():
+    """Keep the pool warm in the background between turns (see OpenAIPool.keep_warm)"""
+    pool.keep_warm()
+
+
+async def _run_tools(calls, response_id):
+    """Execute the model's function calls locally -> reply text to speak"""
+    replies = []
+    for call in calls:
+        handled, result = False, None
+        if tool_runner is not None:
+            # Handlers may block (launching apps, weather lookups)
+            handled, result = await asyncio.to_thread(tool_runner, call.name, call.arguments)
+        reply = result if handled and result else TOOL_FAILED_REPLY
+        replies.append(reply)
+        if response_id is not None and response_id == last_response_id:
+            pending_tool_outputs.append({
+                "type": "function_call_output",
+                "call_id": call.call_id,
+                "output": reply
+            })
+    return " ".join(replies)
+
+
+def _remember(user_input, ai_response):
+    """Append one exchange to history (compacted in the background)"""
+    conversation_history.add(user_input, ai_response)
+
+
+def _cacheable(user_input, use_history):
+    """
+    Only history-free turns (a follow-up depends on the conversation) whose
+    answer doesn't depend on the date ("who won last night")
+    """
+    return (config.RESPONSE_CACHE_ENABLED and not (use_history and conversation_history)
+            and not time_relative(user_input))
+
+
+def _cached_reply(user_input, use_history):
+    """Return a cached answer (recording it in history), or None"""
+    if not _cacheable(user_input, use_history):
+        return None
+    cached = response_cache.get(config.GPT_MODEL, PROMPT_HASH, user_input)
+    if cached is not None and use_history:
+        _remember(user_input, cached)
+        # The server never saw this exchange - restart the chain from history
+        _reset_chain()
+    return cached
+
+
+async def _get_response(user_input, use_history=True, budget=None):
+    """Full reply as a string (runs on the client loop)"""
+    cached = _cached_reply(user_input, use_history)
+    if cached is not None:
+        return cached
+    cacheable = _cacheable(user_input, use_history)
+    if not openai_breaker.allow():
+        return _late_reply(user_input)
+    
+    budget = budget or config.GPT_TURN_BUDGET
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        # Call OpenAI API with Responses API
+        args, response, _, timing = await _race(user_input, use_history, False, started + budget)
+        first_output = loop.time() - started
+        turn_latency.add(first_output)
+        openai_breaker.record(True, first_output)
+        _record_turn(args, response)
         
         # Get response text
         ai_response = response.output_text.strip()
+        if getattr(response, "status", None) == "incomplete":
+            # Hit the output budget - don't speak half a sentence
+            ai_response = reply_budget.trim_incomplete(ai_response)
+        
+        # The model chose a local action - run it and speak its result
+        calls = [item for item in response.output or [] if item.type == "function_call"]
+        if calls:
+            tool_reply = await _run_tools(calls, response.id)
+            ai_response = f"{ai_response} {tool_reply}".strip()
+            cacheable = False
+        
+        if cacheable and ai_response:
+            response_cache.put(config.GPT_MODEL, PROMPT_HASH, user_input, ai_response)
         
         # Update history
         if use_history:
-            conversation_history.append({"role": "user", "content": user_input})
-            conversation_history.append({"role": "assistant", "content": ai_response})
-            
-            # Trim history if too long
-            if len(conversation_history) > MAX_HISTORY * 2:
-                conversation_history = conversation_history[-MAX_HISTORY * 2:]
+            _remember(user_input, ai_response)
         
+        pool.finish_timing(timing)
         return ai_response
+    
+    except DeadlineExceeded:
+        latency_counts["deadline_misses"] += 1
+        turn_latency.add(loop.time() - started)
+        openai_breaker.record(False, error=f"missed the {budget:.1f}s deadline")
+        print(f"GPT missed the {budget:.1f}s deadline")
+        return _late_reply(user_input)
         
     except Exception as e:
+        if isinstance(e, RETRYABLE_ERRORS):
+            openai_breaker.record(False, error=e)
         print(f"GPT Error: {e}")
-        return "Sorry, I had trouble processing that. Please try again."
+        return FALLBACK_REPLY
+
+
+async def _stream_response(user_input, use_history=True, budget=None):
+    """Reply as text chunks (runs on the client loop)"""
+    cached = _cached_reply(user_input, use_history)
+    if cached is not None:
+        yield cached
+        return
+    cacheable = _cacheable(user_input, use_history)
+    if not openai_breaker.allow():
+        yield _late_reply(user_input)
+        return
+    
+    budget = budget or config.GPT_TURN_BUDGET
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    timing = None
+    parts = []
+    calls = []
+    response_id = None
+    incomplete = False
+    try:
+        args, stream, events, timing = await _race(user_input, use_history, True, started + budget)
+        first_output = loop.time() - started
+        turn_latency.add(first_output)
+        openai_breaker.record(True, first_output)
+        
+        async for event in _replay(events, stream):
+            if event.type == "response.output_text.delta":
+                parts.append(event.delta)
+                yield event.delta
+            elif event.type == "response.output_item.done" and event.item.type == "function_call":
+                calls.append(event.item)
+            elif event.type in DONE_EVENTS:
+                incomplete = event.type == "response.incomplete"
+                response_id = event.response.id
+                _record_turn(args, event.response)
+            elif event.type in ("response.failed", "error"):
+                raise RuntimeError(getattr(event, "message", None) or event.type)
+        
+        if calls:
+            # The model chose a local action - run it and speak its result
+            tool_reply = await _run_tools(calls, response_id)
+            tool_reply = f" {tool_reply}" if parts else tool_reply
+            parts.append(tool_reply)
+            cacheable = False
+            yield tool_reply
+        
+        ai_response = "".join(parts).strip()
+        if incomplete:
+            # Already spoken, but keep the half sentence out of history/cache
+            ai_response = reply_budget.trim_incomplete(ai_response)
+        if cacheable and ai_response:
+            response_cache.put(config.GPT_MODEL, PROMPT_HASH, user_input, ai_response)
+        if use_history:
+            _remember(user_input, ai_response)
+        pool.finish_timing(timing)
+    
+    except DeadlineExceeded:
+        latency_counts["deadline_misses"] += 1
+        turn_latency.add(loop.time() - started)
+        openai_breaker.record(False, error=f"missed the {budget:.1f}s deadline")
+        print(f"GPT missed the {budget:.1f}s deadline")
+        yield _late_reply(user_input)
+    
+    except Exception as e:
+        if timing is not None:
+            pool.finish_timing(timing, ok=False)
+        if isinstance(e, RETRYABLE_ERRORS):
+            openai_breaker.record(False, error=e)
+        print(f"GPT Error: {e}")
+        if not parts:
+            yield FALLBACK_REPLY
+
+
+async def _coalesced_response(user_input, use_history=True, budget=None):
+    """_get_response, sharing one request between identical history-free calls"""
+    if use_history:
+        # Each turn updates the conversation - never share those
+        return await _get_response(user_input, use_history, budget)
+    key = response_cache.make_key(config.GPT_MODEL, PROMPT_HASH, user_input)
+    return await flight.do(key, _get_response, user_input, False, budget)
+
+
+def get_response(user_input, use_history=True, budget=None):
+    """
+    Get a response from GPT-5-nano for the given input.
+    
+    Args:
+        user_input: The user's message
+        use_history: Whether to use conversation history
+        budget: Seconds the answer may take to start (default
+                config.GPT_TURN_BUDGET) - after that a local fallback
+                reply is returned
+        
+    Returns:
+        The AI's response as a string
+    """
+    return pool.run(_coalesced_response(user_input, use_history, budget))
+
+
+def stream_response(user_input, use_history=True, budget=None):
+    """
+    Stream a response from GPT-5-nano as it is generated.
+    
+    Args:
+        user_input: The user's message
+        use_history: Whether to use conversation history
+        budget: Seconds until the first chunk (default config.GPT_TURN_BUDGET)
+    
+    Yields:
+        Text chunks (token deltas) in order. History is updated once the
+        response completes.
+    """
+    return pool.iterate(_stream_response(user_input, use_history, budget))
+
+
+async def aget_response(user_input, use_history=True, budget=None):
+    """Awaitable get_response - safe to await from any event loop"""
+    return await pool.call(_coalesced_response(user_input, use_history, budget))
+
+
+def astream_response(user_input, use_history=True, budget=None):
+    """Async-iterable stream_response - safe to use from any event loop"""
+    return pool.aiterate(_stream_response(user_input, use_history, budget))
 
 
 def clear_history():
     """Clear conversation history"""
-    global conversation_history
-    conversation_history = []
+    conversation_history.clear()
+    _reset_chain()
     return "Conversation cleared."
 
 
@@ -10,6 +10,8 @@ except ImportError:
 
 import time
 
+from utterance import Utterance
+
 # GPIO Pin Definitions (adjust based on your wiring)
 LED_PIN = 17          # GPIO 17 (Pin 11) for LED
 BUTTON_PIN = 27       # GPIO 27 (Pin 13) for button (optional)
@@ -90,34 +92,43 @@ class HardwareController:
 # Global controller instance
 hw = HardwareController()
 
+# Every phrase handle_hardware_command tests for (used by the router)
+TRIGGERS = ('led', 'light')
+
+# Function tools GPT may call (same format as commands.TOOLS)
+TOOLS = (
+    ('control_light', "Control the LED light on the Raspberry Pi.",
+     {'action': ("What to do", ['on', 'off', 'blink', 'toggle', 'status'])}, "led {action}"),
+)
+
 
 def handle_hardware_command(user_input):
     """
     Handle hardware-related commands.
     
     Args:
-        user_input: User's spoken text
+        user_input: User's spoken text (str or Utterance)
     
     Returns:
         tuple: (handled: bool, response: str)
     """
-    text = user_input.lower()
+    utt = Utterance.of(user_input)
     
-    # LED Commands
-    if 'led' in text or 'light' in text:
-        if 'on' in text or 'turn on' in text:
+    # LED Commands - whole words, so "London" isn't "on" and "called" isn't "led"
+    if utt.has_word('led', 'light', 'lights'):
+        if utt.has_word('on'):
             return True, hw.led_on()
         
-        if 'off' in text or 'turn off' in text:
+        if utt.has_word('off'):
             return True, hw.led_off()
         
-        if 'blink' in text:
+        if utt.has_word('blink'):
             return True, hw.led_blink()
         
-        if 'toggle' in text:
+        if utt.has_word('toggle'):
             return True, hw.led_toggle()
         
-        if 'status' in text:
+        if utt.has_word('status'):
             return True, hw.get_led_status()
     
     return False, None
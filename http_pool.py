@@ -0,0 +1,134 @@
+# http_pool.py - Shared Outbound HTTP Session for IVERI AI
+# Every web-backed handler (weather, news, ...) goes through one pooled
+# keep-alive session: connections and TLS sessions are reused between
+# requests, transient failures are retried with backoff, and per-host
+# timings show how often a connection was reused.
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import config
+from latency import LatencyStats
+
+# Statuses worth retrying (rate limits and transient server errors)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _make_session():
+    retry = Retry(
+        total=config.HTTP_RETRIES,
+        backoff_factor=config.HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        respect_retry_after_header=True,
+        raise_on_status=False        # Hand the last response back to the caller
+    )
+    adapter = HTTPAdapter(
+        pool_connections=config.HTTP_POOL_HOSTS,
+        pool_maxsize=config.HTTP_POOL_PER_HOST,
+        pool_block=True,             # Wait for a free connection instead of opening more
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept-Encoding': 'gzip, deflate',
+        'User-Agent': 'IVERI-AI',
+    })
+    return session, adapter
+
+
+session, _adapter = _make_session()
+
+_lock = threading.Lock()
+_latency = {}    # host -> LatencyStats
+_errors = {}     # host -> failed requests (after retries)
+
+
+def get(url, params=None, headers=None, timeout=None, breaker=None):
+    """
+    GET through the shared session.
+
+    Args:
+        url: Request URL
+        params: Query parameters
+        headers: Extra request headers
+        timeout: Seconds, or (connect, read); default from config
+        breaker: CircuitBreaker of the service, told how the call went
+
+    Returns:
+        requests.Response (raises requests exceptions like requests.get,
+        or BreakerOpen without making the request)
+    """
+    host = urlsplit(url).netloc
+    if breaker is not None:
+        breaker.check()
+    if timeout is None:
+        timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+    start = time.perf_counter()
+    try:
+        response = session.get(url, params=params, headers=headers, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        with _lock:
+            _errors[host] = _errors.get(host, 0) + 1
+        if breaker is not None:
+            breaker.record(False, error=e)
+        raise
+    elapsed = time.perf_counter() - start
+    with _lock:
+        if host not in _latency:
+            _latency[host] = LatencyStats()
+        _latency[host].add(elapsed)
+    if breaker is not None:
+        healthy = response.status_code not in RETRY_STATUSES
+        breaker.record(healthy, elapsed, error=f"HTTP {response.status_code}")
+    return response
+
+
+def probe(url):
+    """
+    Health check for a circuit breaker: any answer but 429/5xx means the
+    service is up (an unauthenticated request costs no API quota).
+    """
+    response = session.get(url, timeout=(config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT))
+    if response.status_code in RETRY_STATUSES:
+        raise requests.exceptions.HTTPError(f"HTTP {response.status_code}")
+
+
+def stats():
+    """
+    Per-host metrics:
+        requests/connections: as counted by the connection pool (retries
+                              included), so reused = requests - connections
+        p50/p90/max: request latency in seconds
+        errors: requests that failed after retries
+    """
+    report = {}
+    pools = _adapter.poolmanager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+        entry = report.setdefault(host, {'requests': 0, 'connections': 0})
+        entry['requests'] += pool.num_requests
+        entry['connections'] += pool.num_connections
+
+    with _lock:
+        for host, latency in _latency.items():
+            summary = latency.summary()
+            entry = report.setdefault(host, {'requests': 0, 'connections': 0})
+            entry.update(p50=summary['p50'], p90=summary['p90'], max=summary['max'],
+                         errors=_errors.get(host, 0))
+        for host, errors in _errors.items():
+            report.setdefault(host, {'requests': 0, 'connections': 0}).setdefault('errors', errors)
+
+    for entry in report.values():
+        entry['reused'] = max(0, entry['requests'] - entry['connections'])
+    return report
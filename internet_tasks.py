@@ -3,11 +3,69 @@
 import requests
 import webbrowser
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+import circuit_breaker
+import config
+import http_pool
+import slots
+from prefetcher import Prefetcher
+from singleflight import SingleFlight
+from utterance import Utterance
+from web_cache import WebCache
 
 # API Keys from environment
 WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', '')
 NEWS_API_KEY = os.getenv('NEWS_API_KEY', '')
 
+# Concurrent identical weather/news requests share one API call
+flight = SingleFlight()
+
+# Skip a failing service and answer from cache until a probe finds it back
+weather_breaker = circuit_breaker.get('weather', probe=lambda: http_pool.probe(config.WEATHER_API_URL))
+news_breaker = circuit_breaker.get('news', probe=lambda: http_pool.probe(config.NEWS_API_URL))
+
+# Weather readings per city, kept across restarts
+weather_cache = WebCache(
+    config.WEATHER_CACHE_FILE,
+    ttl=config.WEATHER_CACHE_TTL,
+    stale_ttl=config.WEATHER_STALE_TTL,
+    max_entries=config.WEATHER_CACHE_SIZE,
+    flight=flight
+)
+
+
+# Top headlines per (category, country), refreshed by news_prefetcher and
+# kept across restarts so a launch doesn't re-fetch what is still fresh
+news_cache = WebCache(
+    config.NEWS_CACHE_FILE,
+    ttl=config.NEWS_REFRESH_INTERVAL,
+    stale_ttl=config.NEWS_STALE_TTL,
+    flight=flight
+)
+
+# Parts of compound questions ("weather in Delhi and Mumbai") run side by side
+_workers = ThreadPoolExecutor(max_workers=config.COMPOUND_MAX_PARTS, thread_name_prefix="internet")
+
+NEWS_CATEGORY_NAMES = ['general'] + sorted(set(slots.NEWS_CATEGORIES.values()))
+
+
+class ServiceError(Exception):
+    """A web lookup failed; the message is the reply to speak"""
+
+# Every phrase handle_internet_task tests for (used by the router)
+TRIGGERS = ('weather', 'news', 'google ')
+
+# Function tools GPT may call (same format as commands.TOOLS)
+TOOLS = (
+    ('get_weather', "Get the current weather for a city.",
+     {'city': ("City name (several joined with \"and\"), or an empty string for the default city", None)},
+     "weather in {city}"),
+    ('get_news', "Read the top news headlines.",
+     {'category': ("News category", NEWS_CATEGORY_NAMES)},
+     "{category} news"),
+)
+
 
 def google_search(query):
     """
@@ -26,6 +84,7 @@ def google_search(query):
 def get_weather(city="London"):
     """
     Get current weather for a city using OpenWeatherMap API.
+    Readings are cached per city (see config.WEATHER_CACHE_TTL).
     
     Args:
         city: City name
@@ -38,42 +97,54 @@ def get_weather(city="London"):
                 "Get a free API key from openweathermap.org and set WEATHER_API_KEY in your .env file.")
     
     try:
-        url = "https://api.openweathermap.org/data/2.5/weather"
+        reading = weather_cache.get(f"weather:{city.strip().lower()}", _fetch_weather, city)
+    except ServiceError as e:
+        return str(e)
+    
+    return (f"The weather in {city} is currently {reading['description']} "
+            f"with a temperature of {reading['temp']}°C, feels like {reading['feels_like']}°C. "
+            f"Humidity is at {reading['humidity']}%.")
+
+
+def _fetch_weather(city):
+    """One OpenWeatherMap request -> reading dict (raises ServiceError)"""
+    try:
+        url = config.WEATHER_API_URL
         params = {
             "q": city,
             "appid": WEATHER_API_KEY,
             "units": "metric"
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_pool.get(url, params=params, breaker=weather_breaker)
         data = response.json()
         
         if response.status_code == 200:
-            temp = round(data['main']['temp'])
-            feels_like = round(data['main']['feels_like'])
-            description = data['weather'][0]['description']
-            humidity = data['main']['humidity']
-            
-            return (f"The weather in {city} is currently {description} "
-                    f"with a temperature of {temp}°C, feels like {feels_like}°C. "
-                    f"Humidity is at {humidity}%.")
-        else:
-            return f"I couldn't find weather information for {city}. Please check the city name."
-            
+            return {
+                'temp': round(data['main']['temp']),
+                'feels_like': round(data['main']['feels_like']),
+                'description': data['weather'][0]['description'],
+                'humidity': data['main']['humidity'],
+            }
+    except circuit_breaker.BreakerOpen:
+        raise ServiceError("The weather service is unavailable right now. Please try again in a minute.")
     except requests.exceptions.Timeout:
-        return "The weather service is taking too long to respond. Please try again."
+        raise ServiceError("The weather service is taking too long to respond. Please try again.")
     except Exception as e:
         print(f"Weather API error: {e}")
-        return "I'm having trouble getting the weather right now. Please try again later."
+        raise ServiceError("I'm having trouble getting the weather right now. Please try again later.")
+    
+    raise ServiceError(f"I couldn't find weather information for {city}. Please check the city name.")
 
 
-def get_news(category="general", country="us"):
+def get_news(category="general", country=None):
     """
     Get top news headlines using NewsAPI.
+    Served from the prefetched headline cache when possible.
     
     Args:
         category: News category (business, technology, sports, entertainment, health, science)
-        country: Country code (us, gb, in, au, etc.)
+        country: Country code (us, gb, in, au, etc.; default config.NEWS_COUNTRY)
     
     Returns:
         News summary string
@@ -82,8 +153,39 @@ def get_news(category="general", country="us"):
         return ("News service is not configured. "
                 "Get a free API key from newsapi.org and set NEWS_API_KEY in your .env file.")
     
+    country = country or config.NEWS_COUNTRY
+    news_prefetcher.touch((category, country))
     try:
-        url = "https://newsapi.org/v2/top-headlines"
+        headlines = news_cache.get(_news_key(category, country), _fetch_news, category, country)
+    except ServiceError as e:
+        return str(e)
+    
+    titles = headlines['titles']
+    news_text = f"Here are the top {len(titles)} {category} headlines: "
+    for i, title in enumerate(titles, 1):
+        news_text += f"{i}. {title}. "
+    return news_text
+
+
+def _news_key(category, country):
+    return f"news:{category}:{country}"
+
+
+def _fetch_news(category, country):
+    """
+    One NewsAPI request -> {'titles', 'etag', 'modified'} (raises ServiceError).
+    Revalidates the cached copy with ETag/If-Modified-Since when the API
+    sent those headers, so an unchanged list costs no body.
+    """
+    previous = news_cache.peek(_news_key(category, country))
+    headers = {}
+    if previous and previous.get('etag'):
+        headers['If-None-Match'] = previous['etag']
+    if previous and previous.get('modified'):
+        headers['If-Modified-Since'] = previous['modified']
+    
+    try:
+        url = config.NEWS_API_URL
         params = {
             "country": country,
             "category": category,
@@ -91,29 +193,79 @@ def get_news(category="general", country="us"):
             "apiKey": NEWS_API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = http_pool.get(url, params=params, headers=headers, breaker=news_breaker)
+        if response.status_code == 304 and previous:
+            return previous
         data = response.json()
         
         if response.status_code == 200 and data.get('articles'):
-            articles = data['articles']
-            
-            news_text = f"Here are the top {len(articles)} {category} headlines: "
-            for i, article in enumerate(articles, 1):
-                title = article.get('title', 'No title')
+            titles = []
+            for article in data['articles']:
+                title = article.get('title') or 'No title'
                 # Clean up title - remove source suffix
                 if ' - ' in title:
                     title = title.rsplit(' - ', 1)[0]
-                news_text += f"{i}. {title}. "
-            
-            return news_text
-        else:
-            return "I couldn't fetch the news right now. Please try again later."
-            
+                titles.append(title)
+            return {
+                'titles': titles,
+                'etag': response.headers.get('ETag'),
+                'modified': response.headers.get('Last-Modified'),
+            }
+    except circuit_breaker.BreakerOpen:
+        raise ServiceError("The news service is unavailable right now. Please try again in a minute.")
     except requests.exceptions.Timeout:
-        return "The news service is taking too long to respond. Please try again."
+        raise ServiceError("The news service is taking too long to respond. Please try again.")
     except Exception as e:
         print(f"News API error: {e}")
-        return "I'm having trouble getting the news right now. Please try again later."
+        raise ServiceError("I'm having trouble getting the news right now. Please try again later.")
+    
+    raise ServiceError("I couldn't fetch the news right now. Please try again later.")
+
+
+def _prefetch_news(key):
+    category, country = key
+    news_cache.refresh(_news_key(category, country), _fetch_news, category, country)
+
+
+def _news_age(key):
+    return news_cache.age(_news_key(*key))
+
+
+# Other categories join the schedule once asked for (NewsAPI's free tier
+# allows 100 requests a day)
+news_prefetcher = Prefetcher(
+    _prefetch_news,
+    keys=[(category, config.NEWS_COUNTRY) for category in config.NEWS_PREFETCH_CATEGORIES],
+    age=_news_age,
+    interval=config.NEWS_REFRESH_INTERVAL,
+    hot_interval=config.NEWS_HOT_INTERVAL,
+    hot_window=config.NEWS_HOT_WINDOW,
+    name="news-prefetch"
+)
+
+
+def start_prefetch():
+    """Start refreshing headlines in the background (if NewsAPI is set up)"""
+    if NEWS_API_KEY and config.NEWS_PREFETCH_ENABLED:
+        news_prefetcher.start()
+
+
+def answer_all(fn, items):
+    """
+    Call fn(item) for every item concurrently and merge the replies.
+    
+    Args:
+        fn: Lookup returning a spoken reply (e.g. get_weather)
+        items: Arguments, one call each (at most config.COMPOUND_MAX_PARTS)
+    
+    Returns:
+        The replies joined in the order asked, so the answer takes about
+        as long as the slowest lookup
+    """
+    items = items[:config.COMPOUND_MAX_PARTS]
+    if len(items) == 1:
+        return fn(items[0])
+    return " ".join(reply.strip() for reply in _workers.map(fn, items))
 
 
 def handle_internet_task(user_input):
@@ -121,55 +273,28 @@ def handle_internet_task(user_input):
     Check if user input is an internet task.
     
     Args:
-        user_input: User's spoken text
+        user_input: User's spoken text (str or Utterance)
     
     Returns:
         tuple: (handled: bool, response: str)
     """
-    text = user_input.lower()
+    utt = Utterance.of(user_input)
     
     # === WEATHER COMMANDS ===
-    if 'weather' in text:
-        # Try to extract city name
-        city = "London"  # Default
-        
-        if ' in ' in text:
-            city = text.split(' in ')[-1].strip().rstrip('?')
-        elif ' for ' in text:
-            city = text.split(' for ')[-1].strip().rstrip('?')
-        elif ' at ' in text:
-            city = text.split(' at ')[-1].strip().rstrip('?')
-        
-        # Clean up common words
-        for word in ['the', 'today', 'now', 'please', 'weather']:
-            city = city.replace(word, '').strip()
-        
-        if not city:
-            city = "London"
-        
-        return True, get_weather(city)
+    if utt.has_word('weather'):
+        found = slots.extract('weather_cities', utt)
+        cities = (found and found['cities']) or ["London"]  # Default
+        return True, answer_all(get_weather, cities)
     
     # === NEWS COMMANDS ===
-    if 'news' in text:
-        if 'tech' in text or 'technology' in text:
-            return True, get_news(category="technology")
-        elif 'sport' in text:
-            return True, get_news(category="sports")
-        elif 'business' in text or 'finance' in text:
-            return True, get_news(category="business")
-        elif 'entertainment' in text or 'celebrity' in text:
-            return True, get_news(category="entertainment")
-        elif 'health' in text:
-            return True, get_news(category="health")
-        elif 'science' in text:
-            return True, get_news(category="science")
-        else:
-            return True, get_news()
+    if utt.has_word('news'):
+        categories = slots.extract('news_categories', utt)['categories']
+        return True, answer_all(get_news, categories)
     
     # === GOOGLE SEARCH ===
-    if 'google ' in text and 'open google' not in text:
-        query = text.replace('google ', '').strip()
-        if query:
-            return True, google_search(query)
+    if utt.has_word('google') and not utt.has_phrase('open google'):
+        found = slots.extract('google_search', utt)
+        if found:
+            return True, google_search(found['query'])
     
     return False, None
@@ -0,0 +1,38 @@
+# latency.py - Rolling Latency Percentiles for IVERI AI
+
+import threading
+from collections import deque
+
+
+class LatencyStats:
+    """Rolling window of latency samples (seconds) with percentiles"""
+
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p):
+        """Nearest-rank percentile (p in 0..100), or None without samples"""
+        with self.lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+        return ordered[rank]
+
+    def summary(self):
+        """{'count', 'p50', 'p90', 'p99', 'max'}"""
+        return {
+            'count': len(self),
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.percentile(100),
+        }
+
+    def __len__(self):
+        return len(self.samples)
@@ -7,15 +7,13 @@ Modes: Chat (text) | Wake (voice with Jarvis or keyboard)
 from dotenv import load_dotenv
 load_dotenv()
 
-import os
-import sys
-
 import speech
 import tts
 import gpt
-import commands
 import internet_tasks
-import memory as mem
+import router
+import config
+from utterance import Utterance
 
 # Optional hardware
 try:
@@ -24,6 +22,12 @@ try:
 except ImportError:
     HAS_HARDWARE = False
 
+# Compile all handler triggers once at startup
+ROUTER = router.build_default_router()
+
+# Commands the router misses can still be run by GPT, in the same round-trip
+gpt.register_tools(ROUTER.tool_schemas(), ROUTER.call_tool)
+
 
 def print_banner():
     print("\n" + "=" * 50)
@@ -34,42 +38,43 @@ def print_banner():
     print("=" * 50)
 
 
-def process_input(user_input):
-    """Process user input through all handlers"""
-    if not user_input:
-        return "I didn't understand that."
+def process_input(user_input, stream=False, budget=None):
+    """
+    Process user input (str or Utterance) through all handlers.
     
-    # 1. Local commands (time, date, websites, etc.)
-    handled, response = commands.handle_command(user_input)
-    if handled:
-        return response
+    Args:
+        user_input: The user's text
+        stream: Stream GPT answers instead of waiting for the full reply
+        budget: Seconds GPT may take to start answering (see config)
     
-    # 2. Memory commands
-    handled, response = mem.handle_memory_command(user_input)
-    if handled:
-        return response
+    Returns:
+        The response string - or, when stream is True and the answer
+        comes from GPT, an iterator of text chunks
+    """
+    utt = Utterance.of(user_input)
+    if not utt:
+        return "I didn't understand that."
     
-    # 3. Internet tasks (weather, news)
-    handled, response = internet_tasks.handle_internet_task(user_input)
+    # 1-4. Local handlers in priority order: commands, memory,
+    # internet tasks (weather, news), hardware (LED). One scan picks
+    # the handlers whose trigger phrases occur in the text.
+    # 5. Paraphrased commands ("could you pull up youtube") - offline
+    # classifier. Repeat phrases reuse the cached routing decision.
+    handled, response = ROUTER.dispatch(utt)
     if handled:
         return response
     
-    # 4. Hardware commands (LED)
-    if HAS_HARDWARE:
-        handled, response = hardware.handle_hardware_command(user_input)
-        if handled:
-            return response
-    
-    # 5. Ask GPT
-    return gpt.get_response(user_input)
+    # 6. Ask GPT
+    if stream:
+        return gpt.stream_response(utt.raw, budget=budget)
+    return gpt.get_response(utt.raw, budget=budget)
 
 
 def is_exit(text):
-    """Check if user wants to exit"""
+    """Check if user wants to exit (whole words - "quite" is not "quit")"""
     if not text:
         return False
-    words = ['goodbye', 'exit', 'quit', 'bye', 'stop']
-    return any(w in text.lower() for w in words)
+    return Utterance.of(text).has_word('goodbye', 'exit', 'quit', 'bye', 'stop')
 
 
 # ==============================================================
@@ -84,9 +89,14 @@ def chat_mode():
     while True:
         try:
             user_input = input("You: ").strip()
+            # Reconnect while the input is routed if we sat idle past keep_warm()
+            gpt.prewarm()
             
             # Empty = voice input
             if user_input == '':
+                if not speech.available():
+                    print("IVERI: Speech recognition is offline right now - please type.\n")
+                    continue
                 print("Listening...")
                 user_input = speech.listen()
                 if not user_input:
@@ -94,16 +104,24 @@ def chat_mode():
                     continue
                 print(f"(You said: {user_input})")
             
-            if user_input.lower() == 'wake':
+            utt = Utterance(user_input)
+            
+            if utt.text == 'wake':
                 return 'wake'
             
-            if is_exit(user_input):
+            if is_exit(utt):
                 print("IVERI: Goodbye!")
                 return 'exit'
             
-            # Process
-            response = process_input(user_input)
-            print(f"IVERI: {response}\n")
+            # Process - GPT answers are printed as they are generated
+            response = process_input(utt, stream=config.STREAM_RESPONSES)
+            if isinstance(response, str):
+                print(f"IVERI: {response}\n")
+            else:
+                print("IVERI: ", end="", flush=True)
+                for chunk in response:
+                    print(chunk, end="", flush=True)
+                print("\n")
             
         except (KeyboardInterrupt, EOFError):
             return 'exit'
@@ -132,6 +150,10 @@ def wake_mode():
     print("Say 'goodbye' to exit | Type 'chat' for text mode")
     print("-" * 30 + "\n")
     
+    # Keep the microphone open (and calibrated) between turns
+    if use_keyboard:
+        speech.start_microphone()
+    
     tts.speak("Wake mode active.")
     
     while True:
@@ -147,32 +169,48 @@ def wake_mode():
             else:
                 # Wake word activation
                 import wakeword
+                # The wake word detector records on its own
+                speech.release_microphone()
                 print("Waiting for 'Jarvis'...")
                 if not wakeword.wait_for_wake_word():
                     continue
+                speech.start_microphone()
             
-            tts.speak("Yes?")
-            print("Listening...")
-            user_input = speech.listen()
+            # Connect to the API while the user is still speaking
+            gpt.prewarm()
+            if speech.available():
+                tts.speak("Yes?")
+                print("Listening...")
+                user_input = speech.listen(preroll=False)
+            else:
+                # Speech service is down - take the request typed instead
+                tts.speak("Speech recognition is offline. Please type.")
+                user_input = input("You: ").strip()
             
             if not user_input:
                 tts.speak("Didn't catch that.")
                 continue
             
             print(f"You said: {user_input}")
+            utt = Utterance(user_input)
             
-            if is_exit(user_input):
+            if is_exit(utt):
                 tts.speak("Goodbye!")
                 return 'exit'
             
-            if 'chat mode' in user_input.lower():
+            if utt.has_phrase('chat mode'):
                 tts.speak("Switching to chat.")
                 return 'chat'
             
-            # Process and speak response
-            response = process_input(user_input)
-            print(f"IVERI: {response}")
-            tts.speak(response)
+            # Process and speak response - GPT answers are spoken
+            # sentence by sentence while the rest is generated
+            response = process_input(utt, stream=config.STREAM_RESPONSES,
+                                     budget=config.GPT_VOICE_BUDGET)
+            if isinstance(response, str):
+                print(f"IVERI: {response}")
+                tts.speak(response)
+            else:
+                tts.speak_stream(response)
             
         except (KeyboardInterrupt, EOFError):
             return 'exit'
@@ -184,6 +222,11 @@ def wake_mode():
 def main():
     print_banner()
     
+    # Open the API connection while the user picks a mode, and keep it open
+    gpt.prewarm()
+    gpt.keep_warm()
+    internet_tasks.start_prefetch()
+    
     print("\nSelect mode:")
     print("  1. chat - Type messages (press ENTER to speak)")
     print("  2. wake - Voice mode (Jarvis or keyboard)")
@@ -4,6 +4,9 @@ import json
 import os
 from datetime import datetime
 
+import slots
+from utterance import Utterance
+
 # File paths for persistent storage
 DATA_DIR = os.path.expanduser("~/iveri/data")
 MEMORY_FILE = os.path.join(DATA_DIR, "memory.json")
@@ -158,42 +161,67 @@ class Memory:
 # Global memory instance
 memory = Memory()
 
+# Every phrase handle_memory_command tests for (used by the router)
+TRIGGERS = (
+    'remember my', 'remember that my', 'what is my', "what's my", 'forget my',
+    'what do you remember', 'list memories', 'show memories',
+    'add a note', 'make a note', 'take a note',
+    'list notes', 'read notes', 'show notes', 'my notes',
+    'clear notes', 'delete all notes',
+)
+
+
+# Function tools GPT may call (same format as commands.TOOLS)
+TOOLS = (
+    ('remember_fact', "Remember a personal fact the user states, e.g. their name.",
+     {'key': ("What the fact is about, e.g. 'name' or 'favorite color'", None),
+      'value': ("The value to remember", None)},
+     "remember my {key} is {value}"),
+    ('recall_fact', "Look up a personal fact remembered earlier.",
+     {'key': ("What the fact is about, e.g. 'name'", None)}, "what is my {key}"),
+    ('forget_fact', "Forget a remembered personal fact.",
+     {'key': ("What the fact is about", None)}, "forget my {key}"),
+    ('add_note', "Save a note for the user.",
+     {'text': ("Note text", None)}, "take a note {text}"),
+    ('read_memory', "Read back remembered facts or saved notes.",
+     {'what': ("What to read", ['what do you remember', 'show notes'])}, "{what}"),
+)
+
 
 def handle_memory_command(user_input):
     """
     Handle memory-related commands.
     
     Args:
-        user_input: User's spoken text
+        user_input: User's spoken text (str or Utterance)
     
     Returns:
         tuple: (handled: bool, response: str)
     """
-    text = user_input.lower()
+    utt = Utterance.of(user_input)
+    
+    # A note is kept word for word, whatever it says ("take a note remember my keys")
+    if utt.startswith('add a note', 'make a note', 'take a note'):
+        found = slots.extract('add_note', utt)
+        if found:
+            return True, memory.add_note(found['text'])
     
     # === REMEMBER COMMANDS ===
     # "remember my name is John" or "remember that my favorite color is blue"
-    if 'remember my' in text or 'remember that my' in text:
-        try:
-            if ' is ' in text:
-                # Split on " is " to get key and value
-                parts = text.split(' is ', 1)
-                key = parts[0].replace('remember my', '').replace('remember that my', '').strip()
-                value = parts[1].strip()
-                
-                if key and value:
-                    return True, memory.remember(key, value)
-        except (IndexError, ValueError):
-            pass
+    if utt.has_phrase('remember my', 'remember that my'):
+        found = slots.extract('remember', utt)
+        if found:
+            return True, memory.remember(found['key'], found['value'])
         
         return True, "I didn't understand what to remember. Try saying 'remember my name is John'."
     
     # === RECALL COMMANDS ===
     # "what is my name" or "what's my favorite color"
-    if "what is my" in text or "what's my" in text:
-        key = text.replace("what is my", "").replace("what's my", "").strip().rstrip("?")
+    if utt.has_phrase("what is my", "what's my"):
+        found = slots.extract('recall', utt)
         
-        if key:
+        if found:
+            key = found['key']
             value = memory.recall(key)
             if value:
                 return True, f"Your {key} is {value}."
@@ -204,34 +232,31 @@ def handle_memory_command(user_input):
     
     # === FORGET COMMANDS ===
     # "forget my name"
-    if 'forget my' in text:
-        key = text.replace('forget my', '').strip()
-        if key:
-            return True, memory.forget(key)
+    if utt.has_phrase('forget my'):
+        found = slots.extract('forget', utt)
+        if found:
+            return True, memory.forget(found['key'])
     
     # === LIST MEMORIES ===
-    if 'what do you remember' in text or 'list memories' in text or 'show memories' in text:
+    if utt.has_phrase('what do you remember', 'list memories', 'show memories'):
         return True, memory.list_memories()
     
     # === NOTE COMMANDS ===
     
     # "add a note buy milk" or "take a note call mom"
-    if 'add a note' in text or 'make a note' in text or 'take a note' in text:
-        note_text = text
-        for phrase in ['add a note', 'make a note', 'take a note', 'that', 'to']:
-            note_text = note_text.replace(phrase, '')
-        note_text = note_text.strip()
-        
-        if note_text:
-            return True, memory.add_note(note_text)
+    if utt.has_phrase('add a note', 'make a note', 'take a note'):
+        found = slots.extract('add_note', utt)
+        
+        if found:
+            return True, memory.add_note(found['text'])
         return True, "What should I write in the note?"
     
     # "read my notes" or "show notes"
-    if 'list notes' in text or 'read notes' in text or 'show notes' in text or 'my notes' in text:
+    if utt.has_phrase('list notes', 'read notes', 'show notes', 'my notes'):
         return True, memory.list_notes()
     
     # "clear notes" or "delete all notes"
-    if 'clear notes' in text or 'delete all notes' in text:
+    if utt.has_phrase('clear notes', 'delete all notes'):
         return True, memory.clear_notes()
     
     return False, None
@@ -0,0 +1,286 @@
+# mic_stream.py - Persistent Microphone Capture for IVERI AI
+# One background thread keeps the microphone open and, while nobody is
+# listening, tracks the room's noise floor to keep the speech threshold
+# calibrated. listen() starts recording the moment it is called instead of
+# opening the device and sampling ambient noise first.
+
+import atexit
+import collections
+import json
+import math
+import os
+import queue
+import threading
+import time
+
+import speech_recognition as sr
+
+import config
+from vad import EnergyEndpointer, VoiceActivityDetector, rms
+
+
+class MicStream:
+    """
+    Long-lived capture stream.
+
+    The reader thread pushes every chunk to whoever is listening and keeps
+    the last `preroll` seconds, so the first syllable spoken just before
+    listen() is not lost.
+    """
+
+    def __init__(self, source_factory=None, calibration_file=None):
+        """
+        Args:
+            source_factory: fn() -> speech_recognition AudioSource (default:
+                            the system microphone at config.MIC_SAMPLE_RATE)
+            calibration_file: JSON file the noise floor/threshold persist in
+        """
+        self.source_factory = source_factory or (lambda: sr.Microphone(
+            sample_rate=config.MIC_SAMPLE_RATE, chunk_size=config.MIC_CHUNK))
+        self.calibration_file = calibration_file
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = threading.Event()
+        self.ready = threading.Event()
+        self.listeners = []
+        self.error = None
+        self.sample_rate = config.MIC_SAMPLE_RATE
+        self.sample_width = 2
+        self.chunk_seconds = config.MIC_CHUNK / config.MIC_SAMPLE_RATE
+        self.preroll = self._preroll_buffer()
+        self.pauses = collections.deque(maxlen=50)   # Speaker's mid-phrase pauses (VAD)
+
+        self.energy_threshold = float(config.ENERGY_THRESHOLD)
+        self.noise_floor = self.energy_threshold / config.MIC_DYNAMIC_RATIO
+        self.saved_threshold = None
+        self._load()
+        atexit.register(self.save)
+
+    # --- calibration ---
+
+    def _load(self):
+        if not self.calibration_file or not os.path.exists(self.calibration_file):
+            return
+        try:
+            with open(self.calibration_file, 'r') as f:
+                saved = json.load(f)
+            self.noise_floor = float(saved['noise_floor'])
+            self.energy_threshold = float(saved['energy_threshold'])
+            self.saved_threshold = self.energy_threshold
+        except (json.JSONDecodeError, IOError, KeyError, TypeError, ValueError):
+            pass
+
+    def save(self):
+        """Persist the calibration (skipped if it hasn't moved)"""
+        if not self.calibration_file:
+            return
+        with self.lock:
+            threshold, floor = self.energy_threshold, self.noise_floor
+        if self.saved_threshold is not None and abs(threshold - self.saved_threshold) < 1.0:
+            return
+        try:
+            with open(self.calibration_file, 'w') as f:
+                json.dump({'energy_threshold': threshold, 'noise_floor': floor,
+                           'saved_at': time.time()}, f)
+            self.saved_threshold = threshold
+        except IOError as e:
+            print(f"Error saving microphone calibration: {e}")
+
+    def _preroll_buffer(self):
+        return collections.deque(maxlen=max(1, math.ceil(config.MIC_PREROLL / self.chunk_seconds)))
+
+    def _track_noise(self, energy):
+        """Fold one idle chunk into the noise floor (exponential moving average)"""
+        # Same time constant as speech_recognition's dynamic energy threshold
+        weight = 1 - config.MIC_DYNAMIC_DAMPING ** self.chunk_seconds
+        with self.lock:
+            if energy > 2 * self.energy_threshold:
+                # Probably someone talking (or our own TTS) - adapt, but slowly
+                weight /= 10
+            self.noise_floor += (energy - self.noise_floor) * weight
+            self.energy_threshold = max(config.MIC_MIN_THRESHOLD,
+                                        self.noise_floor * config.MIC_DYNAMIC_RATIO)
+
+    # --- capture thread ---
+
+    def start(self, wait=3.0):
+        """
+        Open the microphone on the capture thread (no-op if running).
+
+        Returns:
+            True once audio is flowing, False if the device failed to open
+        """
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.error = None
+                self.ready.clear()
+                self.running.set()
+                self.thread = threading.Thread(target=self._run, name="mic-stream", daemon=True)
+                self.thread.start()
+        self.ready.wait(wait)
+        return self.error is None and self.ready.is_set()
+
+    def stop(self):
+        """Release the microphone (e.g. for the wake word detector)"""
+        self.running.clear()
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(2.0)
+        self.save()
+
+    def _run(self):
+        try:
+            with self.source_factory() as source:
+                if source.stream is None:
+                    raise OSError("microphone could not be opened")
+                self.sample_rate = source.SAMPLE_RATE
+                self.sample_width = source.SAMPLE_WIDTH
+                self.chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+                self.preroll = self._preroll_buffer()
+                self.ready.set()
+                last_save = time.time()
+                while self.running.is_set():
+                    chunk = source.stream.read(source.CHUNK)
+                    if not chunk:
+                        break
+                    self._dispatch(chunk)
+                    if time.time() - last_save > config.MIC_SAVE_INTERVAL:
+                        self.save()
+                        last_save = time.time()
+        except Exception as e:
+            self.error = e
+            print(f"Microphone error: {e}")
+        finally:
+            self.running.clear()
+            self.ready.set()
+            with self.lock:
+                for listener in self.listeners:
+                    listener.put(None)      # Wake anyone waiting on audio
+
+    def _dispatch(self, chunk):
+        with self.lock:
+            listeners = list(self.listeners)
+            self.preroll.append(chunk)
+        if listeners:
+            for listener in listeners:
+                listener.put(chunk)
+        else:
+            self._track_noise(rms(chunk))
+
+    def _subscribe(self, preroll=True):
+        """Queue of chunks from now on, primed with the pre-roll"""
+        listener = queue.Queue()
+        with self.lock:
+            if preroll:
+                for chunk in self.preroll:
+                    listener.put(chunk)
+            self.listeners.append(listener)
+        return listener
+
+    def _unsubscribe(self, listener):
+        with self.lock:
+            self.listeners.remove(listener)
+
+    def _read(self, listener):
+        try:
+            chunk = listener.get(timeout=max(1.0, self.chunk_seconds * 10))
+        except queue.Empty:
+            raise OSError("microphone stalled - no audio for a second")
+        if chunk is None:
+            raise OSError(f"microphone stopped: {self.error or 'end of stream'}")
+        return chunk
+
+    # --- listening ---
+
+    def endpointer(self, vad=None, pause_threshold=None):
+        """
+        Fresh end-of-speech detector for one phrase.
+
+        Args:
+            vad: Use the voice activity detector (default config.VAD_ENABLED)
+            pause_threshold: Quiet seconds that end a phrase without VAD
+        """
+        if config.VAD_ENABLED if vad is None else vad:
+            return VoiceActivityDetector(self.sample_rate, self.noise_floor, self.pauses)
+        return EnergyEndpointer(
+            self.energy_threshold, self.chunk_seconds,
+            config.PAUSE_THRESHOLD if pause_threshold is None else pause_threshold
+        )
+
+    def listen(self, timeout=None, phrase_time_limit=None, pause_threshold=None, preroll=True,
+               vad=None, on_audio=None):
+        """
+        Record one phrase, starting immediately.
+
+        Args:
+            timeout: Seconds to wait for speech to start (None = forever)
+            phrase_time_limit: Max seconds of speech (None = no limit)
+            pause_threshold: Seconds of quiet that end the phrase (without VAD)
+            preroll: Include audio from just before the call (turn off
+                     right after a spoken prompt, or its tail is heard)
+            vad: End the phrase by voice activity (default config.VAD_ENABLED)
+            on_audio: fn(chunk) called with the phrase's audio as it is
+                      recorded (e.g. a streaming recognizer)
+
+        Returns:
+            sr.AudioData (raises sr.WaitTimeoutError if nobody speaks)
+        """
+        if not self.start():
+            raise OSError(f"microphone unavailable: {self.error}")
+        endpointer = self.endpointer(vad, pause_threshold)
+        listener = self._subscribe(preroll)
+        try:
+            # Wait for speech to start, keeping a little audio before it
+            frames = collections.deque(maxlen=self.preroll.maxlen + 1)
+            # Pre-roll chunks are already queued - they don't count as waiting
+            waited = -listener.qsize() * self.chunk_seconds
+            while True:
+                chunk = self._read(listener)
+                frames.append(chunk)
+                if endpointer.push(chunk) != 'silence':
+                    break
+                waited += self.chunk_seconds
+                if timeout and waited > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+            # Record until the endpointer hears the end (or the time limit)
+            frames = list(frames)
+            if on_audio is not None:
+                for chunk in frames:
+                    on_audio(chunk)
+            spoken = 0.0
+            while endpointer.state != 'end':
+                if phrase_time_limit and spoken > phrase_time_limit:
+                    break
+                chunk = self._read(listener)
+                frames.append(chunk)
+                spoken += self.chunk_seconds
+                endpointer.push(chunk)
+                if on_audio is not None:
+                    on_audio(chunk)
+        finally:
+            self._unsubscribe(listener)
+
+        # Keep a short tail of the closing silence, like speech_recognition does
+        extra = int((endpointer.quiet_seconds - config.MIC_TRAILING_SILENCE) / self.chunk_seconds)
+        if extra > 0:
+            frames = frames[:len(frames) - extra]
+        return sr.AudioData(b"".join(frames), self.sample_rate, self.sample_width)
+
+    def record(self, duration):
+        """Record exactly `duration` seconds from now"""
+        if not self.start():
+            raise OSError(f"microphone unavailable: {self.error}")
+        listener = self._subscribe(preroll=False)
+        try:
+            frames = [self._read(listener) for _ in range(math.ceil(duration / self.chunk_seconds))]
+        finally:
+            self._unsubscribe(listener)
+        return sr.AudioData(b"".join(frames), self.sample_rate, self.sample_width)
+
+    def calibration(self):
+        """{'energy_threshold', 'noise_floor', 'running'}"""
+        with self.lock:
+            return {'energy_threshold': self.energy_threshold,
+                    'noise_floor': self.noise_floor,
+                    'running': self.running.is_set()}
@@ -0,0 +1,189 @@
+# openai_client.py - Warm, Pooled Async OpenAI Client for IVERI AI
+# One AsyncOpenAI client on a background event loop: keep-alive connections
+# are reused across turns, and a warm-up request opens them (DNS + TCP + TLS)
+# at startup or after an idle spell instead of while the user waits.
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+import config
+
+# Phase timings of the request running in the current task
+_current_timing = contextvars.ContextVar('openai_timing', default=None)
+
+
+async def _trace(event, info):
+    """httpcore trace hook - notes when a new connection is opened"""
+    timing = _current_timing.get()
+    if timing is None:
+        return
+    now = time.perf_counter()
+    if event == 'connection.connect_tcp.started':
+        timing['connect_started'] = now
+    elif event in ('connection.connect_tcp.complete', 'connection.start_tls.complete'):
+        timing['connect'] = now - timing.get('connect_started', timing['started'])
+        timing['reused'] = False
+    elif event.endswith('receive_response_headers.complete'):
+        timing.setdefault('headers', now - timing['started'])
+
+
+async def _on_request(request):
+    request.extensions['trace'] = _trace
+
+
+class OpenAIPool:
+    """
+    AsyncOpenAI client driven by its own event loop thread.
+
+    Coroutines can await `client` directly on that loop; synchronous code
+    uses run()/iterate(), which block only the calling thread.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="openai-loop", daemon=True)
+        self.thread.start()
+
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=config.GPT_POOL_SIZE,
+                max_keepalive_connections=config.GPT_POOL_SIZE,
+                keepalive_expiry=config.GPT_KEEPALIVE_SECONDS
+            ),
+            timeout=httpx.Timeout(config.GPT_READ_TIMEOUT, connect=config.GPT_CONNECT_TIMEOUT),
+            event_hooks={'request': [_on_request]}
+        )
+        self.client = AsyncOpenAI(
+            base_url=config.OPENAI_BASE_URL,
+            http_client=http_client,
+            max_retries=config.GPT_MAX_RETRIES
+        )
+        self.last_used = 0.0
+        self.last_request = time.time()   # Last request other than a warm-up
+        self.warming = None
+        self.rewarm_timer = None
+        self.timings = deque(maxlen=50)
+
+    # --- running coroutines from synchronous code ---
+
+    def submit(self, coro):
+        """Schedule a coroutine on the client loop; returns a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the client loop and wait for its result"""
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("OpenAIPool.run() called from the client loop - await instead")
+        return self.submit(coro).result(timeout)
+
+    def iterate(self, agen):
+        """Drive an async generator from synchronous code"""
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(agen.aclose())
+
+    # --- awaiting from any event loop ---
+
+    async def call(self, coro):
+        """Await a coroutine on the client loop from any event loop"""
+        if asyncio.get_running_loop() is self.loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def aiterate(self, agen):
+        """Async-iterate a generator that runs on the client loop"""
+        try:
+            while True:
+                try:
+                    yield await self.call(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            await self.call(agen.aclose())
+
+    # --- timing ---
+
+    def start_timing(self, label):
+        """Begin a per-phase timing record for the calling task"""
+        timing = {'label': label, 'started': time.perf_counter(), 'connect': 0.0, 'reused': True}
+        _current_timing.set(timing)
+        self.last_used = time.time()
+        if label != 'warmup':
+            self.last_request = self.last_used
+        return timing
+
+    def first_token(self, timing):
+        """Mark time to the first output token (streaming)"""
+        if 'ttfb' not in timing:
+            timing['ttfb'] = time.perf_counter() - timing['started']
+
+    def finish_timing(self, timing, ok=True):
+        """Close a timing record; returns {'connect', 'ttfb', 'total', ...}"""
+        timing['total'] = time.perf_counter() - timing['started']
+        timing.setdefault('ttfb', timing.get('headers', timing['total']))
+        timing['ok'] = ok
+        for key in ('started', 'connect_started', 'headers'):
+            timing.pop(key, None)
+        self.timings.append(timing)
+        self.last_used = time.time()
+        return timing
+
+    def get_timings(self):
+        """Recent requests: label, connect, ttfb, total (seconds), reused, ok"""
+        return list(self.timings)
+
+    # --- warm-up ---
+
+    async def _warm(self):
+        timing = self.start_timing('warmup')
+        try:
+            await self.client.with_options(max_retries=0).models.retrieve(config.GPT_MODEL)
+            self.finish_timing(timing)
+        except Exception as e:
+            self.finish_timing(timing, ok=False)
+            print(f"OpenAI warm-up failed: {e}")
+
+    def prewarm(self, force=False):
+        """
+        Open a connection in the background if the pool has gone cold.
+        Returns immediately; a no-op while connections are still warm.
+        """
+        idle = time.time() - self.last_used
+        if not force and idle < config.GPT_REWARM_AFTER:
+            return None
+        if self.warming is not None and not self.warming.done():
+            return self.warming
+        self.last_used = time.time()
+        self.warming = self.submit(self._warm())
+        return self.warming
+
+    def keep_warm(self):
+        """
+        Call prewarm() every GPT_REWARM_AFTER seconds, so an idle
+        connection is refreshed well before GPT_KEEPALIVE_SECONDS, until
+        GPT_KEEP_WARM_FOR seconds after the last real request. A question
+        asked after a quiet spell then finds a connection open; later
+        ones rely on the caller's prewarm().
+        """
+        self.loop.call_soon_threadsafe(self._schedule_rewarm)
+
+    def _schedule_rewarm(self):
+        if self.rewarm_timer is not None:
+            self.rewarm_timer.cancel()
+        self.rewarm_timer = self.loop.call_later(config.GPT_REWARM_AFTER, self._rewarm)
+
+    def _rewarm(self):
+        if time.time() - self.last_request < config.GPT_KEEP_WARM_FOR:
+            self.prewarm()
+        self._schedule_rewarm()
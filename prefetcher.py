@@ -0,0 +1,111 @@
+# prefetcher.py - Background Refresh Scheduler for IVERI AI
+# Keeps a set of keys refreshed on a timer so requests are answered from
+# memory. Keys the user actually asks for are refreshed more often.
+
+import threading
+import time
+
+
+class Prefetcher:
+    """
+    Daemon thread that calls `refresh(key)` for every key on a schedule:
+    every `interval` seconds normally, every `hot_interval` seconds for
+    keys asked for (via touch()) within the last `hot_window` seconds.
+    """
+
+    def __init__(self, refresh, keys=(), interval=3 * 3600, hot_interval=1200,
+                 hot_window=6 * 3600, age=None, name="prefetcher"):
+        """
+        Args:
+            refresh: fn(key) that fetches and stores one key (may raise)
+            keys: Keys to keep warm from the start
+            interval: Seconds between refreshes of a key nobody asks for
+            hot_interval: Seconds between refreshes of a recently asked key
+            hot_window: How long after a request a key stays hot
+            age: fn(key) -> seconds since the key was last stored, or None;
+                 a key fetched elsewhere (or before a restart) counts as
+                 refreshed then, so fresh keys aren't fetched again
+        """
+        self.refresh = refresh
+        self.interval = interval
+        self.hot_interval = hot_interval
+        self.hot_window = hot_window
+        self.age = age
+        self.name = name
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.refreshed_at = {key: 0.0 for key in keys}   # 0 = never
+        self.asked_at = {}
+        self.counts = {'refreshes': 0, 'failures': 0}
+
+    def touch(self, key):
+        """Note that `key` was asked for (adds it if it wasn't scheduled)"""
+        with self.lock:
+            self.asked_at[key] = time.time()
+            self.refreshed_at.setdefault(key, 0.0)
+        # Its next refresh may now be sooner - let the scheduler recompute
+        self.wake.set()
+
+    def _next_due(self, key, refreshed, now):
+        asked = self.asked_at.get(key, 0.0)
+        hot = now - asked < self.hot_window
+        return refreshed + (self.hot_interval if hot else self.interval)
+
+    def _due(self):
+        """(keys to refresh now, seconds until the next one is due)"""
+        now = time.time()
+        with self.lock:
+            refreshed = dict(self.refreshed_at)
+        if self.age is not None:
+            for key in refreshed:
+                age = self.age(key)
+                if age is not None:
+                    refreshed[key] = max(refreshed[key], now - age)
+        with self.lock:
+            due_at = {key: self._next_due(key, at, now) for key, at in refreshed.items()}
+        due = [key for key, at in due_at.items() if at <= now]
+        # Hot keys first, so the categories in use are never starved
+        due.sort(key=lambda k: self.asked_at.get(k, 0.0), reverse=True)
+        later = [at - now for at in due_at.values() if at > now]
+        return due, min(later, default=self.interval)
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.wake.clear()
+            due, wait = self._due()
+            for key in due:
+                if self.stopped.is_set():
+                    return
+                try:
+                    self.refresh(key)
+                    self.counts['refreshes'] += 1
+                except Exception as e:
+                    self.counts['failures'] += 1
+                    print(f"Prefetch of {key} failed: {e}")
+                with self.lock:
+                    # A failed key waits a full period too - no hammering a dead API
+                    self.refreshed_at[key] = time.time()
+            if due:
+                continue
+            self.wake.wait(max(1.0, wait))
+
+    def start(self):
+        """Start the background thread (no-op if already running)"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+    def stats(self):
+        """Scheduled keys, hot keys and refresh counters"""
+        now = time.time()
+        with self.lock:
+            hot = [k for k, at in self.asked_at.items() if now - at < self.hot_window]
+            return dict(self.counts, keys=len(self.refreshed_at), hot=hot)
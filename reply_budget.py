@@ -0,0 +1,59 @@
+# reply_budget.py - Output-Length Budgets for IVERI AI
+# Picks how long GPT may answer, and how hard it may think, from the utterance:
+# tiny for greetings and quick facts, larger only when detail is asked for.
+
+import re
+
+import config
+from utterance import Utterance
+
+# Explicit requests for a longer answer
+DETAIL_RE = re.compile(
+    r"\b(?:explain|in detail|detailed|describe|elaborate|tell me (?:about|more)"
+    r"|step by step|story|poem|essay|write|summari[sz]e|compare|pros and cons"
+    r"|how do i|how to|list)\b"
+)
+
+# Small talk and short factual questions
+TINY_RE = re.compile(
+    r"^(?:hi|hello|hey|thanks|thank you|good (?:morning|afternoon|evening|night)"
+    r"|ok|okay|yes|no|cool|great|nice"
+    r"|what|who|when|where|which|how many|how much|how old|how far|how tall|is|are|do|does|can)\b"
+)
+
+# Sentence end inside a reply that was cut short
+_LAST_SENTENCE_END = re.compile(r"[.!?](?=\s|$)(?!.*[.!?](?:\s|$))", re.DOTALL)
+
+
+def classify(user_input):
+    """
+    Budget class for an utterance.
+
+    Returns:
+        'tiny', 'normal' or 'detail' (keys of config.REPLY_BUDGETS)
+    """
+    utt = Utterance.of(user_input)
+    if DETAIL_RE.search(utt.clean):
+        return 'detail'
+    if TINY_RE.search(utt.clean) and len(utt.tokens) <= config.TINY_REPLY_MAX_WORDS:
+        return 'tiny'
+    return 'normal'
+
+
+def request_options(user_input):
+    """responses.create arguments for the utterance's budget class"""
+    if not config.ADAPTIVE_REPLY_LENGTH:
+        return {}
+    budget = config.REPLY_BUDGETS[classify(user_input)]
+    options = {"max_output_tokens": budget['max_output_tokens']}
+    if budget.get('reasoning'):
+        options["reasoning"] = {"effort": budget['reasoning']}
+    return options
+
+
+def trim_incomplete(text):
+    """Drop a trailing half sentence from a reply cut off by the token limit"""
+    match = _LAST_SENTENCE_END.search(text)
+    if match:
+        return text[:match.end()].strip()
+    return text.strip()
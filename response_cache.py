@@ -0,0 +1,152 @@
+# response_cache.py - Persistent GPT Response Cache for IVERI AI
+# Repeat history-free questions are answered from disk instead of the API
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+
+from utterance import Utterance
+
+
+def prompt_hash(system_prompt):
+    """Short, stable fingerprint of a system prompt"""
+    return hashlib.sha256(system_prompt.encode('utf-8')).hexdigest()[:16]
+
+
+def normalize(user_input):
+    """Lowercase, punctuation-free, single-spaced form of a question"""
+    return Utterance.of(user_input).clean
+
+
+# Answers to these change with the clock - never cached
+TIME_WORDS = ('today', 'tonight', 'tomorrow', 'yesterday', 'now', 'latest', 'current',
+              'currently', 'until', 'recent', 'recently', 'upcoming')
+TIME_PHRASES = ('last night', 'this morning', 'this week', 'this weekend', 'this month',
+                'this year', 'last week', 'next week', 'so far')
+
+
+def time_relative(user_input):
+    """True if the question's answer depends on when it is asked"""
+    utt = Utterance.of(user_input)
+    return utt.has_word(*TIME_WORDS) or utt.has_phrase(*TIME_PHRASES)
+
+
+class ResponseCache:
+    """
+    JSON-backed cache of GPT replies keyed by (model, system prompt hash,
+    normalized input), with a TTL and least-recently-used eviction.
+    """
+
+    def __init__(self, filepath, ttl=86400, max_entries=500):
+        """
+        Args:
+            filepath: JSON file to persist entries in
+            ttl: Seconds an entry stays valid
+            max_entries: Entries kept before the least recently used go
+        """
+        self.filepath = filepath
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.entries = self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        if os.path.exists(self.filepath):
+            try:
+                with open(self.filepath, 'r') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                return {}
+        return {}
+
+    def _save(self):
+        try:
+            with open(self.filepath, 'w') as f:
+                json.dump(self.entries, f)
+            self.dirty = False
+        except IOError as e:
+            print(f"Error saving response cache: {e}")
+
+    @staticmethod
+    def make_key(model, prompt_fingerprint, user_input):
+        raw = f"{model}\n{prompt_fingerprint}\n{normalize(user_input)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, model, prompt_fingerprint, user_input):
+        """Return the cached reply, or None on a miss/expired entry"""
+        key = self.make_key(model, prompt_fingerprint, user_input)
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and now - entry['saved_at'] < self.ttl:
+                entry['used_at'] = now
+                self.dirty = True
+                self.hits += 1
+                return entry['reply']
+            if entry:
+                del self.entries[key]
+                self.dirty = True
+            self.misses += 1
+            return None
+
+    def put(self, model, prompt_fingerprint, user_input, reply):
+        """Store a reply and persist the cache"""
+        key = self.make_key(model, prompt_fingerprint, user_input)
+        now = time.time()
+        with self.lock:
+            self.entries[key] = {
+                'reply': reply,
+                'model': model,
+                'prompt': prompt_fingerprint,
+                'saved_at': now,
+                'used_at': now,
+            }
+            if len(self.entries) > self.max_entries:
+                by_use = sorted(self.entries, key=lambda k: self.entries[k]['used_at'])
+                for old in by_use[:len(self.entries) - self.max_entries]:
+                    del self.entries[old]
+            self._save()
+
+    def invalidate(self, keep_prompt=None):
+        """
+        Drop cached replies.
+
+        Args:
+            keep_prompt: Keep only entries made with this prompt fingerprint
+                         (None drops everything)
+
+        Returns:
+            Number of entries removed
+        """
+        with self.lock:
+            stale = [k for k, e in self.entries.items()
+                     if keep_prompt is None or e.get('prompt') != keep_prompt]
+            for key in stale:
+                del self.entries[key]
+            if stale:
+                self._save()
+            return len(stale)
+
+    def flush(self):
+        """Persist last-used times (called at exit)"""
+        with self.lock:
+            if self.dirty:
+                self._save()
+
+    def stats(self):
+        """Return hit/miss counters and size"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self.entries),
+            }
@@ -0,0 +1,322 @@
+# router.py - Single-pass Intent Router for IVERI AI
+# Compiles every handler's trigger phrases into one Aho-Corasick automaton
+
+import json
+import threading
+from collections import OrderedDict
+
+import config
+from utterance import Utterance
+
+
+class TriggerAutomaton:
+    """
+    Aho-Corasick automaton over trigger phrases.
+
+    Each phrase is tagged with a route bit. Scanning a text once returns the
+    bitmask of every route that has at least one trigger phrase in the text,
+    with the same substring semantics as `phrase in text`.
+    """
+
+    def __init__(self):
+        self.goto = [{}]     # state -> {char: next_state}
+        self.fail = [0]      # state -> failure link
+        self.out = [0]       # state -> bitmask of routes matched here
+        self.built = False
+
+    def add(self, phrase, bit):
+        """Add a trigger phrase for the route with the given bit"""
+        state = 0
+        for ch in phrase:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(0)
+                self.goto[state][ch] = nxt
+            state = nxt
+        self.out[state] |= bit
+        self.built = False
+
+    def build(self):
+        """Compute failure links (breadth-first) and merge outputs"""
+        queue = list(self.goto[0].values())
+        for state in queue:
+            self.fail[state] = 0
+
+        i = 0
+        while i < len(queue):
+            state = queue[i]
+            i += 1
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+        self.built = True
+
+    def scan(self, text, stop_mask=0):
+        """
+        Scan text once and return the bitmask of matched routes.
+
+        Args:
+            text: Lowercased text to scan
+            stop_mask: Return early once every bit in this mask is set
+        """
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        mask = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            mask |= out[state]
+            if stop_mask and mask == stop_mask:
+                break
+        return mask
+
+
+class Router:
+    """
+    Routes an utterance to the first handler that accepts it.
+
+    Handlers are tried in the order they were added (priority order), but
+    only those whose trigger phrases occur in the text are called at all.
+    Routing decisions (which handler, which slots) are kept in an LRU cache
+    keyed on the normalized text; handlers themselves run on every call, so
+    answers like the time are never stale.
+    """
+
+    def __init__(self, fallback=None, cache_size=256):
+        """
+        Args:
+            fallback: Optional callable(utterance) -> canonical command text
+                      or None, tried when no handler accepts the input
+            cache_size: Max routing decisions to remember (0 disables)
+        """
+        self.routes = []     # (name, handler) in priority order
+        self.tools = {}      # tool name -> (description, params, utterance template, route index)
+        self.automaton = TriggerAutomaton()
+        self.fallback = fallback
+        self.cache_size = cache_size
+        self.cache = OrderedDict()   # text -> (route index, target text, slots, raw)
+        self.cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, name, handler, triggers, tools=()):
+        """
+        Register a handler.
+
+        Args:
+            name: Route name (for logging/debugging)
+            handler: Callable(utterance) -> (handled, response)
+            triggers: Every phrase the handler tests for; the handler is
+                      skipped when none of them occur in the text
+            tools: Function tools the handler serves, as rows of
+                   (name, description, {param: (description, values)}, utterance)
+        """
+        bit = 1 << len(self.routes)
+        self.routes.append((name, handler))
+        for phrase in triggers:
+            self.automaton.add(phrase.lower(), bit)
+        for tool_name, description, params, template in tools:
+            self.tools[tool_name] = (description, params, template, len(self.routes) - 1)
+
+    def build(self):
+        """Compile the automaton - call once after all routes are added"""
+        self.automaton.build()
+        return self
+
+    def _candidate_indices(self, utt):
+        if not self.automaton.built:
+            self.automaton.build()
+        all_bits = (1 << len(self.routes)) - 1
+        mask = self.automaton.scan(utt.text, stop_mask=all_bits)
+        return [i for i in range(len(self.routes)) if mask & (1 << i)]
+
+    def candidates(self, user_input):
+        """Return the (name, handler) routes whose triggers occur in the input"""
+        return [self.routes[i] for i in self._candidate_indices(Utterance.of(user_input))]
+
+    def _route(self, utt):
+        """Try the candidate handlers in order -> (route index, response)"""
+        for i in self._candidate_indices(utt):
+            handled, response = self.routes[i][1](utt)
+            if handled:
+                return i, response
+        return None, None
+
+    def _resolve(self, utt):
+        """Full routing, including the fallback -> (index, target utterance, response)"""
+        index, response = self._route(utt)
+        if index is not None or self.fallback is None:
+            return index, utt, response
+
+        command = self.fallback(utt)
+        if command:
+            target = Utterance(command)
+            index, response = self._route(target)
+            if index is not None:
+                return index, target, response
+        return None, utt, None
+
+    def dispatch(self, user_input):
+        """
+        Route user input to the first matching handler.
+
+        Args:
+            user_input: str or Utterance (built once and shared by handlers)
+
+        Returns:
+            tuple: (handled: bool, response: str)
+        """
+        utt = Utterance.of(user_input)
+
+        cached = self._cache_get(utt.text)
+        if cached is not None:
+            index, target_text, slots, raw = cached
+            if index is None:
+                return False, None
+            target = utt if target_text is None else Utterance(target_text)
+            # Slots may keep original casing ("John") - reuse them only
+            # for the exact same wording
+            if target is not utt or utt.raw.strip() == raw:
+                target.slots.update(slots)
+            handled, response = self.routes[index][1](target)
+            if handled:
+                return True, response
+            # Decision no longer holds - route from scratch
+            self._cache_pop(utt.text)
+
+        index, target, response = self._resolve(utt)
+        self._cache_put(utt.text, (
+            index,
+            None if target is utt else target.text,
+            dict(target.slots),
+            utt.raw.strip(),
+        ))
+        return index is not None, response
+
+    # === FUNCTION TOOLS ===
+
+    def tool_schemas(self):
+        """Function tool definitions (Responses API format) for every registered tool"""
+        schemas = []
+        for name, (description, params, _, _) in self.tools.items():
+            properties = {}
+            for param, (param_description, values) in params.items():
+                properties[param] = {"type": "string", "description": param_description}
+                if values:
+                    properties[param]["enum"] = list(values)
+            schemas.append({
+                "type": "function",
+                "name": name,
+                "description": description,
+                "parameters": {
+                    "type": "object",
+                    "properties": properties,
+                    "required": list(params),
+                    "additionalProperties": False,
+                },
+                "strict": True,
+            })
+        return schemas
+
+    def call_tool(self, name, arguments):
+        """
+        Run a tool call: its filled-in utterance goes straight to the
+        handler that registered the tool, so arguments ("take a note: turn
+        the volume up") are never read as other commands.
+
+        Args:
+            name: Tool name from tool_schemas()
+            arguments: dict, or the JSON string the model sent
+
+        Returns:
+            tuple: (handled: bool, response: str)
+        """
+        if name not in self.tools:
+            return False, None
+        _, params, template, index = self.tools[name]
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments or "{}")
+            except json.JSONDecodeError:
+                return False, None
+        values = {}
+        for param, (_, allowed) in params.items():
+            value = str(arguments.get(param, "")).strip()
+            if allowed and value not in allowed:
+                return False, None
+            values[param] = value
+        return self.routes[index][1](Utterance(" ".join(template.format(**values).split())))
+
+    # === ROUTING CACHE ===
+
+    def _cache_get(self, key):
+        with self.cache_lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _cache_put(self, key, entry):
+        if not self.cache_size:
+            return
+        with self.cache_lock:
+            self.cache[key] = entry
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def _cache_pop(self, key):
+        with self.cache_lock:
+            self.cache.pop(key, None)
+
+    def clear_cache(self):
+        """Forget all cached routing decisions"""
+        with self.cache_lock:
+            self.cache.clear()
+
+    def cache_stats(self):
+        """Return hit/miss counters for the routing cache"""
+        with self.cache_lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self.cache),
+            }
+
+
+def build_default_router():
+    """Build the router for all local handlers, in today's priority order"""
+    import commands
+    import memory
+    import internet_tasks
+    import classifier
+
+    # Paraphrases the triggers miss are re-routed by the offline classifier
+    router = Router(fallback=classifier.match, cache_size=config.ROUTE_CACHE_SIZE)
+    router.add('commands', commands.handle_command, commands.TRIGGERS, commands.TOOLS)
+    router.add('memory', memory.handle_memory_command, memory.TRIGGERS, memory.TOOLS)
+    router.add('internet', internet_tasks.handle_internet_task, internet_tasks.TRIGGERS,
+               internet_tasks.TOOLS)
+
+    # Optional hardware
+    try:
+        import hardware
+        router.add('hardware', hardware.handle_hardware_command, hardware.TRIGGERS, hardware.TOOLS)
+    except ImportError:
+        pass
+
+    return router.build()
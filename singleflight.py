@@ -0,0 +1,105 @@
+# singleflight.py - Request Coalescing for IVERI AI
+# Identical calls that overlap in time share one upstream request and one
+# result, instead of each hitting the API.
+
+import asyncio
+import threading
+
+
+class _Call:
+    """One in-flight call that followers wait on"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls made from threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}      # key -> _Call in flight
+        self.executed = 0    # Calls that went upstream
+        self.deduped = 0     # Calls that shared another call's result
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs), or wait for the identical call already running.
+
+        Args:
+            key: Hashable identity of the call (e.g. ('weather', 'london'))
+
+        Returns:
+            fn's result (followers get the leader's result or exception)
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.deduped += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+    def stats(self):
+        """Return {'executed', 'deduped'} counters"""
+        with self.lock:
+            return {'executed': self.executed, 'deduped': self.deduped}
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent identical coroutine calls on one event loop"""
+
+    def __init__(self):
+        self.calls = {}      # key -> asyncio.Future in flight
+        self.executed = 0
+        self.deduped = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs), or the identical call already running"""
+        future = self.calls.get(key)
+        if future is not None:
+            self.deduped += 1
+            # Shielded so a cancelled follower doesn't cancel the leader
+            return await asyncio.shield(future)
+
+        future = self.calls[key] = asyncio.get_running_loop().create_future()
+        self.executed += 1
+        try:
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved - there may be no followers
+            raise
+        finally:
+            del self.calls[key]
+
+    def stats(self):
+        """Return {'executed', 'deduped'} counters"""
+        return {'executed': self.executed, 'deduped': self.deduped}
@@ -0,0 +1,204 @@
+# slots.py - Slot Extraction for IVERI AI
+# One precompiled pattern per intent; each returns typed slots in a single match
+
+import re
+
+from utterance import Utterance
+
+# Trailing words that are never part of a city/query
+_TAIL = r"(?:\s+(?:today|now|right now|please|tonight|tomorrow|currently))*"
+
+# A search "query" made only of these is no query ("search youtube for")
+_FILLER = {'for', 'on', 'in', 'from', 'to', 'about', 'a', 'an', 'the', 'me', 'it',
+           'some', 'something', 'please', 'youtube', 'google', 'wikipedia'}
+
+YOUTUBE_RE = re.compile(
+    r"\b(?:(?:search|play|find)(?:\s+on)?\s+youtube(?:\s+for)?"
+    r"|youtube\s+(?:search|play|find)(?:\s+for)?"
+    r"|(?:search|play|find)(?:\s+for)?)"
+    r"\s+(?P<query>.+?)"
+    r"(?:\s+(?:on|in|from)\s+youtube)?$"
+)
+
+GOOGLE_RE = re.compile(
+    r"\b(?:search(?:\s+on)?\s+google|google\s+search|search|google)(?:\s+for)?"
+    r"\s+(?P<query>.+)$"
+)
+
+WIKIPEDIA_RE = re.compile(
+    r"(?:(?:search|look up|open)\s+)?(?:(?:on|in)\s+)?wikipedia(?:\s+(?:for|about))?\s+(?P<query>.+)$"
+    r"|(?:(?:search|look up)(?:\s+for)?\s+)?(?P<query2>.+?)\s+(?:on|in|from)\s+wikipedia$"
+)
+
+# Greedy prefix: the city comes after the last "in/for/at"
+WEATHER_RE = re.compile(
+    r"\bweather\b.*\b(?:in|for|at)\s+(?:the\s+)?(?P<city>.+?)" + _TAIL + r"$"
+    r"|\bweather\b"
+)
+
+# Lazy prefix: everything after the first "in/for/at", split into places
+# (matched on utt.text - commas separate places)
+WEATHER_PLACES_RE = re.compile(
+    r"\bweather\b.*?\b(?:in|for|at)\s+(?:the\s+)?(?P<places>.+?)" + _TAIL + r"[?.!]*$"
+)
+PLACE_SPLIT_RE = re.compile(r"\s*(?:,|&|\band\b)\s*(?:(?:in|for|at)\s+)?(?:the\s+)?")
+
+NEWS_CATEGORIES = {
+    'tech': 'technology',
+    'technology': 'technology',
+    'sport': 'sports',
+    'sports': 'sports',
+    'business': 'business',
+    'finance': 'business',
+    'entertainment': 'entertainment',
+    'celebrity': 'entertainment',
+    'health': 'health',
+    'science': 'science',
+}
+NEWS_RE = re.compile(r"\b(" + "|".join(sorted(NEWS_CATEGORIES, key=len, reverse=True)) + r")\b")
+
+REMEMBER_RE = re.compile(r"\bremember\s+(?:that\s+)?my\s+(?P<key>.+?)\s+(?:is|are)\s+(?P<value>.+?)[.!]*$")
+RECALL_RE = re.compile(r"\b(?:what is|what's|whats)\s+my\s+(?P<key>.+?),?" + _TAIL + r"[?.!]*$")
+FORGET_RE = re.compile(r"\bforget\s+my\s+(?P<key>.+?),?" + _TAIL + r"[?.!]*$")
+# At most one connector - "note that to do list is long" keeps "to do"
+NOTE_RE = re.compile(
+    r"\b(?:add|make|take)\s+a\s+note(?:\s*[:,])?(?:\s+(?:to say|saying|that|to))?\s+(?P<text>.+?)\s*$"
+)
+
+
+def _original(utt, match, group):
+    """Slice a group from the original-case input when offsets line up"""
+    raw = utt.raw.strip()
+    if len(raw) == len(utt.text):
+        return raw[match.start(group):match.end(group)].strip()
+    return match.group(group).strip()
+
+
+def _query(query):
+    """{'query'}, or None if it is only connectors ("for", "on youtube")"""
+    if query and not set(query.split()) <= _FILLER:
+        return {'query': query}
+    return None
+
+
+def extract_youtube_query(utt):
+    """'search youtube for lofi' / 'play despacito on youtube' -> {'query'}"""
+    match = YOUTUBE_RE.search(utt.clean)
+    return _query(match.group('query')) if match else None
+
+
+def extract_google_query(utt):
+    """'search for python' / 'google ai news' -> {'query'}"""
+    match = GOOGLE_RE.search(utt.clean)
+    return _query(match.group('query')) if match else None
+
+
+def extract_wikipedia_query(utt):
+    """'wikipedia alan turing' / 'look up python on wikipedia' -> {'query'}"""
+    match = WIKIPEDIA_RE.search(utt.clean)
+    return _query(match.group('query') or match.group('query2')) if match else None
+
+
+def extract_weather_city(utt):
+    """'what's the weather in new york today' -> {'city': 'New York'}"""
+    match = WEATHER_RE.search(utt.clean)
+    if match:
+        city = match.group('city')
+        return {'city': city.title() if city else None}
+    return None
+
+
+def extract_weather_cities(utt):
+    """'weather in delhi, mumbai and pune' -> {'cities': ['Delhi', 'Mumbai', 'Pune']}"""
+    match = WEATHER_PLACES_RE.search(utt.text)
+    if match:
+        places = [p.strip(" '\".") for p in PLACE_SPLIT_RE.split(match.group('places'))]
+        places = [p for p in places if p]
+        if len(places) > 1:
+            return {'cities': [p.title() for p in places]}
+    single = extract_weather_city(utt)
+    if single:
+        return {'cities': [single['city']] if single['city'] else []}
+    return None
+
+
+def extract_news_category(utt):
+    """'tech news' -> {'category': 'technology'}, plain 'news' -> 'general'"""
+    match = NEWS_RE.search(utt.clean)
+    return {'category': NEWS_CATEGORIES[match.group(1)] if match else 'general'}
+
+
+def extract_news_categories(utt):
+    """'tech and sports news' -> {'categories': ['technology', 'sports']}"""
+    categories = []
+    for match in NEWS_RE.finditer(utt.clean):
+        category = NEWS_CATEGORIES[match.group(1)]
+        if category not in categories:
+            categories.append(category)
+    return {'categories': categories or ['general']}
+
+
+def extract_memory_fact(utt):
+    """'remember my name is John' -> {'key': 'name', 'value': 'John'}"""
+    match = REMEMBER_RE.search(utt.text)
+    if match:
+        return {'key': match.group('key').strip(), 'value': _original(utt, match, 'value')}
+    return None
+
+
+def extract_recall_key(utt):
+    """"what's my name please" -> {'key': 'name'}"""
+    match = RECALL_RE.search(utt.text)
+    if match:
+        return {'key': match.group('key').strip()}
+    return None
+
+
+def extract_forget_key(utt):
+    """"forget my name" -> {'key': 'name'}"""
+    match = FORGET_RE.search(utt.text)
+    if match:
+        return {'key': match.group('key').strip()}
+    return None
+
+
+def extract_note(utt):
+    """'take a note that the meeting is at 5' -> {'text': 'the meeting is at 5'}"""
+    match = NOTE_RE.search(utt.text)
+    if match:
+        return {'text': _original(utt, match, 'text')}
+    return None
+
+
+# Intent name -> extractor
+EXTRACTORS = {
+    'youtube_search': extract_youtube_query,
+    'google_search': extract_google_query,
+    'wikipedia': extract_wikipedia_query,
+    'weather': extract_weather_city,
+    'weather_cities': extract_weather_cities,
+    'news': extract_news_category,
+    'news_categories': extract_news_categories,
+    'remember': extract_memory_fact,
+    'recall': extract_recall_key,
+    'forget': extract_forget_key,
+    'add_note': extract_note,
+}
+
+
+def extract(intent, user_input):
+    """
+    Extract the slots for an intent (memoized on the Utterance, so the
+    router cache can hand them back on repeat phrases).
+
+    Args:
+        intent: Key of EXTRACTORS
+        user_input: str or Utterance
+
+    Returns:
+        dict of slots, or None if the utterance doesn't fit the intent
+    """
+    utt = Utterance.of(user_input)
+    if intent not in utt.slots:
+        utt.slots[intent] = EXTRACTORS[intent](utt)
+    return utt.slots[intent]
@@ -1,47 +1,117 @@
 # speech.py - Speech Recognition for IVERI AI
 
+import threading
+
 import speech_recognition as sr
 
-# Initialize recognizer
-recognizer = sr.Recognizer()
+import config
+import stt
+from mic_stream import MicStream
+
+# Microphone kept open between turns, its threshold calibrated from idle audio
+# (capture and endpointing happen in mic_stream.py, recognition in stt.py)
+mic = MicStream(calibration_file=config.MIC_CALIBRATION_FILE)
+
+
+def start_microphone():
+    """Open the microphone in the background so the next listen() starts at once"""
+    threading.Thread(target=mic.start, name="mic-open", daemon=True).start()
+    stt.preload()
+
+
+def release_microphone():
+    """Close the microphone (another recorder, e.g. the wake word, needs it)"""
+    mic.stop()
+
+
+def available():
+    """False while no speech recognizer can be used (type instead)"""
+    return stt.select() is not None or bool(stt.racers())
+
+
+class _PartialEcho:
+    """on_audio callback: feeds the streaming decoders, echoes what the first has so far"""
+
+    def __init__(self, streams):
+        self.streams = streams
+        self.shown = ""
+
+    def __call__(self, chunk):
+        partial = [stream.feed(chunk) for stream in self.streams][0]
+        if partial and partial != self.shown:
+            print(f"\r💬 {partial}", end="", flush=True)
+            self.shown = partial
 
-# Stability settings for better recognition
-recognizer.energy_threshold = 300
-recognizer.pause_threshold = 0.8
 
+def _recognize(backend, audio):
+    """Recognize a clip, retrying offline if the cloud recognizer fails"""
+    try:
+        return backend.recognize(audio)
+    except sr.RequestError:
+        fallback = stt.get(config.STT_OFFLINE_FALLBACK) if config.STT_OFFLINE_FALLBACK else None
+        if fallback is None or fallback is backend or not fallback.ready():
+            raise
+        print(f"🔌 {backend.name} failed - recognizing with {fallback.name}")
+        return fallback.recognize(audio)
 
-def listen():
+
+def listen(preroll=True):
     """
     Listen for user speech and convert to text.
     
+    Args:
+        preroll: Keep audio from just before the call (pass False right
+                 after speaking a prompt)
+    
     Returns:
         Recognized text string, or None if recognition failed
     """
-    with sr.Microphone() as source:
-        print("🎤 Listening...")
+    # Several recognizers configured to race, or the one to use now
+    backends = stt.racers()
+    if len(backends) < 2:
+        backend = stt.select()
+        if backend is None:
+            print("🔌 Speech recognition is unavailable right now")
+            return None
+        backends = [backend]
+    
+    print("🎤 Listening...")
+    try:
+        # Streaming recognizers decode while the user is still talking
+        streams = {backend.name: backend.stream(mic.sample_rate)
+                   for backend in backends if backend.streaming}
+        echo = _PartialEcho(list(streams.values())) if streams else None
+
+        # Recording starts at once - the stream is already calibrated
+        audio = mic.listen(timeout=config.LISTEN_TIMEOUT,
+                           phrase_time_limit=config.PHRASE_TIME_LIMIT, preroll=preroll,
+                           on_audio=echo)
+        if echo and echo.shown:
+            print()
+        print("🔄 Processing...")
         
-        # Adjust for ambient noise
-        recognizer.adjust_for_ambient_noise(source, duration=0.5)
+        if len(backends) > 1:
+            # Same audio to every recognizer, first confident answer wins
+            text = stt.race(audio, backends, streams)[0]
+        elif streams:
+            text = streams[backends[0].name].finish()
+        else:
+            text = _recognize(backends[0], audio)
+        print(f"📝 You said: {text}")
+        return text
         
-        try:
-            # Listen with timeout and phrase limit
-            audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-            print("🔄 Processing...")
-            
-            # Use Google Speech Recognition with explicit language
-            text = recognizer.recognize_google(audio, language="en-US")
-            print(f"📝 You said: {text}")
-            return text
-            
-        except sr.WaitTimeoutError:
-            print("⏰ No speech detected")
-            return None
-        except sr.UnknownValueError:
-            print("❓ Could not understand audio")
-            return None
-        except sr.RequestError as e:
-            print(f"❌ Speech recognition error: {e}")
-            return None
+    except sr.WaitTimeoutError:
+        print("⏰ No speech detected")
+        return None
+    except sr.UnknownValueError:
+        print("❓ Could not understand audio")
+        return None
+    except sr.RequestError as e:
+        print(f"❌ Speech recognition error: {e}")
+        return None
+    except OSError as e:
+        print(f"❌ Microphone error: {e}")
+        return None
 
 
 def listen_for_duration(duration=5):
@@ -54,14 +124,16 @@ def listen_for_duration(duration=5):
     Returns:
         Recognized text string, or None if recognition failed
     """
-    with sr.Microphone() as source:
-        print(f"🎤 Listening for {duration} seconds...")
-        recognizer.adjust_for_ambient_noise(source, duration=0.3)
-        
-        try:
-            audio = recognizer.record(source, duration=duration)
-            text = recognizer.recognize_google(audio, language="en-US")
-            return text
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            return None
+    backend = stt.select()
+    if backend is None:
+        print("🔌 Speech recognition is unavailable right now")
+        return None
+    
+    print(f"🎤 Listening for {duration} seconds...")
+    try:
+        audio = mic.record(duration)
+        text = _recognize(backend, audio)
+        return text
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return None
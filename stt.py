@@ -0,0 +1,349 @@
+# stt.py - Speech-to-Text Backends for IVERI AI
+# One interface over the recognizers listen() can use: Google's web API
+# (the default, recognizes the clip once recording ends) and on-device
+# Vosk, which decodes while the audio streams in, reports partial
+# hypotheses and keeps working without the network. race() asks several
+# at once and takes the first confident answer.
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import speech_recognition as sr
+
+import circuit_breaker
+import config
+from latency import LatencyStats
+
+try:
+    import vosk
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+
+class Backend:
+    """
+    A speech recognizer.
+
+    recognize(audio) turns a finished clip into text, transcribe(audio)
+    into (text, confidence). Streaming backends also offer
+    stream(sample_rate): a decoder fed chunk by chunk while the user
+    speaks, so only the last few hundred ms are left to decode once they
+    stop. All raise sr.UnknownValueError if nothing was understood and
+    sr.RequestError if the recognizer itself failed.
+    """
+
+    name = None
+    streaming = False    # Decodes while audio arrives (has stream())
+    offline = False      # Works without the network
+
+    def installed(self):
+        """True if the backend's library and model are present"""
+        return True
+
+    def ready(self):
+        """True if the backend can be used right now"""
+        return self.installed()
+
+    def recognize(self, audio):
+        raise NotImplementedError
+
+    def transcribe(self, audio):
+        """(text, confidence 0-1, or None if the recognizer doesn't say)"""
+        return self.recognize(audio), None
+
+    def stream(self, sample_rate):
+        raise NotImplementedError(f"{self.name} does not stream")
+
+
+class GoogleBackend(Backend):
+    """Google's free web speech API, via speech_recognition"""
+
+    name = 'google'
+
+    # A quarter second of silence - Google answers "nothing recognized" if it's up
+    _PROBE_AUDIO = sr.AudioData(b"\0" * 8000, 16000, 2)
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+        # While Google is down, callers fall back (or ask to type) at once
+        self.breaker = circuit_breaker.get('speech', probe=self._probe)
+
+    def _probe(self):
+        """Breaker health check: any answer from the recognizer means it's up"""
+        try:
+            self.recognizer.recognize_google(self._PROBE_AUDIO, language=config.SPEECH_LANGUAGE)
+        except sr.UnknownValueError:
+            pass
+
+    def ready(self):
+        return self.breaker.allow()
+
+    def recognize(self, audio):
+        return self.transcribe(audio)[0]
+
+    def transcribe(self, audio):
+        """
+        Best of Google's n-best list with its confidence, reporting outcome
+        and latency to the breaker.
+        """
+        started = time.perf_counter()
+        try:
+            result = self.recognizer.recognize_google(audio, language=config.SPEECH_LANGUAGE,
+                                                      show_all=True)
+        except sr.UnknownValueError:
+            self.breaker.record(True, time.perf_counter() - started)
+            raise
+        except sr.RequestError as e:
+            self.breaker.record(False, error=e)
+            raise
+        self.breaker.record(True, time.perf_counter() - started)
+
+        # Older speech_recognition versions return [] for "nothing heard"
+        alternatives = result.get('alternative') if isinstance(result, dict) else None
+        if not alternatives or 'transcript' not in alternatives[0]:
+            raise sr.UnknownValueError()
+        # Google lists the best first; only it carries a confidence, and not always
+        return alternatives[0]['transcript'], alternatives[0].get('confidence')
+
+
+class VoskStream:
+    """Incremental Vosk decoder for one phrase"""
+
+    def __init__(self, model, sample_rate):
+        self.decoder = vosk.KaldiRecognizer(model, sample_rate)
+        self.decoder.SetWords(True)      # Per-word confidences
+        self.segments = []       # Text of the parts Vosk has finalized
+        self.confidences = []    # ...and of their words
+        self.partial = ""
+
+    def feed(self, chunk):
+        """
+        Decode one chunk of 16-bit mono audio.
+
+        Returns:
+            The hypothesis for everything heard so far
+        """
+        if self.decoder.AcceptWaveform(chunk):
+            # Vosk heard a pause and finalized a segment
+            self._segment(self.decoder.Result())
+            self.partial = ""
+        else:
+            self.partial = json.loads(self.decoder.PartialResult()).get('partial', "")
+        return " ".join(self.segments + [self.partial]).strip()
+
+    def _segment(self, result):
+        result = json.loads(result)
+        if result.get('text'):
+            self.segments.append(result['text'])
+            self.confidences.extend(word['conf'] for word in result.get('result', []))
+
+    def final(self):
+        """Flush the decoder: (phrase, mean word confidence)"""
+        self._segment(self.decoder.FinalResult())
+        text = " ".join(self.segments)
+        if not text:
+            raise sr.UnknownValueError()
+        confidence = sum(self.confidences) / len(self.confidences) if self.confidences else None
+        return text, confidence
+
+    def finish(self):
+        """Flush the decoder and return the phrase"""
+        return self.final()[0]
+
+
+class VoskBackend(Backend):
+    """On-device Kaldi recognizer (pip install vosk, model in VOSK_MODEL_PATH)"""
+
+    name = 'vosk'
+    streaming = True
+    offline = True
+
+    def __init__(self, model_path=None):
+        self.model_path = model_path or config.VOSK_MODEL_PATH
+        self.model = None
+        self.lock = threading.Lock()
+
+    def installed(self):
+        return VOSK_AVAILABLE and os.path.isdir(self.model_path)
+
+    def load(self):
+        """Load the model (a second or two) - done once, on first use"""
+        with self.lock:
+            if self.model is None:
+                if not self.installed():
+                    raise sr.RequestError(f"Vosk model not found at {self.model_path}"
+                                          if VOSK_AVAILABLE else "vosk is not installed")
+                vosk.SetLogLevel(-1)
+                self.model = vosk.Model(self.model_path)
+        return self.model
+
+    def stream(self, sample_rate):
+        return VoskStream(self.load(), sample_rate)
+
+    def recognize(self, audio):
+        return self.transcribe(audio)[0]
+
+    def transcribe(self, audio):
+        stream = self.stream(audio.sample_rate)
+        stream.feed(audio.get_raw_data(convert_width=2))
+        return stream.final()
+
+
+# Backend name -> class; add your own here (whisper.cpp, ...)
+BACKENDS = {
+    'google': GoogleBackend,
+    'vosk': VoskBackend,
+}
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def get(name):
+    """Return the backend called `name`, creating it on first use (None if unknown)"""
+    with _lock:
+        if name not in _instances:
+            if name not in BACKENDS:
+                return None
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
+
+
+def select():
+    """
+    The backend to recognize with now: config.STT_BACKEND, or the offline
+    fallback while it is unavailable (None if neither can be used).
+    """
+    for name in (config.STT_BACKEND, config.STT_OFFLINE_FALLBACK):
+        backend = get(name) if name else None
+        if backend is not None and backend.ready():
+            return backend
+    return None
+
+
+def racers():
+    """The backends of config.STT_RACE that can be used right now"""
+    backends = [get(name) for name in config.STT_RACE]
+    return [backend for backend in backends if backend is not None and backend.ready()]
+
+
+def preload():
+    """Load on-device models in the background so the first turn isn't slowed"""
+    for name in (config.STT_BACKEND, config.STT_OFFLINE_FALLBACK) + tuple(config.STT_RACE):
+        backend = get(name) if name else None
+        if isinstance(backend, VoskBackend) and backend.installed():
+            threading.Thread(target=backend.load, name="stt-load", daemon=True).start()
+
+
+# --- racing ---
+
+# Recognitions run here during a race (losers finish in the background)
+_workers = ThreadPoolExecutor(max_workers=4, thread_name_prefix="stt")
+
+_race_lock = threading.Lock()
+_wins = {}       # backend name -> races won
+_margins = {}    # backend name -> LatencyStats of seconds it finished ahead
+
+
+def _finished_later(winner, won_at, backend, future):
+    """Done callback of a losing recognition: log how far behind it was"""
+    if future.cancelled():
+        return
+    margin = time.perf_counter() - won_at
+    try:
+        text, confidence = future.result()
+        outcome = f"{text!r}" + (f" at {confidence:.2f}" if confidence is not None else "")
+    except Exception as e:
+        outcome = type(e).__name__
+    with _race_lock:
+        _margins.setdefault(winner, LatencyStats()).add(margin)
+    print(f"🏁 {backend.name} finished {margin:.2f}s after {winner} ({outcome})")
+
+
+def race(audio, backends, streams=None, min_confidence=None, timeout=None):
+    """
+    Recognize one clip with several backends at once.
+
+    The first answer at or above `min_confidence` wins and the rest are
+    cancelled (requests already on the wire are left to finish in the
+    background; their answers are only logged). With no confident answer,
+    the most confident one is returned once all are in or time runs out.
+
+    Args:
+        audio: sr.AudioData of the phrase
+        backends: Backends to race
+        streams: {backend name: stream already fed this phrase}, for
+                 streaming backends (they only have to finish decoding)
+        min_confidence: Default config.STT_MIN_CONFIDENCE
+        timeout: Seconds to wait for answers (default config.STT_RACE_TIMEOUT)
+
+    Returns:
+        (text, confidence, winning backend name)
+    """
+    if min_confidence is None:
+        min_confidence = config.STT_MIN_CONFIDENCE
+    if timeout is None:
+        timeout = config.STT_RACE_TIMEOUT
+    streams = streams or {}
+    started = time.perf_counter()
+    futures = {}
+    for backend in backends:
+        stream = streams.get(backend.name)
+        job = _workers.submit(stream.final) if stream else _workers.submit(backend.transcribe, audio)
+        futures[job] = backend
+
+    pending = set(futures)
+    best, errors = None, []
+    deadline = started + timeout
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.perf_counter()),
+                             return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            backend = futures[future]
+            try:
+                text, confidence = future.result()
+            except (sr.UnknownValueError, sr.RequestError) as e:
+                errors.append(e)
+                continue
+            score = confidence if confidence is not None else 0.0
+            if best is None or score > best[1]:
+                best = (text, score, backend.name)
+            if score >= min_confidence:
+                pending = set()      # A confident answer - stop waiting
+                break
+
+    won_at = time.perf_counter()
+    for future, backend in futures.items():
+        if not future.cancel() and not future.done() and best is not None:
+            future.add_done_callback(
+                lambda f, b=backend: _finished_later(best[2], won_at, b, f))
+
+    if best is None:
+        if any(isinstance(e, sr.UnknownValueError) for e in errors):
+            raise sr.UnknownValueError()
+        raise errors[0] if errors else sr.RequestError(f"no recognizer answered within {timeout:.1f}s")
+
+    text, confidence, winner = best
+    with _race_lock:
+        _wins[winner] = _wins.get(winner, 0) + 1
+    confident = "" if confidence >= min_confidence else ", none confident"
+    print(f"🏁 {winner} won the recognition race in {won_at - started:.2f}s "
+          f"(confidence {confidence:.2f}{confident})")
+    return best
+
+
+def race_stats():
+    """{backend name: {'wins', 'ahead_p50', 'ahead_max'}} - how races were won"""
+    with _race_lock:
+        report = {}
+        for name, wins in _wins.items():
+            margins = _margins[name].summary() if name in _margins else {}
+            report[name] = {'wins': wins, 'ahead_p50': margins.get('p50'),
+                            'ahead_max': margins.get('max')}
+        return report
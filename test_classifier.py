@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Evaluate the local intent classifier on a labeled set of paraphrases"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import sys
+import time
+
+print("=" * 50)
+print("IVERI INTENT CLASSIFIER EVALUATION")
+print("=" * 50)
+
+import classifier
+import config
+
+if classifier.classifier is None:
+    print("SKIP: numpy not installed")
+    sys.exit(0)
+
+# (utterance the exact router misses, expected command or None for GPT)
+EVAL_SET = [
+    ("could you pull up youtube", "open youtube"),
+    ("bring up netflix please", "open netflix"),
+    ("i want to see my downloads", "open downloads"),
+    ("launch the calculator", "open calculator"),
+    ("fire up spotify", "open spotify"),
+    ("take me to reddit", "open reddit"),
+    ("show me my documents", "open documents"),
+    ("can you start the terminal", "open terminal"),
+    ("go to gmail", "open gmail"),
+    ("pull up github for me", "open github"),
+    ("what's the time right now", "what time is it"),
+    ("tell me what time it is", "what time is it"),
+    ("what's today's date", "what day is it"),
+    ("how much battery do i have", "battery status"),
+    ("read me my notes", "show notes"),
+    ("what are today's headlines", "news"),
+    ("latest technology news", "tech news"),
+    ("is it going to rain", "weather"),
+    # Device and destructive actions are never run on a guess - GPT's tools do them
+    ("make it a bit louder", None),
+    ("turn the sound down", None),
+    ("it's too loud", None),
+    ("grab a screenshot", None),
+    ("forget the conversation", None),
+    ("switch on the light", None),
+    ("switch off the lights", None),
+    # Look-alikes of commands
+    ("go to sleep", None),
+    ("start the car", None),
+    ("i want to see my friends", None),
+    ("lock the door", None),
+    ("what do you know about black holes", None),
+    ("what are my options", None),
+    ("show me a picture of a cat", None),
+    ("go to the kitchen", None),
+    ("start the washing machine", None),
+    ("show me a map of italy", None),
+    # The label would drop the city - GPT's weather tool takes it
+    ("is it raining in tokyo", None),
+    ("what is the capital of japan", None),
+    ("tell me a fun fact", None),
+    ("how do airplanes fly", None),
+    ("who is the president of india", None),
+    ("write a haiku about autumn", None),
+    ("what is netflix", None),
+    ("how are you today", None),
+    ("what's two plus two", None),
+    ("explain machine learning simply", None),
+    ("good night", None),
+    ("who wrote hamlet", None),
+    ("what does a cpu do", None),
+    ("recommend a book", None),
+    ("how tall is mount everest", None),
+    ("thanks a lot", None),
+]
+
+threshold = config.INTENT_CONFIDENCE_THRESHOLD
+print(f"\nThreshold: {threshold}\n")
+
+correct = wrong = missed = 0
+gpt_calls_before = len(EVAL_SET)
+gpt_calls_after = 0
+start = time.perf_counter()
+for text, expected in EVAL_SET:
+    got = classifier.match(text, threshold)
+    label, score = classifier.classifier.predict(text)
+    if got is None:
+        gpt_calls_after += 1
+    if got == expected:
+        correct += 1
+        status = "OK"
+    elif got is None:
+        missed += 1
+        status = "MISS"
+    else:
+        wrong += 1
+        status = "WRONG"
+    print(f"  [{status}] {text!r} -> {got} ({label}, {score:.2f})")
+elapsed = (time.perf_counter() - start) / len(EVAL_SET) * 1000
+
+commands_total = sum(1 for _, e in EVAL_SET if e is not None)
+print(f"\n  Accuracy: {correct}/{len(EVAL_SET)}")
+print(f"  Wrong local actions: {wrong}")
+print(f"  Commands sent to GPT: {missed}/{commands_total}")
+print(f"  GPT calls: {gpt_calls_before} -> {gpt_calls_after}")
+print(f"  Speed: {elapsed:.2f} ms per utterance")
+print(f"  {'OK' if wrong == 0 else 'FAIL'}: no local action taken on a wrong guess")
+
+print("\n" + "=" * 50)
+print("CLASSIFIER EVALUATED!")
+print("=" * 50)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test token-budgeted conversation history and its rolling summary"""
+
+import threading
+import time
+
+print("=" * 50)
+print("IVERI CONVERSATION HISTORY TEST")
+print("=" * 50)
+
+from conversation import ConversationHistory, estimate_tokens
+
+
+def check(name, ok):
+    print(f"  {'OK' if ok else 'FAIL'}: {name}")
+
+
+summaries = []      # (previous summary, messages folded)
+compactions = []
+
+
+def summarize(previous, messages):
+    summaries.append((previous, messages))
+    return f"summary {len(summaries)}"
+
+
+def settle(history):
+    """Wait for a background summary to land"""
+    for _ in range(200):
+        if not history.summarizing:
+            return
+        time.sleep(0.01)
+
+
+def turn(i):
+    # ~40 tokens per exchange
+    return f"question {i} " + "word " * 10, f"answer {i} " + "word " * 10
+
+
+TURN_TOKENS = sum(estimate_tokens(text) + 4 for text in turn(0))
+
+
+print("\n[BUDGET]")
+history = ConversationHistory(summarize=summarize, token_budget=300, target_tokens=150,
+                              recent_turns=2, max_turns=20,
+                              on_compact=lambda: compactions.append(len(history)))
+added = 0
+while history.tokens() + TURN_TOKENS <= 300:
+    history.add(*turn(added))
+    added += 1
+settle(history)
+check(f"no summary while under budget ({added} turns, {history.tokens()} tokens)", not summaries)
+
+history.add(*turn(added))
+added += 1
+settle(history)
+check("crossing the budget starts one summary", len(summaries) == 1)
+check(f"compacted down to the target ({history.tokens()} <= 150 tokens)", history.tokens() <= 150)
+check("the newest turns stay verbatim", len(history) >= 2
+      and history.messages()[-1]['content'] == turn(added - 1)[1])
+folded = summaries[0][1]
+check(f"folded the oldest {len(folded) // 2} turns", folded[0]['content'] == turn(0)[0])
+
+print("\n[SUMMARY FOLDING]")
+before = len(summaries)
+while len(summaries) == before:
+    history.add(*turn(added))
+    added += 1
+    settle(history)
+check("the next summary builds on the previous one", summaries[-1][0] == "summary 1")
+messages = history.messages()
+check("summary is sent ahead of the verbatim turns",
+      messages[0]['role'] == 'system' and "summary 2" in messages[0]['content'])
+
+print("\n[CALLBACK FREQUENCY]")
+for _ in range(40):
+    history.add(*turn(added))
+    added += 1
+    settle(history)
+turns_per_summary = added / len(summaries)
+check(f"{len(summaries)} summaries over {added} turns (one per {turns_per_summary:.1f})",
+      turns_per_summary >= 2.5)
+check(f"on_compact once per summary ({len(compactions)})", len(compactions) == len(summaries))
+
+# Recent turns longer than the budget on their own: nothing worth folding
+long_turns = ConversationHistory(summarize=summarize, token_budget=50, recent_turns=2)
+before = len(summaries)
+long_turns.add("tell me a long story", "once " * 300)
+long_turns.add("another", "once " * 300)
+settle(long_turns)
+check("no summary when only the recent turns are over budget", len(summaries) == before)
+
+print("\n[TRIM & CLEAR]")
+trims = []
+trimmed = ConversationHistory(max_turns=8, on_compact=lambda: trims.append(1))
+for i in range(24):
+    trimmed.add(*turn(i))
+check(f"no summarizer: capped at max_turns ({len(trimmed)})", len(trimmed) <= 8)
+check(f"trimmed in batches, not every turn ({len(trims)} trims over 24 turns)", len(trims) <= 8)
+
+gate = threading.Event()
+slow = ConversationHistory(summarize=lambda previous, messages: gate.wait(2) and "stale",
+                           token_budget=100, recent_turns=1)
+for i in range(4):
+    slow.add(*turn(i))
+slow.clear()
+gate.set()
+settle(slow)
+check("a summary finished after clear() is discarded", not slow and slow.summary == "")
+check(f"estimate_tokens ~4 chars per token ({estimate_tokens('x' * 400)})",
+      estimate_tokens('x' * 400) == 101)
+
+print("\n" + "=" * 50)
+print("CONVERSATION HISTORY CHECKED!")
+print("=" * 50)
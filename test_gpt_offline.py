@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Exercise gpt.py against the local fake OpenAI server - no key or network needed"""
+
+import os
+import time
+
+from fake_openai import FakeOpenAIServer
+
+print("=" * 50)
+print("IVERI GPT OFFLINE TEST")
+print("=" * 50)
+
+server = FakeOpenAIServer(
+    ttfb=0.05,
+    tokens_per_second=200,
+    replies={
+        "capital of france": "Paris.",
+        "story": "Once upon a time. The end.",
+        "how late": {"tool": "device_command", "arguments": {"command": "what time is it"}},
+    },
+    seed=1
+).start()
+
+# Point the client at the fake before gpt.py builds it
+import config
+config.OPENAI_BASE_URL = server.base_url
+config.RESPONSE_CACHE_FILE = os.path.join(config.DATA_DIR, "test_response_cache.json")
+config.GPT_HEDGE_AFTER = 0.5
+os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+
+import gpt
+gpt.response_cache.invalidate()
+
+
+def check(name, ok):
+    print(f"  {'OK' if ok else 'FAIL'}: {name}")
+
+
+print("\n[RESPONSES]")
+check("plain reply", gpt.get_response("what is the capital of france") == "Paris.")
+chunks = list(gpt.stream_response("tell me a story"))
+check(f"streamed in {len(chunks)} chunks", len(chunks) > 1 and "".join(chunks) == "Once upon a time. The end.")
+
+
+async def from_another_loop():
+    reply = await gpt.aget_response("capital of france?", use_history=False)
+    chunks = [chunk async for chunk in gpt.astream_response("another story", use_history=False)]
+    return reply, "".join(chunks)
+
+import asyncio
+reply, story = asyncio.run(from_another_loop())
+check("awaitable from the caller's own event loop",
+      reply == "Paris." and story == "Once upon a time. The end.")
+
+print("\n[CONVERSATION STATE]")
+gpt.clear_history()
+gpt.get_response("hello")
+gpt.get_response("and again")
+last = server.requests[-1]
+check("follow-up chained with previous_response_id", 'previous_response_id' in last)
+check("follow-up sends only the new message", len(last['input']) == 1)
+gpt.last_response_id = "resp_missing"
+check("lost chain falls back to history", gpt.get_response("still there?") != gpt.FALLBACK_REPLY)
+
+# A long session: compaction now and then, chaining in between
+gpt.clear_history()
+first = len(server.requests)
+for i in range(16):
+    gpt.get_response(f"question {i}: " + "tell me more about that " * 8)
+    time.sleep(0.1)         # Let a background summary land
+session = server.requests[first:]
+summaries = [r for r in session if r.get('instructions') == gpt.SUMMARY_PROMPT]
+turns = [r for r in session if r.get('instructions') != gpt.SUMMARY_PROMPT]
+chained = [r for r in turns if 'previous_response_id' in r]
+check(f"{len(summaries)} summary requests over {len(turns)} turns", 0 < len(summaries) <= len(turns) // 4)
+check(f"{len(chained)}/{len(turns)} turns chained with previous_response_id",
+      len(chained) >= len(turns) * 2 // 3)
+check("chain restarted from the summary once per compaction",
+      len(turns) - len(chained) == len(summaries) + 1)
+
+print("\n[TOOLS]")
+import router
+tool_router = router.Router()
+tool_router.add('clock', lambda utt: (utt.has_phrase('what time is it'), "It's noon."), ['time'],
+                [('device_command', "Run a device command.", {'command': ("Command", ['what time is it'])}, "{command}")])
+tool_router.build()
+gpt.register_tools(tool_router.tool_schemas(), tool_router.call_tool)
+gpt.clear_history()
+before = server.stats['requests']
+check("tool call answered in one round-trip",
+      gpt.get_response("how late is it") == "It's noon." and server.stats['requests'] == before + 1)
+check("streamed tool call", "".join(gpt.stream_response("how late is it now")) == "It's noon.")
+check("tool schemas sent", server.requests[-1]['tools'][0]['name'] == 'device_command')
+check("tool result owed to the chain is sent next turn",
+      gpt.get_response("thanks") != gpt.FALLBACK_REPLY
+      and server.requests[-1]['input'][0]['type'] == 'function_call_output')
+gpt.register_tools([], None)
+
+print("\n[CACHE]")
+before = server.stats['requests']
+gpt.get_simple_response("capital of france please")
+gpt.get_simple_response("Capital of France, please?")
+check("repeat question served from cache", server.stats['requests'] == before + 1)
+for question in ("who won the match last night", "how many days until christmas",
+                 "what is the latest iphone"):
+    before = server.stats['requests']
+    gpt.get_simple_response(question)
+    gpt.get_simple_response(question)
+    check(f"time-relative '{question}' asked again", server.stats['requests'] == before + 2)
+
+print("\n[COALESCING]")
+from concurrent.futures import ThreadPoolExecutor
+gpt.response_cache.invalidate()
+before = server.stats['requests']
+with ThreadPoolExecutor(5) as workers:
+    answers = list(workers.map(lambda _: gpt.get_simple_response("what is the capital of france"), range(5)))
+check(f"5 identical questions -> {server.stats['requests'] - before} request(s)",
+      server.stats['requests'] == before + 1 and set(answers) == {"Paris."})
+print(f"  deduplicated so far: {gpt.flight.stats()['deduped']}")
+
+print("\n[RETRY & DEADLINE]")
+server.error_rate = 0.3
+replies = [gpt.get_response(f"question {i}", use_history=False) for i in range(10)]
+check("retries hide 30% errors", replies.count(gpt.FALLBACK_REPLY) <= 1)
+server.error_rate = 0.0
+
+server.ttfb = 2.0
+start = time.perf_counter()
+reply = gpt.get_response("slow question", use_history=False, budget=0.5)
+elapsed = time.perf_counter() - start
+check(f"deadline fallback after {elapsed:.2f}s", reply == gpt.LATE_REPLY and elapsed < 1.0)
+
+# The budget covers the first token only: slower tokens after it still arrive
+server.ttfb = 0.1
+server.tokens_per_second = 2
+server.replies['slow tokens'] = "One two three four five."
+chunks = list(gpt.stream_response("slow tokens please", use_history=False, budget=0.4))
+check(f"a slow stream is read to the end ({len(chunks)} chunks)",
+      "".join(chunks) == "One two three four five.")
+del server.replies['slow tokens']
+server.tokens_per_second = 200
+server.ttfb = 0.05
+
+print("\n[CIRCUIT BREAKER]")
+breaker = gpt.openai_breaker
+breaker.reset()
+breaker.reset_after = 0.5
+server.error_rate = 1.0
+for i in range(config.BREAKER_FAILURES):
+    gpt.get_response(f"broken question {i}", use_history=False)
+check(f"opens after {config.BREAKER_FAILURES} failed turns", breaker.status()['state'] == 'open')
+sent = server.stats['requests']
+start = time.perf_counter()
+reply = gpt.get_response("asked while open", use_history=False)
+elapsed = time.perf_counter() - start
+check(f"answered locally in {elapsed * 1000:.1f} ms without a request",
+      reply == gpt.LATE_REPLY and server.stats['requests'] == sent)
+server.error_rate = 0.0
+time.sleep(breaker.reset_after)
+gpt.get_response("asked after the pause", use_history=False)   # Starts the probe
+deadline = time.time() + 3
+while breaker.status()['state'] != 'closed' and time.time() < deadline:
+    time.sleep(0.05)
+check("background probe closes it again", breaker.status()['state'] == 'closed')
+check("next turn goes to the API", gpt.get_response("capital of france", use_history=False) == "Paris.")
+print(f"  {breaker.status()}")
+
+print("\n[WARM-UP]")
+config.GPT_REWARM_AFTER = 0.3
+
+
+def warmups():
+    return sum(t['label'] == 'warmup' for t in gpt.get_timings())
+
+
+before = warmups()
+gpt.keep_warm()
+time.sleep(1.2)
+check(f"idle pool re-warmed in the background ({warmups() - before} warm-ups)", warmups() - before >= 2)
+gpt.pool.last_request = time.time() - config.GPT_KEEP_WARM_FOR
+time.sleep(0.4)
+before = warmups()
+time.sleep(0.9)
+check("re-warming stops GPT_KEEP_WARM_FOR after the last request", warmups() == before)
+
+print("\n[LATENCY]")
+for name, summary in gpt.get_latency_report().items():
+    print(f"  {name}: {summary}")
+
+gpt.response_cache.invalidate()
+server.stop()
+
+print("\n" + "=" * 50)
+print("GPT OFFLINE CHECKED!")
+print("=" * 50)
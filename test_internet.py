@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Test weather/news plumbing against a local stand-in for the web APIs"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+print("=" * 50)
+print("IVERI INTERNET TEST")
+print("=" * 50)
+
+DELAY = 0.3
+hits = []
+failures = {'Flaky': 1}   # City -> 503s to send before answering
+outage = threading.Event()  # Set: every request gets a 503 at once
+
+
+class FakeWebAPIs(BaseHTTPRequestHandler):
+    """Minimal OpenWeatherMap + NewsAPI responses"""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if outage.is_set():
+            hits.append((url.path, query, 503))
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        time.sleep(DELAY)
+        etag = f'"{query.get("category")}-1"'
+        if url.path == '/news' and self.headers.get('If-None-Match') == etag:
+            hits.append((url.path, query, 304))
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if failures.get(query.get('q'), 0) > 0:
+            failures[query['q']] -= 1
+            hits.append((url.path, query, 503))
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        hits.append((url.path, query, 200))
+        if url.path == '/weather':
+            body = {'main': {'temp': 21.4, 'feels_like': 20.6, 'humidity': 40},
+                    'weather': [{'description': 'clear sky'}], 'name': query.get('q')}
+        else:
+            body = {'status': 'ok', 'articles': [
+                {'title': f"{query.get('category')} story {i} - Source"} for i in range(1, 4)]}
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), FakeWebAPIs)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base = f"http://127.0.0.1:{server.server_address[1]}"
+
+import config
+config.WEATHER_API_URL = f"{base}/weather"
+config.NEWS_API_URL = f"{base}/news"
+scratch = tempfile.mkdtemp()
+config.WEATHER_CACHE_FILE = os.path.join(scratch, "weather_cache.json")
+config.NEWS_CACHE_FILE = os.path.join(scratch, "news_cache.json")
+
+import internet_tasks
+internet_tasks.WEATHER_API_KEY = 'test'
+internet_tasks.NEWS_API_KEY = 'test'
+
+
+def check(name, ok):
+    print(f"  {'OK' if ok else 'FAIL'}: {name}")
+
+
+print("\n[ANSWERS]")
+handled, reply = internet_tasks.handle_internet_task("weather in Paris")
+check(f"weather -> {reply}", handled and "clear sky" in reply and "Paris" in reply)
+handled, reply = internet_tasks.handle_internet_task("tech news")
+check(f"news -> {reply}", handled and "technology story 1." in reply)
+
+print("\n[COMPOUND QUESTIONS]")
+for question, parts in (("weather in Delhi and Mumbai", ("Delhi", "Mumbai")),
+                        ("business and health news", ("business story 1.", "health story 1."))):
+    start = time.perf_counter()
+    handled, reply = internet_tasks.handle_internet_task(question)
+    took = time.perf_counter() - start
+    check(f"'{question}' answered in {took:.2f}s (one lookup takes {DELAY}s)",
+          handled and all(p in reply for p in parts) and reply.index(parts[0]) < reply.index(parts[1])
+          and took < DELAY * 1.8)
+
+print("\n[COALESCING]")
+hits.clear()
+with ThreadPoolExecutor(8) as workers:
+    replies = list(workers.map(lambda _: internet_tasks.get_weather("Oslo"), range(8)))
+check(f"8 concurrent Oslo lookups -> {len(hits)} upstream call(s)", len(hits) == 1 and len(set(replies)) == 1)
+print(f"  stats: {internet_tasks.flight.stats()}")
+
+print("\n[NEWS PREFETCH]")
+prefetch = internet_tasks.news_prefetcher
+internet_tasks.news_cache.clear()
+hits.clear()
+prefetch.hot_interval = 0.5
+prefetch.asked_at.clear()
+# As at launch ([ANSWERS] asked for tech news)
+prefetch.refreshed_at = {(c, config.NEWS_COUNTRY): 0.0 for c in config.NEWS_PREFETCH_CATEGORIES}
+prefetch.start()
+deadline = time.time() + DELAY * 5
+while not internet_tasks.news_cache.stats()['size'] and time.time() < deadline:
+    time.sleep(0.05)
+time.sleep(DELAY * 2)
+fetched = sorted({h[1].get('category') for h in hits})
+check(f"only {config.NEWS_PREFETCH_CATEGORIES} fetched at launch ({fetched})",
+      fetched == config.NEWS_PREFETCH_CATEGORIES)
+before = len(hits)
+start = time.perf_counter()
+reply = internet_tasks.get_news("general")
+served = time.perf_counter() - start
+check(f"general news served from memory in {served * 1000:.1f} ms", served < DELAY / 2 and len(hits) == before and "general story 1." in reply)
+reply = internet_tasks.get_news("sports")
+check("a category first asked for is fetched once",
+      "sports story 1." in reply and [h[1].get('category') for h in hits[before:]].count('sports') == 1)
+before = len(hits)
+time.sleep(1.0 + DELAY * 3)   # The scheduler naps at least a second
+revalidated = [h for h in hits[before:] if h[1].get('category') == 'sports']
+check(f"asked-for category revalidated with ETag ({len(revalidated)} x 304)",
+      revalidated and all(h[2] == 304 for h in revalidated))
+check("cold categories left alone", all(h[1].get('category') in ('general', 'sports') for h in hits[before:]))
+prefetch.stop()
+prefetch.thread.join(DELAY * 5)
+print(f"  stats: {prefetch.stats()}")
+
+# Relaunch: headlines cached within their refresh interval are not re-fetched
+from prefetcher import Prefetcher
+check("headlines persisted for the next launch", os.path.exists(config.NEWS_CACHE_FILE))
+relaunched = Prefetcher(internet_tasks._prefetch_news, keys=[('general', config.NEWS_COUNTRY)],
+                        age=internet_tasks._news_age)
+hits.clear()
+relaunched.start()
+time.sleep(1.0 + DELAY * 2)
+relaunched.stop()
+check(f"fresh cached categories skipped after a restart ({len(hits)} requests)", not hits)
+
+print("\n[HTTP POOL]")
+import http_pool
+hits.clear()
+reply = internet_tasks.get_weather("Flaky")
+check(f"503 retried with backoff ({[h[2] for h in hits]})", "clear sky" in reply and len(hits) == 2)
+host = f"127.0.0.1:{server.server_address[1]}"
+metrics = http_pool.stats()[host]
+print(f"  {host}: {metrics}")
+check(f"{metrics['requests']} requests over {metrics['connections']} connection(s)",
+      metrics['reused'] > 0 and metrics['connections'] <= config.HTTP_POOL_PER_HOST)
+
+print("\n[CIRCUIT BREAKER]")
+breaker = internet_tasks.weather_breaker
+breaker.reset_after = 0.5
+outage.set()
+for i in range(config.BREAKER_FAILURES):
+    internet_tasks.get_weather(f"Nowhere {i}")
+check(f"opens after {config.BREAKER_FAILURES} failed lookups", breaker.status()['state'] == 'open')
+hits.clear()
+internet_tasks.weather_cache.ttl = 0
+start = time.perf_counter()
+cached = internet_tasks.get_weather("Paris")
+uncached = internet_tasks.get_weather("Lima")
+took = time.perf_counter() - start
+time.sleep(0.1)
+internet_tasks.weather_cache.ttl = config.WEATHER_CACHE_TTL
+check(f"cached city answered, new city refused, in {took * 1000:.1f} ms with no requests",
+      "clear sky" in cached and "unavailable" in uncached and not hits)
+outage.clear()
+time.sleep(breaker.reset_after)
+internet_tasks.get_weather("Lima")       # Starts the background probe
+deadline = time.time() + 3
+while breaker.status()['state'] != 'closed' and time.time() < deadline:
+    time.sleep(0.05)
+check("background probe closes it again", breaker.status()['state'] == 'closed')
+check("lookups resume", "clear sky" in internet_tasks.get_weather("Lima"))
+import commands
+print(f"  service status: {commands.handle_command('service status')[1]}")
+
+print("\n[WEATHER CACHE]")
+from web_cache import WebCache
+cache = internet_tasks.weather_cache
+cache.clear()
+hits.clear()
+internet_tasks.get_weather("Rome")
+start = time.perf_counter()
+reply = internet_tasks.get_weather("rome ")
+fresh = time.perf_counter() - start
+check(f"fresh repeat answered in {fresh * 1000:.1f} ms without a request", len(hits) == 1 and fresh < DELAY / 2)
+
+cache.ttl = 0
+start = time.perf_counter()
+stale_reply = internet_tasks.get_weather("Rome")
+stale = time.perf_counter() - start
+check(f"stale reading served in {stale * 1000:.1f} ms", stale < DELAY / 2 and "Rome" in stale_reply)
+time.sleep(DELAY * 2)
+check(f"refreshed in the background ({len(hits) - 1} request)", len(hits) == 2 and cache.age("weather:rome") < DELAY * 2)
+cache.ttl = config.WEATHER_CACHE_TTL
+
+reloaded = WebCache(config.WEATHER_CACHE_FILE, ttl=config.WEATHER_CACHE_TTL)
+check("readings survive a restart", reloaded.get("weather:rome", lambda: None)['description'] == "clear sky")
+
+server.shutdown()
+server.server_close()
+http_pool.session.close()   # Drop kept-alive connections to the stand-in too
+check("stale reading spoken when the API is down",
+      "clear sky" in WebCache(config.WEATHER_CACHE_FILE, ttl=0, stale_ttl=0).get(
+          "weather:rome", internet_tasks._fetch_weather, "Rome")['description'])
+print(f"  stats: {cache.stats()}")
+
+print("\n" + "=" * 50)
+print("INTERNET CHECKED!")
+print("=" * 50)
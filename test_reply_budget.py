@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Check reply budget classes and benchmark GPT latency per class"""
+
+import os
+import sys
+
+from fake_openai import FakeOpenAIServer
+
+print("=" * 50)
+print("IVERI REPLY BUDGET TEST")
+print("=" * 50)
+
+# Run against the real API with --live, otherwise the local stand-in
+LIVE = '--live' in sys.argv
+LONG_REPLY = " ".join(f"Sentence number {i} of a long answer." for i in range(1, 120))
+server = None
+if not LIVE:
+    server = FakeOpenAIServer(ttfb=0.1, tokens_per_second=1000, replies={"": LONG_REPLY}).start()
+
+import config
+if server:
+    config.OPENAI_BASE_URL = server.base_url
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-fake')
+config.RESPONSE_CACHE_ENABLED = False
+config.GPT_HEDGE_ENABLED = False
+
+import gpt
+import reply_budget
+from latency import LatencyStats
+
+print("\n[CLASSIFY]")
+cases = [
+    ("hello", 'tiny'),
+    ("thanks", 'tiny'),
+    ("what is 5 times 6", 'tiny'),
+    ("who invented the telephone", 'tiny'),
+    ("why is the sky blue", 'normal'),
+    ("recommend a good movie for tonight", 'normal'),
+    ("explain quantum computing", 'detail'),
+    ("tell me about the history of rome", 'detail'),
+    ("how do i cook rice", 'detail'),
+    ("write a poem about the sea", 'detail'),
+]
+for text, expected in cases:
+    found = reply_budget.classify(text)
+    print(f"  {'OK' if found == expected else 'FAIL'}: {text} -> {found}")
+
+trimmed = reply_budget.trim_incomplete("First sentence. Second one is cut")
+print(f"  {'OK' if trimmed == 'First sentence.' else 'FAIL'}: cut reply trimmed -> {trimmed!r}")
+
+print("\n[BENCHMARK] seconds per reply (p50 / p90 / max)")
+questions = {
+    'tiny': ["hello", "what is 5 times 6", "who wrote hamlet"],
+    'normal': ["why is the sky blue", "recommend a good movie for tonight", "should i learn python or java"],
+    'detail': ["explain quantum computing", "tell me about the history of rome", "how do i cook rice"],
+}
+runs = 3 if LIVE else 5
+for adaptive in (False, True):
+    config.ADAPTIVE_REPLY_LENGTH = adaptive
+    print(f"  {'adaptive budgets' if adaptive else 'no budget (before)'}:")
+    for name, texts in questions.items():
+        stats = LatencyStats()
+        words = 0
+        for _ in range(runs):
+            for text in texts:
+                reply = gpt.get_response(text, use_history=False)
+                stats.add(gpt.get_timings()[-1]['total'])
+                words += len(reply.split())
+        s = stats.summary()
+        print(f"    {name:<7} {s['p50']:.2f} / {s['p90']:.2f} / {s['max']:.2f}"
+              f"   ~{words // (runs * len(texts))} words")
+
+if server:
+    server.stop()
+
+print("\n" + "=" * 50)
+print("REPLY BUDGET CHECKED!")
+print("=" * 50)
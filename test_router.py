@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Test the single-pass intent router"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import time
+
+print("=" * 50)
+print("IVERI ROUTER TEST")
+print("=" * 50)
+
+import router
+
+# Automaton keeps `phrase in text` semantics
+print("\n[AUTOMATON]")
+automaton = router.TriggerAutomaton()
+automaton.add('he', 1)
+automaton.add('she', 2)
+automaton.add('hers', 4)
+automaton.build()
+for text, expected in [("ushers", 7), ("she", 3), ("his", 0), ("ahe", 1)]:
+    mask = automaton.scan(text)
+    print(f"  {'OK' if mask == expected else 'FAIL'}: {text} -> {mask}")
+
+# Utterance is normalized once and matches whole words
+print("\n[UTTERANCE]")
+from utterance import Utterance
+utt = Utterance("What's the weather in London?")
+checks = [
+    ("tokens", utt.tokens == ["what's", "the", "weather", "in", "london"]),
+    ("offsets", utt.text[slice(*utt.offsets[4])] == "london"),
+    ("'on' is not in London", not utt.has_word('on')),
+    ("phrase", utt.has_phrase("weather in london")),
+    ("quite is not quit", not Utterance("that's quite good").has_word('quit')),
+]
+for name, ok in checks:
+    print(f"  {'OK' if ok else 'FAIL'}: {name}")
+
+# Slots come from one compiled pattern per intent
+print("\n[SLOTS]")
+import slots
+slot_tests = [
+    ("youtube_search", "find cat videos on youtube", {'query': 'cat videos'}),
+    ("google_search", "search for python for beginners", {'query': 'python for beginners'}),
+    ("wikipedia", "look up alan turing on wikipedia", {'query': 'alan turing'}),
+    ("weather", "what's the weather in Thessaloniki today?", {'city': 'Thessaloniki'}),
+    ("weather_cities", "weather in Delhi, Mumbai and in Pune?", {'cities': ['Delhi', 'Mumbai', 'Pune']}),
+    ("news", "any sports news", {'category': 'sports'}),
+    ("news_categories", "tech and sports news", {'categories': ['technology', 'sports']}),
+    ("remember", "remember my name is John", {'key': 'name', 'value': 'John'}),
+    ("add_note", "take a note tomorrow is a holiday", {'text': 'tomorrow is a holiday'}),
+    ("add_note", "make a note that to do list is long", {'text': 'to do list is long'}),
+    ("youtube_search", "search youtube for", None),
+    ("youtube_search", "play on youtube", None),
+    ("google_search", "search for", None),
+    ("recall", "what's my name please", {'key': 'name'}),
+    ("recall", "forget my name", None),
+    ("forget", "forget my name please", {'key': 'name'}),
+    ("forget", "what's my name", None),
+]
+for intent, text, expected in slot_tests:
+    found = slots.extract(intent, text)
+    print(f"  {'OK' if found == expected else 'FAIL'}: {intent} -> {found}")
+
+# Which handlers does each utterance reach?
+print("\n[CANDIDATES]")
+R = router.build_default_router()
+tests = [
+    ("open youtube", "commands"),
+    ("what time is it", "commands"),
+    ("remember my name is John", "memory"),
+    ("add a note buy milk", "memory"),
+    ("weather in london", "internet"),
+    ("tech news", "internet"),
+    ("turn on the led", "hardware"),
+    ("what is the capital of france", None),
+    ("tell me a joke", None),
+]
+for text, expected in tests:
+    names = [name for name, _ in R.candidates(text)]
+    first = names[0] if names else None
+    print(f"  {'OK' if first == expected else 'FAIL'}: {text} -> {names}")
+
+# Look-alikes of commands reach no handler and aren't re-routed
+print("\n[FALLBACK]")
+for text in ["go to sleep", "start the car", "i want to see my friends", "lock the door",
+             "what do you know about black holes", "what are my options",
+             "show me a picture of a cat", "is it raining in tokyo"]:
+    names = [name for name, _ in R.candidates(text)]
+    rerouted = R.fallback(Utterance(text))
+    print(f"  {'OK' if not names and rerouted is None else 'FAIL'}: {text} -> {names or rerouted or 'GPT'}")
+rerouted = R.fallback(Utterance("could you pull up youtube"))
+print(f"  {'OK' if rerouted == 'open youtube' else 'FAIL'}: paraphrase still re-routed -> {rerouted}")
+
+# Tool arguments go to the tool's own handler, never re-read as commands
+print("\n[TOOLS]")
+import os
+import tempfile
+import memory
+scratch = tempfile.mkdtemp()
+memory.MEMORY_FILE = os.path.join(scratch, "memory.json")
+memory.NOTES_FILE = os.path.join(scratch, "notes.json")
+memory.memory = memory.Memory()
+tool_calls = [
+    ('add_note', {'text': "turn the volume up before the party"}, "turn the volume up before the party"),
+    ('add_note', {'text': "buy a new battery"}, "buy a new battery"),
+    ('add_note', {'text': "help mom move the couch"}, "help mom move the couch"),
+    ('add_note', {'text': "remember my keys"}, "remember my keys"),
+]
+for tool, arguments, note in tool_calls:
+    handled, response = R.call_tool(tool, arguments)
+    saved = [n['text'] for n in memory.memory.notes.values()]
+    print(f"  {'OK' if handled and note in saved else 'FAIL'}: {tool}({arguments}) -> {response}")
+handled, response = R.call_tool('remember_fact', {'key': 'favorite band', 'value': 'mute city'})
+print(f"  {'OK' if memory.memory.recall('favorite band') == 'mute city' else 'FAIL'}: "
+      f"remember_fact(value='mute city') -> {response}")
+
+# Repeat phrases reuse the cached routing decision
+print("\n[CACHE]")
+calls = []
+
+def clock(utt):
+    calls.append(utt.text)
+    return True, f"tick {len(calls)}"
+
+cached = router.Router(cache_size=2)
+cached.add('clock', clock, ['time'])
+cached.build()
+first = cached.dispatch("what time is it")
+second = cached.dispatch("What time is it")
+stats = cached.cache_stats()
+print(f"  {'OK' if stats['hits'] == 1 and stats['misses'] == 1 else 'FAIL'}: hits/misses {stats}")
+print(f"  {'OK' if first != second else 'FAIL'}: handler still runs on a hit ({first[1]} / {second[1]})")
+cached.dispatch("tell me a joke")
+cached.dispatch("tell me a joke")
+print(f"  {'OK' if cached.cache_stats()['hits'] == 2 else 'FAIL'}: GPT-bound decision cached too")
+
+# GPT-bound utterances should cost one scan
+print("\n[SPEED]")
+text = "could you explain how photosynthesis works in simple terms"
+n = 10000
+start = time.perf_counter()
+for _ in range(n):
+    R.candidates(text)
+elapsed = (time.perf_counter() - start) / n * 1e6
+print(f"  Unmatched utterance: {elapsed:.1f} us per utterance")
+
+print("\n" + "=" * 50)
+print("ROUTER CHECKED!")
+print("=" * 50)
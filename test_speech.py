@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""Test microphone capture against a synthetic, real-time audio source"""
+
+import collections
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+print("=" * 50)
+print("IVERI SPEECH TEST")
+print("=" * 50)
+
+# Measure endpointing on your own recordings with --corpus DIR
+# (DIR/labels.json maps each .wav to the second its speech ends)
+CORPUS = sys.argv[sys.argv.index('--corpus') + 1] if '--corpus' in sys.argv else None
+
+import speech_recognition as sr
+
+import config
+import speech
+import stt
+from mic_stream import MicStream
+from vad import EnergyEndpointer, VoiceActivityDetector, rms
+
+RATE = config.MIC_SAMPLE_RATE
+rng = np.random.default_rng(7)
+
+
+def noise(seconds, level):
+    """Background hiss at roughly `level` RMS"""
+    return rng.normal(0, level, int(seconds * RATE))
+
+
+def voice(seconds, level=3000, pitch=140):
+    """Crude voiced sound: a few harmonics, amplitude-modulated into syllables"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    wave = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+    syllables = 0.6 + 0.4 * np.abs(np.sin(2 * np.pi * 3 * t))
+    return wave / np.sqrt(np.mean(wave ** 2)) * level * syllables
+
+
+def hiss(seconds, level):
+    """Unvoiced consonant (s, f, th): broadband noise"""
+    return rng.normal(0, level, int(seconds * RATE))
+
+
+def pcm(samples):
+    return np.clip(samples, -32768, 32767).astype(np.int16).tobytes()
+
+
+def synthetic_utterance():
+    """
+    One spoken request over room noise: words with fricatives, short gaps
+    between words and the odd longer hesitation, a soft final word.
+
+    Returns:
+        (samples, second the speech ends)
+    """
+    noise_level = rng.choice([60, 150, 300])
+    parts = [np.zeros(int(0.6 * RATE))]
+    words = rng.integers(2, 8)
+    for i in range(words):
+        level = rng.uniform(1500, 4000)
+        word = voice(rng.uniform(0.15, 0.45), level, pitch=rng.uniform(100, 220))
+        if rng.random() < 0.3:
+            word = np.concatenate([hiss(rng.uniform(0.06, 0.12), level * 0.2), word])
+        if i == words - 1:
+            word *= np.linspace(1, 0.2, len(word)) ** 0.5     # Trailing off
+            if rng.random() < 0.4:
+                word = np.concatenate([word, hiss(rng.uniform(0.06, 0.12), level * 0.15)])
+        parts.append(word)
+        if i < words - 1:
+            kind = rng.random()
+            gap = (rng.uniform(0.03, 0.15) if kind < 0.7 else
+                   rng.uniform(0.15, 0.3) if kind < 0.95 else
+                   rng.uniform(0.3, 0.45))                     # Hesitation
+            parts.append(np.zeros(int(gap * RATE)))
+    speech = np.concatenate(parts)
+    end = len(speech) / RATE
+    speech = np.concatenate([speech, np.zeros(int(2.0 * RATE))])
+    return speech + rng.normal(0, noise_level, len(speech)), end
+
+
+def write_corpus(directory, count=60):
+    labels = {}
+    for i in range(count):
+        samples, end = synthetic_utterance()
+        name = f"utterance_{i:03d}.wav"
+        with wave.open(os.path.join(directory, name), 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(RATE)
+            f.writeframes(pcm(samples))
+        labels[name] = end
+    with open(os.path.join(directory, "labels.json"), 'w') as f:
+        json.dump(labels, f)
+
+
+def endpoint(path, make_endpointer):
+    """
+    Stream a WAV through an endpointer in MIC_CHUNK pieces.
+
+    Returns:
+        (seconds into the file the end was declared, file length)
+    """
+    with wave.open(path, 'rb') as f:
+        rate = f.getframerate()
+        data = f.readframes(f.getnframes())
+    chunk_bytes = config.MIC_CHUNK * 2
+    # The live stream knows the room from idle audio; use the file's lead-in
+    floor = rms(data[:int(0.3 * rate) * 2])
+    endpointer = make_endpointer(rate, floor)
+    for offset in range(0, len(data), chunk_bytes):
+        if endpointer.push(data[offset:offset + chunk_bytes]) == 'end':
+            return (offset + chunk_bytes) / 2 / rate, len(data) / 2 / rate
+    return len(data) / 2 / rate, len(data) / 2 / rate
+
+
+def measure(directory, make_endpointer):
+    """Mean/p90 endpointing latency (s) and false-cut rate over a labeled corpus"""
+    with open(os.path.join(directory, "labels.json")) as f:
+        labels = json.load(f)
+    delays, cuts = [], 0
+    for name, speech_end in sorted(labels.items()):
+        declared, _ = endpoint(os.path.join(directory, name), make_endpointer)
+        if declared < speech_end:
+            cuts += 1
+        else:
+            delays.append(declared - speech_end)
+    delays.sort()
+    return {
+        'files': len(labels),
+        'mean': sum(delays) / len(delays) if delays else None,
+        'p90': delays[int(0.9 * (len(delays) - 1))] if delays else None,
+        'false_cuts': cuts / len(labels),
+    }
+
+
+class FakeMicrophone:
+    """AudioSource that plays queued samples in real time over background noise"""
+
+    def __init__(self, noise_level=100):
+        self.SAMPLE_RATE = RATE
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = config.MIC_CHUNK
+        self.noise_level = noise_level
+        self.pending = np.zeros(0)
+        self.lock = threading.Lock()
+        self.stream = None
+
+    def play(self, samples):
+        """Mix `samples` into the stream starting now"""
+        with self.lock:
+            self.pending = np.concatenate([self.pending, samples])
+
+    def __enter__(self):
+        self.stream = self
+        return self
+
+    def __exit__(self, *exc):
+        self.stream = None
+
+    def read(self, frames):
+        time.sleep(frames / RATE)
+        chunk = noise(frames / RATE, self.noise_level)
+        with self.lock:
+            take = self.pending[:frames]
+            self.pending = self.pending[frames:]
+        chunk[:len(take)] += take
+        return pcm(chunk)
+
+
+def check(name, ok):
+    print(f"  {'OK' if ok else 'FAIL'}: {name}")
+
+
+scratch = tempfile.mkdtemp()
+calibration = os.path.join(scratch, "mic_calibration.json")
+
+print("\n[CALIBRATION]")
+source = FakeMicrophone(noise_level=400)
+mic = MicStream(source_factory=lambda: source, calibration_file=calibration)
+check(f"starts from ENERGY_THRESHOLD ({mic.energy_threshold:.0f})", mic.energy_threshold == config.ENERGY_THRESHOLD)
+mic.start()
+time.sleep(2.5)
+mic.stop()
+level = mic.calibration()
+expected = rms(pcm(noise(1, 400))) * config.MIC_DYNAMIC_RATIO
+check(f"threshold tracks the room: {level['energy_threshold']:.0f} (noise x ratio = {expected:.0f})",
+      abs(level['energy_threshold'] - expected) < expected * 0.15)
+reloaded = MicStream(source_factory=lambda: source, calibration_file=calibration)
+check(f"calibration survives a restart ({reloaded.energy_threshold:.0f})",
+      abs(reloaded.energy_threshold - level['energy_threshold']) < 1.0)
+
+print("\n[LISTEN]")
+source = FakeMicrophone(noise_level=100)
+mic = MicStream(source_factory=lambda: source)
+mic.start()
+time.sleep(1.5)
+
+# Speech that began just before listen() is kept (pre-roll)
+source.play(voice(1.0))
+time.sleep(0.15)
+start = time.perf_counter()
+audio = mic.listen(timeout=3)
+took = time.perf_counter() - start
+captured = len(audio.frame_data) / 2 / RATE
+check(f"phrase captured whole: {captured:.2f}s of audio for 1.0s of speech", captured >= 1.0)
+check(f"returned {took:.2f}s after the call (rest of the speech + hangover)",
+      took < 1.0 - 0.15 + config.VAD_MAX_HANGOVER + 0.1)
+
+start = time.perf_counter()
+try:
+    mic.listen(timeout=0.5)
+    check("silence times out", False)
+except Exception as e:
+    took = time.perf_counter() - start
+    check(f"silence times out after {took:.2f}s ({type(e).__name__})", 0.4 < took < 1.0)
+
+recorded = mic.record(0.5)
+check("record() returns the requested duration", abs(len(recorded.frame_data) / 2 / RATE - 0.5) < 0.07)
+mic.stop()
+
+print("\n[ENDPOINTING]")
+corpus = CORPUS
+if corpus is None:
+    corpus = os.path.join(scratch, "corpus")
+    os.makedirs(corpus)
+    write_corpus(corpus)
+    print(f"  synthetic corpus: {corpus}")
+
+pauses = collections.deque(maxlen=50)    # One speaker across the corpus
+energy = measure(corpus, lambda rate, floor: EnergyEndpointer(
+    floor * config.MIC_DYNAMIC_RATIO, config.MIC_CHUNK / rate, config.PAUSE_THRESHOLD))
+vad = measure(corpus, lambda rate, floor: VoiceActivityDetector(rate, floor, pauses))
+for name, result in (("energy + 0.8s pause", energy), ("VAD", vad)):
+    print(f"  {name:20s} latency mean {result['mean']:.3f}s  p90 {result['p90']:.3f}s  "
+          f"false cuts {result['false_cuts']:.0%}  ({result['files']} files)")
+print(f"  pauses learned: {len(pauses)}, longest {max(pauses, default=0):.2f}s")
+if CORPUS is None:
+    check("VAD ends phrases at least 25% sooner", vad['mean'] < energy['mean'] * 0.75)
+    check("VAD cuts off at most 1% of requests", vad['false_cuts'] <= 0.01)
+
+print("\n[RECOGNIZERS]")
+
+
+class FakeStream:
+    def __init__(self, backend):
+        self.backend = backend
+        self.chunks = 0
+
+    def feed(self, chunk):
+        self.chunks += 1
+        self.backend.partials.append(time.perf_counter())
+        return " ".join(["word"] * (self.chunks // 8))
+
+    def final(self):
+        return "turn on the lights", 0.9
+
+    def finish(self):
+        return self.final()[0]
+
+
+class FakeBackend(stt.Backend):
+    """On-device recognizer stand-in: streams, and 'hears' the same phrase every time"""
+
+    name = 'fake'
+    streaming = True
+    offline = True
+
+    def __init__(self):
+        self.partials = []
+        self.clips = 0
+
+    def stream(self, sample_rate):
+        return FakeStream(self)
+
+    def recognize(self, audio):
+        self.clips += 1
+        return "turn on the lights"
+
+
+stt.BACKENDS['fake'] = FakeBackend
+fake = stt.get('fake')
+google = stt.get('google')
+source = FakeMicrophone(noise_level=100)
+speech.mic = MicStream(source_factory=lambda: source)
+speech.mic.start()
+time.sleep(1.0)
+
+config.STT_BACKEND, config.STT_OFFLINE_FALLBACK = 'fake', None
+source.play(voice(1.0))
+text = speech.listen()
+captured = time.perf_counter()
+check(f"configured backend recognizes: {text!r}", text == "turn on the lights")
+decoding = [t for t in fake.partials if t < captured - 0.5]
+check(f"decoded while the user spoke ({len(fake.partials)} chunks streamed, "
+      f"{len(decoding)} over 0.5s before the end)", len(decoding) > 5)
+
+config.STT_BACKEND, config.STT_OFFLINE_FALLBACK = 'google', 'fake'
+check("Google is the default backend", stt.select() is google)
+for _ in range(config.BREAKER_FAILURES):
+    google.breaker.record(False, error="network down")
+check("while Google is down the offline backend is used", stt.select() is fake)
+source.play(voice(0.8))
+check("listen() still works offline", speech.listen() == "turn on the lights")
+config.STT_OFFLINE_FALLBACK = None
+check("without a fallback speech is unavailable", not speech.available())
+google.breaker.reset()
+
+config.STT_OFFLINE_FALLBACK = 'fake'
+def network_down(*args, **kwargs):
+    raise sr.RequestError("recognition connection failed")
+google.recognizer.recognize_google = network_down
+clip = sr.AudioData(pcm(voice(0.5)), RATE, 2)
+check("a failed Google request is retried offline",
+      speech._recognize(google, clip) == "turn on the lights" and fake.clips == 1)
+del google.recognizer.recognize_google
+google.breaker.reset()
+speech.mic.stop()
+
+print("\n[RECOGNITION RACE]")
+
+
+class TimedBackend(stt.Backend):
+    """Answers `text` at `confidence` after `delay` seconds (or raises `error`)"""
+
+    def __init__(self, name, delay, text="turn on the lights", confidence=0.9, error=None):
+        self.name = name
+        self.delay = delay
+        self.text = text
+        self.confidence = confidence
+        self.error = error
+        self.finished = None
+
+    def transcribe(self, audio):
+        time.sleep(self.delay)
+        self.finished = time.perf_counter()
+        if self.error:
+            raise self.error
+        return self.text, self.confidence
+
+
+def timed_race(*backends, **kwargs):
+    start = time.perf_counter()
+    result = stt.race(clip, list(backends), **kwargs)
+    return result, time.perf_counter() - start
+
+
+local, cloud = TimedBackend('local', 0.05), TimedBackend('cloud', 0.4, "turn on the light", 0.95)
+(text, confidence, winner), took = timed_race(local, cloud)
+check(f"first confident answer wins: {winner} in {took:.2f}s", winner == 'local' and took < 0.3)
+time.sleep(0.5)
+check("the slower recognizer finishes in the background (margin logged)",
+      cloud.finished is not None and stt.race_stats()['local']['ahead_p50'] > 0.2)
+
+local, cloud = TimedBackend('local', 0.05, "turn on the nights", 0.5), TimedBackend('cloud', 0.3)
+(text, confidence, winner), took = timed_race(local, cloud)
+check(f"an unsure answer waits for a confident one: {winner} {text!r} at {confidence:.2f}",
+      winner == 'cloud' and text == "turn on the lights")
+
+local, cloud = TimedBackend('local', 0.05, confidence=0.5), TimedBackend('cloud', 0.1, confidence=None)
+(text, confidence, winner), took = timed_race(local, cloud)
+check(f"no confident answer: the most confident is used ({winner})", winner == 'local')
+
+local = TimedBackend('local', 0.05, confidence=0.5)
+hung = TimedBackend('cloud', 2.0)
+(text, confidence, winner), took = timed_race(local, hung, timeout=0.3)
+check(f"a hung recognizer is not waited for past the timeout ({took:.2f}s)", winner == 'local' and took < 0.5)
+
+broken = TimedBackend('cloud', 0.02, error=sr.RequestError("connection failed"))
+(text, confidence, winner), took = timed_race(broken, TimedBackend('local', 0.1))
+check("a failing recognizer loses to one that answers", winner == 'local')
+try:
+    timed_race(TimedBackend('local', 0.02, error=sr.UnknownValueError()), broken)
+    check("nobody understood -> UnknownValueError", False)
+except sr.UnknownValueError:
+    check("nobody understood -> UnknownValueError", True)
+
+# Google's n-best output: the top alternative and its confidence
+google.recognizer.recognize_google = lambda audio, **kwargs: {
+    'alternative': [{'transcript': "what's the weather", 'confidence': 0.93},
+                    {'transcript': "what's the whether"}], 'final': True}
+check("Google n-best gives text and confidence",
+      google.transcribe(clip) == ("what's the weather", 0.93))
+google.recognizer.recognize_google = lambda audio, **kwargs: []
+try:
+    google.transcribe(clip)
+    check("empty Google result -> UnknownValueError", False)
+except sr.UnknownValueError:
+    check("empty Google result -> UnknownValueError", True)
+del google.recognizer.recognize_google
+
+# listen() races the configured recognizers, streaming ones included
+stt.BACKENDS['slow'] = lambda: TimedBackend('slow', 0.5, "turn off the lights", 0.99)
+config.STT_RACE = ('fake', 'slow')
+speech.mic.start()
+time.sleep(0.5)
+source.play(voice(0.8))
+check("listen() returns the first confident recognizer's text",
+      speech.listen() == "turn on the lights")
+speech.mic.stop()
+config.STT_RACE = ()
+time.sleep(0.6)
+
+vosk_backend = stt.get('vosk')
+if vosk_backend.installed():
+    stream = vosk_backend.stream(RATE)
+    for offset in range(0, RATE * 2, config.MIC_CHUNK):
+        stream.feed(pcm(noise(config.MIC_CHUNK / RATE, 100)))
+    try:
+        stream.finish()
+        check("vosk hears nothing in noise", False)
+    except sr.UnknownValueError:
+        check("vosk hears nothing in noise", True)
+else:
+    print(f"  vosk: not installed ({config.VOSK_MODEL_PATH}) - skipped")
+
+print("\n" + "=" * 50)
+print("SPEECH CHECKED!")
+print("=" * 50)
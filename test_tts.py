@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Test sentence splitting and streamed speech"""
+
+import threading
+import time
+
+print("=" * 50)
+print("IVERI TTS TEST")
+print("=" * 50)
+
+import tts
+
+
+def check(name, ok):
+    print(f"  {'OK' if ok else 'FAIL'}: {name}")
+
+
+print("\n[SENTENCES]")
+cases = [
+    ("plain", ["Hello there. How are you? Fine!"], ["Hello there.", "How are you?", "Fine!"]),
+    ("titles", ["Dr. Smith met Mrs. Jones today. They talked."],
+     ["Dr. Smith met Mrs. Jones today.", "They talked."]),
+    ("e.g./etc.", ["Bring snacks, e.g. chips. Also fruit, apples etc. and more. Done."],
+     ["Bring snacks, e.g. chips.", "Also fruit, apples etc. and more.", "Done."]),
+    ("initials", ["J. K. Rowling wrote it. The U.S. team won."],
+     ["J. K. Rowling wrote it.", "The U.S. team won."]),
+    ("decimals", ["Pi is about 3.14159 and e is 2.718. Nice."],
+     ["Pi is about 3.14159 and e is 2.718.", "Nice."]),
+    ("decimal split across chunks", ["It costs 3.", "50 dollars. Next"],
+     ["It costs 3.50 dollars.", "Next"]),
+    ("sentence end split across chunks", ["First one", ".", " Second one."],
+     ["First one.", "Second one."]),
+    ("ellipsis", ["Well... I think so. Yes."], ["Well...", "I think so.", "Yes."]),
+    ("quotes", ['He said "stop." Then he left.'], ['He said "stop."', "Then he left."]),
+    ("trailing fragment", ["Done. and then"], ["Done.", "and then"]),
+    ("fragment only", ["no punctuation at all"], ["no punctuation at all"]),
+    ("whitespace only", ["   ", "\n"], []),
+]
+for name, chunks, expected in cases:
+    got = list(tts.iter_sentences(chunks))
+    check(f"{name}: {got}", got == expected)
+
+# Sentences are yielded as soon as they end, not when the stream does
+def slow_chunks():
+    yield "First sentence. "
+    time.sleep(0.3)
+    yield "Second."
+
+start = time.perf_counter()
+first = next(iter(tts.iter_sentences(slow_chunks())))
+check("first sentence yielded before the stream ends", time.perf_counter() - start < 0.2)
+
+print("\n[SPEAK STREAM]")
+
+
+class RecordingEngine:
+    """Stands in for the pyttsx3 engine - notes which thread drives it"""
+
+    def __init__(self):
+        self.threads = set()
+        self.said = []
+
+    def say(self, text):
+        self.threads.add(threading.get_ident())
+        self.said.append(text)
+
+    def runAndWait(self):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.05)
+
+
+saved, tts.engine = tts.engine, RecordingEngine()
+spoken = tts.speak_stream(slow_chunks())
+check(f"speaks every sentence: {tts.engine.said}", tts.engine.said == ["First sentence.", "Second."])
+check("returns the full text", spoken == "First sentence. Second.")
+check("engine only driven from the calling thread", tts.engine.threads == {threading.get_ident()})
+
+
+def failing_chunks():
+    yield "One sentence. "
+    raise RuntimeError("stream broke")
+
+try:
+    tts.speak_stream(failing_chunks())
+    check("stream errors reach the caller", False)
+except RuntimeError:
+    check("stream errors reach the caller", True)
+tts.engine = saved
+
+print("\n" + "=" * 50)
+print("TTS CHECKED!")
+print("=" * 50)
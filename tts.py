@@ -1,13 +1,25 @@
 # tts.py - Text to Speech for IVERI AI
 
-import pyttsx3
+import queue
+import re
+import threading
 
-# Initialize TTS engine
-engine = pyttsx3.init()
+try:
+    import pyttsx3
+    TTS_AVAILABLE = True
+except ImportError:
+    TTS_AVAILABLE = False
+    print("INFO: pyttsx3 not installed. Replies will only be printed.")
+
+# Initialize TTS engine (None without pyttsx3). It is only ever driven from
+# the thread that created it: on Windows the SAPI5 driver is a COM object.
+engine = pyttsx3.init() if TTS_AVAILABLE else None
 
 
 def setup_voice():
     """Configure IVERI's voice settings"""
+    if engine is None:
+        return
     # Set speech rate (words per minute)
     engine.setProperty('rate', 150)
     
@@ -37,8 +49,9 @@ def speak(text):
         text: The text to speak
     """
     print(f"🔊 IVERI: {text}")
-    engine.say(text)
-    engine.runAndWait()
+    if engine is not None:
+        engine.say(text)
+        engine.runAndWait()
 
 
 def speak_async(text):
@@ -49,14 +62,104 @@ def speak_async(text):
         text: The text to speak
     """
     print(f"🔊 IVERI: {text}")
-    engine.say(text)
-    engine.startLoop(False)
-    engine.iterate()
+    if engine is not None:
+        engine.say(text)
+        engine.startLoop(False)
+        engine.iterate()
+
+
+# End of a sentence: . ! ? (plus closing quotes/brackets) followed by space
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+# A period after these ends a word, not a sentence ("Dr. Smith", "e.g. tea")
+_ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'st', 'jr', 'sr', 'vs', 'etc', 'e.g', 'i.e',
+    'approx', 'no', 'fig', 'mt', 'inc', 'ltd', 'co',
+}
+_LAST_WORD = re.compile(r"([\w.]+)\.$")
+
+
+def _ends_sentence(text):
+    """False if `text` (up to a period) ends in an abbreviation or an initial"""
+    word = _LAST_WORD.search(text)
+    if word is None:
+        return True
+    word = word.group(1).lower().rstrip('.')    # "Wait..." ends a sentence
+    # Initials and dotted abbreviations: "J. K. Rowling", "the U.S. team"
+    return word not in _ABBREVIATIONS and len(word.split('.')[-1]) > 1
+
+
+def iter_sentences(chunks):
+    """
+    Group streamed text chunks into whole sentences.
+    
+    Args:
+        chunks: Iterable of text pieces (e.g. GPT token deltas)
+    
+    Yields:
+        Each sentence as soon as its end is seen; the remainder at the end
+    """
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        for match in _SENTENCE_END.finditer(buffer):
+            end = buffer[start:match.end()].rstrip()
+            if end.endswith('.') and not _ends_sentence(end):
+                continue
+            sentence = end.strip()
+            if sentence:
+                yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+    
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def speak_stream(chunks):
+    """
+    Speak streamed text sentence by sentence while the rest is still
+    arriving. The text is read on a worker thread, so generation of the
+    next sentence overlaps speaking this one; speech itself stays on the
+    calling thread, the one that owns the engine.
+    
+    Args:
+        chunks: Iterable of text pieces
+    
+    Returns:
+        The full spoken text
+    """
+    sentences = queue.Queue()
+    
+    def reader():
+        try:
+            for sentence in iter_sentences(chunks):
+                sentences.put(sentence)
+        except Exception as e:
+            sentences.put(e)
+        finally:
+            sentences.put(None)
+    
+    threading.Thread(target=reader, name="tts-reader", daemon=True).start()
+    
+    spoken = []
+    while True:
+        sentence = sentences.get()
+        if sentence is None:
+            break
+        if isinstance(sentence, Exception):
+            raise sentence
+        spoken.append(sentence)
+        speak(sentence)
+    
+    return " ".join(spoken)
 
 
 def stop():
     """Stop current speech"""
-    engine.stop()
+    if engine is not None:
+        engine.stop()
 
 
 def set_rate(rate):
@@ -66,7 +169,8 @@ def set_rate(rate):
     Args:
         rate: Words per minute (default 150)
     """
-    engine.setProperty('rate', rate)
+    if engine is not None:
+        engine.setProperty('rate', rate)
 
 
 def set_volume(volume):
@@ -76,7 +180,8 @@ def set_volume(volume):
     Args:
         volume: Volume level 0.0 to 1.0
     """
-    engine.setProperty('volume', max(0.0, min(1.0, volume)))
+    if engine is not None:
+        engine.setProperty('volume', max(0.0, min(1.0, volume)))
 
 
 # Setup voice on module load
@@ -0,0 +1,74 @@
+# utterance.py - Normalized User Input for IVERI AI
+# Built once per turn and shared by every handler
+
+import re
+
+# Words keep inner apostrophes ("what's") - everything else is punctuation
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class Utterance:
+    """
+    One user turn, normalized once.
+
+    Attributes:
+        raw: Text as heard/typed
+        text: Lowercased, stripped text (substring checks)
+        tokens: Words in order, punctuation removed
+        token_set: Set of tokens (whole-word checks)
+        offsets: (start, end) character offsets of each token in text
+        clean: Tokens joined by single spaces (punctuation-stripped form)
+        slots: Slots extracted so far, by intent (filled by slots.extract)
+    """
+
+    __slots__ = ('raw', 'text', 'tokens', 'token_set', 'offsets', 'clean', 'slots', '_padded')
+
+    def __init__(self, raw):
+        self.raw = raw or ''
+        self.text = self.raw.lower().strip()
+
+        self.offsets = []
+        self.tokens = []
+        for match in _WORD_RE.finditer(self.text):
+            word = match.group()
+            start = match.start() + len(word) - len(word.lstrip("'"))
+            word = word.strip("'")
+            if word:
+                self.offsets.append((start, start + len(word)))
+                self.tokens.append(word)
+
+        self.token_set = frozenset(self.tokens)
+        self.clean = ' '.join(self.tokens)
+        self._padded = f' {self.clean} '
+        self.slots = {}
+
+    @classmethod
+    def of(cls, value):
+        """Return value if it is already an Utterance, else build one"""
+        if isinstance(value, cls):
+            return value
+        return cls(value)
+
+    def has_word(self, *words):
+        """True if any of the words appears as a whole word"""
+        return any(w in self.token_set for w in words)
+
+    def has_phrase(self, *phrases):
+        """True if any of the phrases appears on whole-word boundaries"""
+        return any(f' {p} ' in self._padded for p in phrases)
+
+    def startswith(self, *phrases):
+        """True if the punctuation-stripped text starts with any phrase"""
+        return any(self._padded.startswith(f' {p} ') for p in phrases)
+
+    def __contains__(self, substring):
+        return substring in self.text
+
+    def __bool__(self):
+        return bool(self.tokens)
+
+    def __str__(self):
+        return self.raw
+
+    def __repr__(self):
+        return f"Utterance({self.raw!r})"
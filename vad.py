@@ -0,0 +1,160 @@
+# vad.py - Voice Activity Detection for IVERI AI
+# Frame-level speech/non-speech decisions from energy and zero-crossing rate
+# (vectorized with NumPy), with an adaptive hangover that ends capture as
+# soon as the speaker is done instead of after a fixed pause.
+
+import collections
+import math
+
+import numpy as np
+
+import config
+
+
+def rms(chunk):
+    """Root-mean-square energy of 16-bit mono audio (same scale as audioop.rms)"""
+    samples = np.frombuffer(chunk, dtype=np.int16)
+    if not len(samples):
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2)))
+
+
+def frame_features(samples, frame):
+    """
+    Per-frame RMS energy and zero-crossing rate.
+
+    Args:
+        samples: 1-D int16/float array, a whole number of frames long
+        frame: Samples per frame
+
+    Returns:
+        (energy, zcr) arrays, one value per frame
+    """
+    frames = samples.astype(np.float64).reshape(-1, frame)
+    energy = np.sqrt(np.mean(frames ** 2, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame - 1)
+    return energy, zcr
+
+
+class VoiceActivityDetector:
+    """
+    Streaming endpointer: feed audio chunks to push() and it reports
+    'silence' (speech not started), 'speech', or 'end'.
+
+    A frame is speech if it is loud relative to the noise floor, or a
+    little louder and hissy (high ZCR - s, f, th), with hysteresis between
+    starting and continuing speech. Speech ends after a run of non-speech
+    frames longer than the hangover, which adapts to the pauses this
+    speaker leaves between words (kept in `pauses` across phrases).
+    """
+
+    def __init__(self, sample_rate, noise_floor, pauses=None):
+        """
+        Args:
+            sample_rate: Samples per second of the 16-bit mono input
+            noise_floor: RMS energy of the room's background noise
+            pauses: deque of recent mid-phrase pauses (seconds) to adapt
+                    the hangover from; shared between phrases
+        """
+        self.frame = int(sample_rate * config.VAD_FRAME_MS / 1000)
+        self.frame_seconds = self.frame / sample_rate
+        self.noise_floor = max(float(noise_floor), 1.0)
+        self.pauses = pauses if pauses is not None else collections.deque(maxlen=50)
+        self.pending = np.zeros(0, dtype=np.int16)
+        self.state = 'silence'
+        self.onset = 0           # Consecutive speech frames before the start
+        self.speech = 0.0        # Seconds of speech so far
+        self.gap = 0             # Consecutive non-speech frames since the last speech
+
+    @property
+    def quiet_seconds(self):
+        """Trailing non-speech captured so far"""
+        return self.gap * self.frame_seconds
+
+    def hangover(self):
+        """Seconds of non-speech that end the phrase right now"""
+        if self.speech < config.VAD_SHORT_SPEECH:
+            # An opening word is often followed by a pause - be patient
+            return config.VAD_MAX_HANGOVER
+        if len(self.pauses) < config.VAD_MIN_PAUSES:
+            # Too little to go on - as patient as the plain pause rule
+            return config.VAD_DEFAULT_HANGOVER
+        # A margin over the longest pause this speaker left lately, so a
+        # hesitation doesn't end the phrase
+        longest = max(self.pauses)
+        return min(config.VAD_MAX_HANGOVER, max(config.VAD_MIN_HANGOVER, longest * 1.1 + 0.1))
+
+    def push(self, chunk):
+        """Feed raw 16-bit audio; returns 'silence', 'speech' or 'end'"""
+        if self.state == 'end':
+            return self.state
+        samples = np.concatenate([self.pending, np.frombuffer(chunk, dtype=np.int16)])
+        usable = len(samples) - len(samples) % self.frame
+        self.pending = samples[usable:]
+        if not usable:
+            return self.state
+
+        energy, zcr = frame_features(samples[:usable], self.frame)
+        for e, z in zip(energy, zcr):
+            self._frame(e, z)
+            if self.state == 'end':
+                break
+        return self.state
+
+    def _frame(self, energy, zcr):
+        noise = self.noise_floor
+        if self.state == 'silence':
+            loud = energy > noise * config.VAD_ONSET_RATIO
+            self.onset = self.onset + 1 if loud else 0
+            if self.onset >= config.VAD_ONSET_FRAMES:
+                self.state = 'speech'
+                self.speech = self.onset * self.frame_seconds
+            elif not loud:
+                # Still waiting - keep following the room
+                self.noise_floor += (energy - noise) * 0.05
+            return
+
+        voiced = energy > noise * config.VAD_KEEP_RATIO
+        hiss = energy > noise * 1.2 and zcr > config.VAD_FRICATIVE_ZCR
+        if voiced or hiss:
+            if self.gap >= 2:
+                # The speaker paused and went on - learn how long they pause
+                self.pauses.append(self.gap * self.frame_seconds)
+            self.speech += (self.gap + 1) * self.frame_seconds
+            self.gap = 0
+            return
+
+        self.gap += 1
+        if self.gap * self.frame_seconds >= self.hangover():
+            self.state = 'end'
+
+
+class EnergyEndpointer:
+    """
+    The classic rule, for comparison and as a fallback: a chunk louder than
+    `threshold` starts speech, `pause_threshold` seconds of quieter chunks
+    end it.
+    """
+
+    def __init__(self, threshold, chunk_seconds, pause_threshold):
+        self.threshold = threshold
+        self.chunk_seconds = chunk_seconds
+        self.pause_chunks = math.ceil(pause_threshold / chunk_seconds)
+        self.state = 'silence'
+        self.quiet = 0
+
+    @property
+    def quiet_seconds(self):
+        return self.quiet * self.chunk_seconds
+
+    def push(self, chunk):
+        loud = rms(chunk) > self.threshold
+        if self.state == 'silence':
+            if loud:
+                self.state = 'speech'
+        elif self.state == 'speech':
+            self.quiet = 0 if loud else self.quiet + 1
+            if self.quiet >= self.pause_chunks:
+                self.state = 'end'
+        return self.state
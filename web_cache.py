@@ -0,0 +1,154 @@
+# web_cache.py - Stale-While-Revalidate Cache for Web Lookups in IVERI AI
+# Fresh entries are served as-is; stale ones are served immediately while a
+# background thread refreshes them. Entries are persisted to a JSON file so
+# the cache survives restarts.
+
+import json
+import os
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+class WebCache:
+    """
+    Keyed cache of web API results with two ages:
+
+    - younger than `ttl`: fresh, returned without touching the network
+    - younger than `stale_ttl`: returned at once, refreshed in the background
+    - older (or missing): fetched while the caller waits
+
+    If a fetch fails and any old value exists, that value is returned
+    instead of the error.
+    """
+
+    def __init__(self, filepath=None, ttl=600, stale_ttl=3 * 3600, max_entries=50, flight=None):
+        """
+        Args:
+            filepath: JSON file to persist entries in (None keeps them in memory)
+            ttl: Seconds an entry counts as fresh
+            stale_ttl: Seconds a stale entry may still be served while refreshing
+            max_entries: Entries kept before the oldest are dropped
+            flight: SingleFlight shared with other callers (one is made if None)
+        """
+        self.filepath = filepath
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.flight = flight or SingleFlight()
+        self.lock = threading.Lock()
+        self.refreshing = set()
+        self.counts = {'fresh': 0, 'stale': 0, 'miss': 0, 'refreshed': 0, 'fallback': 0}
+        self.entries = self._load()
+
+    def _load(self):
+        if self.filepath and os.path.exists(self.filepath):
+            try:
+                with open(self.filepath, 'r') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError):
+                return {}
+        return {}
+
+    def _save(self):
+        if not self.filepath:
+            return
+        try:
+            with open(self.filepath, 'w') as f:
+                json.dump(self.entries, f)
+        except IOError as e:
+            print(f"Error saving web cache: {e}")
+
+    def get(self, key, fetch, *args):
+        """
+        Return the value for `key`, calling fetch(*args) only when needed.
+
+        Args:
+            key: String key (e.g. 'weather:london')
+            fetch: Function returning a JSON-serializable value, or raising
+
+        Returns:
+            The cached or freshly fetched value (raises fetch's error if
+            there is nothing cached to fall back on)
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            age = now - entry['saved_at'] if entry else None
+            if entry and age < self.ttl:
+                self.counts['fresh'] += 1
+                return entry['value']
+            if entry and age < self.stale_ttl:
+                self.counts['stale'] += 1
+                self._refresh_later(key, fetch, args)
+                return entry['value']
+            self.counts['miss'] += 1
+
+        try:
+            return self.flight.do(key, self._fetch, key, fetch, args)
+        except Exception:
+            if entry is None:
+                raise
+            with self.lock:
+                self.counts['fallback'] += 1
+            return entry['value']
+
+    def refresh(self, key, fetch, *args):
+        """Fetch and store `key` now, whatever its age (used by prefetchers)"""
+        return self.flight.do(key, self._fetch, key, fetch, args)
+
+    def peek(self, key):
+        """Cached value for `key` regardless of age, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry['value'] if entry else None
+
+    def _fetch(self, key, fetch, args):
+        value = fetch(*args)
+        self.put(key, value)
+        return value
+
+    def _refresh_later(self, key, fetch, args):
+        """Start one background refresh per key (call with the lock held)"""
+        if key in self.refreshing:
+            return
+        self.refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, fetch, args), daemon=True).start()
+
+    def _refresh(self, key, fetch, args):
+        try:
+            self.refresh(key, fetch, *args)
+            with self.lock:
+                self.counts['refreshed'] += 1
+        except Exception as e:
+            print(f"Background refresh of {key} failed: {e}")
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def put(self, key, value):
+        """Store a value and persist the cache"""
+        with self.lock:
+            self.entries[key] = {'value': value, 'saved_at': time.time()}
+            if len(self.entries) > self.max_entries:
+                by_age = sorted(self.entries, key=lambda k: self.entries[k]['saved_at'])
+                for old in by_age[:len(self.entries) - self.max_entries]:
+                    del self.entries[old]
+            self._save()
+
+    def age(self, key):
+        """Seconds since `key` was fetched, or None if not cached"""
+        with self.lock:
+            entry = self.entries.get(key)
+            return time.time() - entry['saved_at'] if entry else None
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+            self._save()
+
+    def stats(self):
+        """Return lookup counters and size"""
+        with self.lock:
+            return dict(self.counts, size=len(self.entries))